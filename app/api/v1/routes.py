@@ -1,18 +1,51 @@
-from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy import text
 from app.core.security import RequireAPIKey
+from app.core.admission import admit
 from app.core.config import settings
 from app.core.limiting import get_limit_decorator
-from app.models.schema import ProblemInput
-from app.services.solver_interface import solve_problem
+from app.core.http_cache import (
+    cached_response, is_not_modified, json_response, make_etag, not_modified, parse_fields,
+)
+from app.core.logging import dropped_records, note, phase
+from app.core.metrics import metrics
+from app.core.profiling import pstats_bytes, run_profiled, speedscope, top_functions, wants_profile
+from app.core.shared_state import get_result_cache
+from app.models.schema import ProblemInput, SessionPatch, SessionResult, SweepInput, VisualizeInput
+from app.services.codec import NPZ_MEDIA_TYPE, decode_problem, encode_result, is_npz
+from app.services.solver_interface import (
+    solve_problem, sweep_problem, to_result, visualize_problem, workspace_stats,
+)
+from app.services import export, sessions, stats as solve_stats
+from app.services.executor import run_large, run_solve
 from app.services.persistence import (
-    find_cached_solution_by_hash,
-    persist_problem_and_solution,
+    BlockCache,
+    close_stored_session,
+    decode_duals,
+    decode_trace,
+    find_cached_solution_async,
+    find_profile,
+    find_visualization_async,
+    flush_touches,
+    get_history,
+    get_warm_start_async,
+    latest_session_problem_async,
+    note_cache_hit,
+    persist_problem_and_solution_async,
     spec_hash,
-    get_session,
+    session_for_id,
+    shard_sessions,
+    store_profile_async,
+    store_visualization_async,
+    visualization_key,
 )
 import time
 import json
+import numpy as np
+from datetime import datetime, timedelta
 from typing import Optional
 
 router = APIRouter()
@@ -28,98 +61,448 @@ def _to_plain_dict(obj):
         return obj.dict()
     return obj
 
-@router.post("/solve", dependencies=[RequireAPIKey])
+def _parse(content_type: Optional[str], body: bytes) -> ProblemInput:
+    if is_npz(content_type):
+        return decode_problem(body)
+    return _parse_json(ProblemInput, body)
+
+async def problem_from_request(request: Request) -> ProblemInput:
+    """Parse the body as JSON or npz depending on Content-Type; 413 if the problem is too large."""
+    body = await request.body()
+    content_type = request.headers.get("content-type")
+    size = admit(content_type, body)
+    request.state.problem_size = size
+    if size is not None and size.large:
+        # parsing a large body takes long enough to stall the event loop
+        note(problem_mb=size.est_mb, pool="large")
+        return await run_large(_parse, content_type, body)
+    return _parse(content_type, body)
+
+def _parse_json(model, body: bytes):
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False), body=body)
+
+async def _admitted_json(request: Request, model):
+    """``model`` from a JSON body that wraps a problem, through the same size estimate as problem_from_request."""
+    body = await request.body()
+    size = admit("application/json", body)
+    request.state.problem_size = size
+    if size is not None and size.large:
+        note(problem_mb=size.est_mb, pool="large")
+        return await run_large(_parse_json, model, body)
+    return _parse_json(model, body)
+
+async def sweep_from_request(request: Request) -> SweepInput:
+    return await _admitted_json(request, SweepInput)
+
+async def visualize_from_request(request: Request) -> VisualizeInput:
+    return await _admitted_json(request, VisualizeInput)
+
+def _runner(request: Request):
+    """run_large for problems admission control sized as large, else run_solve."""
+    size = getattr(request.state, "problem_size", None)
+    return run_large if size is not None and size.large else run_solve
+
+
+def _respond(request: Request, res: dict):
+    if is_npz(request.headers.get("accept")):
+        return Response(content=encode_result(res), media_type=NPZ_MEDIA_TYPE)
+    return res
+
+
+def _inline_schema(model) -> dict:
+    """JSON schema with $defs references expanded, for use in openapi_extra."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def _expand(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return _expand(defs[ref.rsplit("/", 1)[-1]])
+            return {k: _expand(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [_expand(v) for v in node]
+        return node
+
+    return _expand(schema)
+
+
+def _json_body_doc(model) -> dict:
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": _inline_schema(model)}}}}
+
+_PROBLEM_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": _inline_schema(ProblemInput)},
+            NPZ_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+# what a cache hit returns (same shape from the hot cache and the database)
+_HOT_FIELDS = ("status", "objective_value", "solution", "duals", "reduced_costs", "solution_id", "problem_id")
+
+
+def _solve(payload: ProblemInput, warm: Optional[dict], use_cache: bool = True):
+    if not use_cache or payload.options is None or not payload.options.decompose:
+        return solve_problem(payload, warm_start=warm)
+    # runs on the solve pool, so the block lookups may use the sync sessions
+    return solve_problem(payload, warm_start=warm, block_cache=BlockCache())
+
+
+def _parse_and_solve(content_type: Optional[str], body: bytes, warm: Optional[dict], use_cache: bool):
+    # what a profiled /solve measures: parsing the body again, then the solve
+    return _solve(_parse(content_type, body), warm, use_cache)
+
+
+@router.post("/solve", dependencies=[RequireAPIKey], openapi_extra=_PROBLEM_BODY_DOC)
 @limit
 async def solve_endpoint(
     request: Request,
-    payload: ProblemInput,
+    payload: ProblemInput = Depends(problem_from_request),
     use_cache: Optional[bool] = Query(default=None),
 ):
     if getattr(settings, "TIMEOUT_SECONDS", 8) <= 0:
         raise HTTPException(status_code=504, detail="Timeout")
 
     bypass_hdr = request.headers.get("X-Force-Recompute") or request.headers.get("X-Bypass-Cache")
-    effective_use_cache = bool(use_cache) and not bool(bypass_hdr)
+    profile = wants_profile(request)
+    effective_use_cache = bool(use_cache) and not bool(bypass_hdr) and not profile
 
     shash = spec_hash(payload)
+    hot = get_result_cache()
+    note(spec_hash=shash, cache="off")
+
+    if effective_use_cache:
+        # hot hits skip the database; the hit is counted and touched in the next batched flush
+        with phase("hot_lookup"):
+            hit = hot.get(shash)
+        if hit is not None:
+            note(cache="hot")
+            note_cache_hit(shash, hit.get("solution_id"), hit.get("status"))
+            return _respond(request, {**hit, "cached": True})
+
+        with phase("db_lookup"):
+            cached = await find_cached_solution_async(shash, problem=payload)
+        note(cache="db" if cached else "miss")
+        if cached:
+            try:
+                cached_payload = json.loads(cached.get("solution_json") or "{}")
+            except Exception:
+                cached_payload = {}
+            duals, reduced_costs = decode_duals(cached.get("duals_npz"))
+            out = {
+                "status": cached.get("status") or cached_payload.get("status"),
+                "objective_value": (
+                    cached.get("objective_value")
+                    if cached.get("objective_value") is not None
+                    else cached_payload.get("objective_value")
+                ),
+                "solution": cached_payload.get("solution"),
+                "duals": duals,
+                "reduced_costs": reduced_costs,
+                "solution_id": cached.get("id"),
+                "problem_id": cached.get("problem_id"),
+            }
+            if cached.get("fuzzy"):
+                out["fuzzy"] = True  # matched within FUZZY_CACHE_RTOL, verified on this data
+            hot.put(shash, out)
+            return _respond(request, {**out, "cached": True})
+
+    warm = None
+    if payload.options is not None and payload.options.warm_start_id:
+        warm = await get_warm_start_async(payload.options.warm_start_id)
+        if warm is None:
+            raise HTTPException(status_code=404, detail="warm_start_id not found")
+
+    # fresh solve
+    runner = _runner(request)
+    t0 = time.perf_counter()
+    with phase("solve"):
+        if profile:
+            body = await request.body()
+            res_model, stats_blob = await runner(
+                run_profiled, _parse_and_solve, request.headers.get("content-type"), body, warm, effective_use_cache
+            )
+        else:
+            res_model = await runner(_solve, payload, warm, effective_use_cache)
+    dt_ms = int((time.perf_counter() - t0) * 1000)
 
-    with get_session() as db:
-        if effective_use_cache:
-            cached = find_cached_solution_by_hash(db, shash)
-            if cached:
-                try:
-                    cached_payload = json.loads(cached.get("solution_json") or "{}")
-                except Exception:
-                    cached_payload = {}
-                return {
-                    "status": cached.get("status") or cached_payload.get("status"),
-                    "objective_value": (
-                        cached.get("objective_value")
-                        if cached.get("objective_value") is not None
-                        else cached_payload.get("objective_value")
-                    ),
-                    "solution": cached_payload.get("solution"),
-                    "cached": True,
-                    "solution_id": cached.get("id"),
-                    "problem_id": cached.get("problem_id"),
-                }
-
-        # fresh solve
+    res = _to_plain_dict(res_model)
+    note(solver=(res.get("stats") or {}).get("solver"), solve_status=res.get("status"))
+    with phase("persist"):
+        problem_id, solution_id = await persist_problem_and_solution_async(
+            payload, {**res, "trace": res_model._trace}, dt_ms, cached=False
+        )
+
+    res = dict(res)
+    res["solution_id"] = solution_id
+    res["problem_id"] = problem_id
+    if profile:
+        await store_profile_async(solution_id, stats_blob, dt_ms)
+        res["profile_url"] = f"{settings.API_V1_STR}/solutions/{solution_id}/profile"
+    hot.put(shash, {k: res.get(k) for k in _HOT_FIELDS})
+    res["cached"] = False
+    return _respond(request, res)
+
+@router.post("/sweep", dependencies=[RequireAPIKey], openapi_extra=_json_body_doc(SweepInput))
+@limit
+async def sweep_endpoint(request: Request, payload: SweepInput = Depends(sweep_from_request)):
+    if getattr(settings, "TIMEOUT_SECONDS", 8) <= 0:
+        raise HTTPException(status_code=504, detail="Timeout")
+    res = _to_plain_dict(await _runner(request)(sweep_problem, payload))
+    return _respond(request, res)
+
+@router.post("/visualize", dependencies=[RequireAPIKey], openapi_extra=_json_body_doc(VisualizeInput))
+@limit
+async def visualize_endpoint(request: Request, payload: VisualizeInput = Depends(visualize_from_request)):
+    """Feasible-region vertices and objective contours, cached per spec_hash and view."""
+    shash = spec_hash(payload.problem)
+    key = visualization_key(payload)
+    hit = await find_visualization_async(shash, key)
+    if hit is not None:
+        return {**hit, "cached": True}
+
+    # the view is anchored at the optimum, taken from the solution cache when there is one
+    cached = await find_cached_solution_async(shash)
+    if cached:
+        try:
+            optimum = json.loads(cached.get("solution_json") or "{}").get("solution")
+        except Exception:
+            optimum = None
+        solved = {"status": cached.get("status"), "objective_value": cached.get("objective_value"),
+                  "problem_id": cached.get("problem_id"), "solution_id": cached.get("id")}
+    else:
         t0 = time.perf_counter()
-        res_model = solve_problem(payload)         
+        res = _to_plain_dict(await _runner(request)(solve_problem, payload.problem))
         dt_ms = int((time.perf_counter() - t0) * 1000)
+        problem_id, solution_id = await persist_problem_and_solution_async(payload.problem, res, dt_ms, cached=False)
+        optimum = res.get("solution")
+        solved = {"status": res.get("status"), "objective_value": res.get("objective_value"),
+                  "problem_id": problem_id, "solution_id": solution_id}
+
+    out = _to_plain_dict(await _runner(request)(visualize_problem, payload, optimum))
+    out.update(solved)
+    await store_visualization_async(shash, key, out)
+    return {**out, "cached": False}
 
-        res = _to_plain_dict(res_model)
-        persist_problem_and_solution(db, payload, res, dt_ms, cached=False)
+async def _session_result(session_id: Optional[str], entry, res: dict, ms: float, previous_ms: Optional[float]) -> dict:
+    result = _to_plain_dict(to_result(res))
+    problem_id, solution_id = await persist_problem_and_solution_async(entry.problem, result, int(ms), cached=False,
+                                                                       kind="session", parent_id=session_id)
+    return _to_plain_dict(SessionResult(
+        **result,
+        session_id=session_id or problem_id,
+        problem_id=problem_id,
+        solution_id=solution_id,
+        version=entry.version,
+        rebuilt=bool(res.get("rebuilt")),
+        latency_ms=ms,
+        previous_latency_ms=previous_ms,
+        delta_ms=None if previous_ms is None else round(ms - previous_ms, 3),
+    ))
 
-        res = dict(res)
-        res["cached"] = False
-        return res
+@router.post("/sessions", dependencies=[RequireAPIKey], openapi_extra=_PROBLEM_BODY_DOC)
+@limit
+async def open_session_endpoint(request: Request, payload: ProblemInput = Depends(problem_from_request)):
+    """Register a problem for incremental re-solves; the session id is its problem_id."""
+    entry, res, ms = await _runner(request)(sessions.open_session, payload)
+    out = await _session_result(None, entry, res, ms, None)
+    sessions.registry.add(out["session_id"], entry)
+    return _respond(request, out)
+
+@router.patch("/sessions/{session_id}", dependencies=[RequireAPIKey])
+@limit
+async def patch_session_endpoint(request: Request, session_id: str, patch: SessionPatch):
+    entry = sessions.registry.get(session_id)
+    restored = entry is None
+    if restored:
+        # expired here, or opened on another worker: rebuild from the latest stored version
+        stored = await latest_session_problem_async(session_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        entry = sessions.registry.setdefault(session_id, await run_solve(sessions.restore_session, *stored))
+    async with entry.lock:
+        previous_ms = entry.latency_ms
+        res, ms = await run_solve(sessions.apply_patch, entry, patch)
+        entry.latency_ms = ms
+        if restored:
+            res = {**res, "rebuilt": True}
+        out = await _session_result(session_id, entry, res, ms, previous_ms)
+    return _respond(request, out)
+
+@router.delete("/sessions/{session_id}", dependencies=[RequireAPIKey])
+def close_session_endpoint(session_id: str):
+    popped = sessions.registry.pop(session_id) is not None
+    if not close_stored_session(session_id) and not popped:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"session_id": session_id, "closed": True}
 
 @router.get("/history", dependencies=[RequireAPIKey])
 def history(limit: int = 50, offset: int = 0):
-    from app.services.persistence import get_session
-    with get_session() as db:
-        rows = db.execute(
-            text("""
-                SELECT p.id as problem_id, p.spec_hash, p.created_at,
-                       s.id as solution_id, s.status, s.objective_value, s.duration_ms, s.cached, s.created_at as solved_at
-                FROM problems p
-                JOIN solutions s ON s.problem_id = p.id
-                ORDER BY p.created_at DESC
-                LIMIT :limit OFFSET :offset
-            """),
-            {"limit": limit, "offset": offset}
-        ).mappings().all()
-    return {"items": rows, "limit": limit, "offset": offset}
+    return {"items": get_history(limit, offset), "limit": limit, "offset": offset}
+
+@router.get("/export", dependencies=[RequireAPIKey])
+def export_history(
+    format: str = Query(default="ndjson", description="ndjson, csv or parquet (needs pyarrow)"),
+    since: Optional[datetime] = Query(default=None, description="solved at or after (UTC)"),
+    until: Optional[datetime] = Query(default=None, description="solved before (UTC)"),
+    status: Optional[str] = Query(default=None, description="comma-separated statuses to keep"),
+    include_solution: bool = False,
+):
+    """The whole history in one streamed response, oldest solve first; see app/services/export.py."""
+    statuses = [s.strip() for s in (status or "").split(",") if s.strip()]
+    try:
+        body = export.stream(format, since, until, statuses, include_solution)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return StreamingResponse(
+        body,
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="history.{format}"'},
+    )
+
+@router.get("/stats", dependencies=[RequireAPIKey])
+def stats_endpoint(
+    granularity: str = Query(default="hour", pattern="^(minute|hour)$"),
+    since: Optional[datetime] = Query(default=None, description="default: 24 hours before until (UTC)"),
+    until: Optional[datetime] = Query(default=None, description="default: now (UTC)"),
+    status: Optional[str] = None,
+    solver: Optional[str] = None,
+):
+    """Counts, cache hit ratio and duration percentiles per bucket, from the rollups in app/services/stats.py."""
+    until = until or datetime.utcnow()
+    since = since or until - timedelta(hours=24)
+    flush_touches()  # cache hits counted since the last flush
+    with shard_sessions() as dbs:
+        return solve_stats.query(dbs, granularity, since, until, status=status, solver=solver)
+
+
+_PROBLEM_FIELDS = ("id", "spec_hash", "payload_json", "created_at")
+_SOLUTION_FIELDS = ("id", "problem_id", "status", "objective_value", "solution_json",
+                    "duration_ms", "cached", "created_at", "duals", "reduced_costs")
+_FIELDS_QUERY = Query(default=None, description="Comma-separated subset of fields to return")
 
 
 @router.get("/problems/{problem_id}", dependencies=[RequireAPIKey])
-def get_problem(problem_id: str):
-    from app.services.persistence import get_session
-    with get_session() as db:
-        row = db.execute(
-            text("SELECT id, spec_hash, payload_json, created_at FROM problems WHERE id=:id"),
-            {"id": problem_id}
-        ).mappings().first()
-    if not row:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=404, detail="Not found")
-    return row
+def get_problem(problem_id: str, request: Request, fields: Optional[str] = _FIELDS_QUERY):
+    cols = parse_fields(fields, _PROBLEM_FIELDS) or list(_PROBLEM_FIELDS)
+    want_npz = is_npz(request.headers.get("accept"))
+    with session_for_id("problems", problem_id) as db:
+        shash = db.execute(text("SELECT spec_hash FROM problems WHERE id=:id"), {"id": problem_id}).scalar()
+        if shash is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        # problems are immutable: answer revalidations before reading the payload
+        etag = make_etag("problem", problem_id, shash, "npz" if want_npz else ",".join(cols))
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        blob = None
+        if want_npz:
+            blob = db.execute(
+                text("SELECT payload_npz FROM problems WHERE id=:id"), {"id": problem_id}
+            ).scalar()
+        if blob is None:
+            row = db.execute(
+                text(f"SELECT {', '.join(cols)} FROM problems WHERE id=:id"), {"id": problem_id}
+            ).mappings().first()
+    if blob is not None:
+        return cached_response(request, etag, blob, NPZ_MEDIA_TYPE)
+    return json_response(request, etag, dict(row))
 
 
 @router.get("/solutions/{solution_id}", dependencies=[RequireAPIKey])
-def get_solution(solution_id: str):
-    from app.services.persistence import get_session
-    with get_session() as db:
+def get_solution(solution_id: str, request: Request, fields: Optional[str] = _FIELDS_QUERY):
+    cols = parse_fields(fields, _SOLUTION_FIELDS) or list(_SOLUTION_FIELDS)
+    with session_for_id("solutions", solution_id) as db:
+        if db.execute(text("SELECT 1 FROM solutions WHERE id=:id"), {"id": solution_id}).scalar() is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        etag = make_etag("solution", solution_id, ",".join(cols))
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        want_duals = "duals" in cols or "reduced_costs" in cols
+        sql_cols = [c for c in cols if c not in ("duals", "reduced_costs")] + (["duals_npz"] if want_duals else [])
         row = db.execute(
-            text("SELECT id, problem_id, status, objective_value, solution_json, duration_ms, cached, created_at FROM solutions WHERE id=:id"),
-            {"id": solution_id}
+            text(f"SELECT {', '.join(sql_cols)} FROM solutions WHERE id=:id"), {"id": solution_id}
         ).mappings().first()
-    if not row:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=404, detail="Not found")
-    return row
+    out = dict(row)
+    if want_duals:
+        duals, reduced_costs = decode_duals(out.pop("duals_npz"))
+        out.update({k: v for k, v in (("duals", duals), ("reduced_costs", reduced_costs)) if k in cols})
+    return json_response(request, etag, {c: out[c] for c in cols})
+
+@router.get("/solutions/{solution_id}/trace", dependencies=[RequireAPIKey])
+def get_solution_trace(
+    solution_id: str,
+    request: Request,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=5000),
+):
+    """Per-iteration objective and residuals of a traced solve, ``limit`` rows from ``offset``."""
+    want_npz = is_npz(request.headers.get("accept"))
+    with session_for_id("solutions", solution_id) as db:
+        has_trace = db.execute(
+            text("SELECT trace_npz IS NOT NULL FROM solutions WHERE id=:id"), {"id": solution_id}
+        ).scalar()
+        if has_trace is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        if not has_trace:
+            raise HTTPException(status_code=404, detail="No trace recorded for this solution")
+        etag = make_etag("trace", solution_id, "npz" if want_npz else f"{offset}:{limit}")
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        blob = db.execute(text("SELECT trace_npz FROM solutions WHERE id=:id"), {"id": solution_id}).scalar()
+    if want_npz:
+        return cached_response(request, etag, blob, NPZ_MEDIA_TYPE)
+    trace = decode_trace(blob)
+    page = trace["data"][offset:offset + limit].astype(np.float64)
+    return json_response(request, etag, {
+        "solution_id": solution_id,
+        "solver": trace["solver"],
+        "columns": trace["columns"],
+        "total": int(trace["data"].shape[0]),
+        "offset": offset,
+        "limit": limit,
+        "rows": [[None if np.isnan(v) else float(v) for v in r] for r in page],
+    })
+
+@router.get("/solutions/{solution_id}/profile", dependencies=[RequireAPIKey])
+def get_solution_profile(
+    solution_id: str,
+    request: Request,
+    format: str = Query(default="speedscope", pattern="^(speedscope|pstats|top)$"),
+):
+    """cProfile stats of an ``X-Profile: 1`` solve: speedscope JSON, raw pstats, or the top functions."""
+    with session_for_id("solutions", solution_id) as db:
+        row = find_profile(db, solution_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="No profile recorded for this solution")
+    etag = make_etag("profile", row["id"], format)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    if format == "pstats":
+        resp = cached_response(request, etag, pstats_bytes(row["stats_blob"]), "application/octet-stream")
+        resp.headers["Content-Disposition"] = f'attachment; filename="{solution_id}.pstats"'
+        return resp
+    if format == "top":
+        return json_response(request, etag, {
+            "solution_id": solution_id, "wall_ms": row["wall_ms"], "functions": top_functions(row["stats_blob"]),
+        })
+    return json_response(request, etag, speedscope(row["stats_blob"], f"solve {solution_id}"))
+
+@router.get("/metrics", dependencies=[RequireAPIKey], response_class=PlainTextResponse)
+def metrics_endpoint():
+    cache = get_result_cache().stats()
+    return metrics.render({
+        "result_cache_hits": cache["hits"],
+        "result_cache_misses": cache["misses"],
+        "log_records_dropped": dropped_records(),
+        **workspace_stats(),
+    })
 
 @router.get("/health")
 def health():
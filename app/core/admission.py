@@ -0,0 +1,203 @@
+# app/core/admission.py
+"""
+Admission control by problem size.
+
+Two steps, both before the body is parsed into Python objects:
+
+  - ``BodyLimitMiddleware`` refuses bodies over MAX_BODY_BYTES with 413,
+    from Content-Length when it is sent and by counting otherwise, so an
+    oversized upload is never buffered whole
+  - ``admit`` scans the body for the problem's dimensions (the spans of the
+    JSON arrays, or the .npy headers inside an npz) and estimates the peak
+    memory of parsing and solving it; over MAX_PROBLEM_MB is a 413, over
+    LARGE_PROBLEM_MB routes the parse and the solve to the large-problem
+    pool (app/services/executor.py) so small requests keep their slots
+
+JSON and npz bodies carry dense matrices, so the estimate counts entries,
+not nonzeros. The per-entry costs were measured on dense LPs (Clarabel):
+about 72 bytes per entry to parse JSON into ProblemInput, 8 for npz, and
+about 200 for the solve itself.
+
+/sweep and /visualize bodies wrap the problem (``{"problem": {...}}``) and
+are scanned the same way. A sweep also parses its scenario rows, keeps a
+result row per scenario and holds one model per worker process, so its
+estimate grows with the number of scenarios and workers.
+"""
+from __future__ import annotations
+
+import io
+import json
+import re
+import zipfile
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.codec import is_npz
+
+PARSE_BYTES_PER_ENTRY = {"json": 72, "npz": 8}
+SOLVE_BYTES_PER_ENTRY = 200
+
+_MATRICES = ("A", "A_eq", "Q")
+_SCENARIOS = ("c_scenarios", "b_scenarios")
+_KEY = re.compile(rb'"(c|A|A_eq|Q|c_scenarios|b_scenarios)"\s*:\s*')
+_WORKERS = re.compile(rb'"workers"\s*:\s*(\d+)')
+_EMPTY = re.compile(rb"\[\s*\]")
+_MATRIX_END = re.compile(rb"\]\s*\]")
+
+
+@dataclass
+class ProblemSize:
+    variables: int
+    constraints: int
+    entries: int        # matrix entries in A, A_eq and Q
+    est_mb: float       # estimated peak memory of parsing and solving
+    large: bool
+    scenarios: int = 0  # sweeps: rows of c_scenarios / b_scenarios
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _json_dims(body: bytes) -> dict:
+    """(rows, entries) per field from the raw JSON, without building values."""
+    dims: dict = {}
+    for m in _KEY.finditer(body):
+        name, pos = m.group(1).decode(), m.end()
+        if name in dims or body[pos:pos + 1] != b"[":
+            continue
+        if _EMPTY.match(body, pos):
+            dims[name] = (0, 0)
+            continue
+        if name == "c":
+            end = body.find(b"]", pos)
+            dims[name] = (1, body.count(b",", pos, end) + 1) if end > 0 else (0, 0)
+            continue
+        end_m = _MATRIX_END.search(body, pos)
+        if end_m is None:
+            continue
+        # k entries in r rows are separated by k - 1 commas, rows included
+        rows = body.count(b"[", pos + 1, end_m.end())
+        dims[name] = (rows, body.count(b",", pos, end_m.end()) + 1)
+    return dims
+
+
+def _npz_dims(body: bytes) -> dict:
+    """Shapes from the .npy headers of an npz, without reading the data."""
+    dims: dict = {}
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if name not in ("c",) + _MATRICES:
+                continue
+            with zf.open(info) as f:
+                major, _ = np.lib.format.read_magic(f)
+                read_header = np.lib.format.read_array_header_1_0 if major == 1 else np.lib.format.read_array_header_2_0
+                shape, _, _ = read_header(f)
+            rows = shape[0] if len(shape) == 2 else 1
+            dims[name] = (rows, int(np.prod(shape)) if shape else 1)
+    return dims
+
+
+def estimate(content_type: Optional[str], body: bytes) -> Optional[ProblemSize]:
+    """Size of the problem in ``body``; None when it cannot be scanned (the parser will say why)."""
+    kind = "npz" if is_npz(content_type) else "json"
+    try:
+        dims = _npz_dims(body) if kind == "npz" else _json_dims(body)
+    except Exception:
+        return None
+    entries = sum(dims.get(name, (0, 0))[1] for name in _MATRICES)
+    variables = dims.get("c", (0, 0))[1]
+    constraints = dims.get("A", (0, 0))[0] + dims.get("A_eq", (0, 0))[0]
+    scenarios = max((dims.get(name, (0, 0))[0] for name in _SCENARIOS), default=0)
+    scenario_entries = sum(dims.get(name, (0, 0))[1] for name in _SCENARIOS)
+    models = 1
+    if scenarios:
+        m = _WORKERS.search(body)
+        models = max(1, min(int(m.group(1)) if m else 1, settings.SWEEP_MAX_WORKERS, scenarios))
+    est = (len(body) + (entries + scenario_entries) * PARSE_BYTES_PER_ENTRY[kind]
+           + entries * SOLVE_BYTES_PER_ENTRY * models + scenarios * variables * 8)
+    est_mb = est / 2**20
+    return ProblemSize(variables, constraints, entries, round(est_mb, 3),
+                       large=bool(settings.LARGE_PROBLEM_MB) and est_mb >= settings.LARGE_PROBLEM_MB,
+                       scenarios=scenarios)
+
+
+def admit(content_type: Optional[str], body: bytes) -> Optional[ProblemSize]:
+    """The problem's size, or 413 when it is over MAX_PROBLEM_MB."""
+    size = estimate(content_type, body)
+    if size is None:
+        return None
+    if settings.MAX_PROBLEM_MB and size.est_mb > settings.MAX_PROBLEM_MB:
+        metrics.inc("admission_rejected_total")
+        raise HTTPException(status_code=413, detail={
+            "message": f"Problem too large: about {size.est_mb:g} MB to solve, limit is {settings.MAX_PROBLEM_MB:g} MB",
+            **size.as_dict(),
+        })
+    if size.large:
+        metrics.inc("admission_large_total")
+    return size
+
+
+def _too_large(limit: int) -> HTTPException:
+    metrics.inc("admission_rejected_total")
+    return HTTPException(status_code=413, detail=f"Request body too large (limit {limit} bytes)")
+
+
+async def _send_413(send, limit: int) -> None:
+    body = json.dumps({"detail": _too_large(limit).detail}).encode()
+    await send({"type": "http.response.start", "status": 413,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+class BodyLimitMiddleware:
+    """413 for bodies over MAX_BODY_BYTES, before they are read (pure ASGI)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limit = settings.MAX_BODY_BYTES
+        if scope["type"] != "http" or not limit:
+            return await self.app(scope, receive, send)
+
+        length = dict(scope.get("headers") or ()).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            return await _send_413(send, limit)
+
+        # without Content-Length, count; past the limit answer 413 and tell the
+        # app the client went away (raising here would escape the app's
+        # handlers when a BaseHTTPMiddleware reads the body in its own task)
+        seen, started, refused = 0, False, False
+
+        async def counted():
+            nonlocal seen, refused
+            if refused:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                seen += len(message.get("body", b""))
+                if seen > limit and not started:
+                    refused = True
+                    await _send_413(send, limit)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded(message):
+            nonlocal started
+            if refused:
+                return
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, counted, guarded)
+        except Exception:
+            if not refused:
+                raise
@@ -0,0 +1,228 @@
+# app/core/capture.py
+"""
+Opt-in capture of /solve traffic for replay (python -m app.services.replay).
+
+With CAPTURE_DIR set, ``CaptureMiddleware`` keeps the body of a sample
+(CAPTURE_SAMPLE_RATE) of POST /solve requests, with the response status,
+timing and the result's status and objective. The request path only puts
+the raw bytes on a bounded queue; a writer thread sanitizes each entry and
+appends it as one JSON line to ``capture-<pid>.jsonl`` in CAPTURE_DIR,
+rotated at CAPTURE_ROTATE_MB and keeping CAPTURE_KEEP_FILES old files.
+
+Sanitizing keeps only what replay needs and nothing that identifies the
+caller or this deployment's data:
+
+  - no headers except Content-Type (API keys and client addresses never
+    reach the queue)
+  - query parameters other than ``use_cache`` are dropped
+  - ``options.warm_start_id`` is removed (it names a row of this database)
+  - bodies that do not parse as a problem are not written
+
+Bodies over CAPTURE_MAX_BODY_BYTES are not captured; entries the writer
+cannot keep up with are dropped and counted (capture_dropped_total).
+"""
+from __future__ import annotations
+
+import atexit
+import base64
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+_QUERY_KEEP = ("use_cache",)
+_RESULT_FIELDS = ("status", "objective_value", "cached")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue: Optional[queue.Queue] = None
+_dir: Optional[str] = None
+
+
+def _problem(content_type: str, body: bytes) -> Optional[dict]:
+    """The sanitized problem as JSON-able fields, or None if it does not parse."""
+    from app.models.schema import ProblemInput
+    from app.services.codec import decode_problem, encode_problem, is_npz
+
+    try:
+        if is_npz(content_type):
+            p = decode_problem(body)
+            if p.options is not None and p.options.warm_start_id:
+                p = p.model_copy(update={"options": p.options.model_copy(update={"warm_start_id": None})})
+            return {"problem_npz": base64.b64encode(encode_problem(p)).decode("ascii")}
+        ProblemInput.model_validate_json(body)
+        data = json.loads(body)
+    except Exception:
+        return None
+    opts = data.get("options")
+    if isinstance(opts, dict):
+        opts.pop("warm_start_id", None)
+    return {"problem": {k: v for k, v in data.items() if k in ProblemInput.model_fields}}
+
+
+def _result(content_type: str, body: bytes) -> Optional[dict]:
+    from app.services.codec import decode_arrays, is_npz
+
+    try:
+        if is_npz(content_type):
+            arrays = decode_arrays(body)
+            out = {k: arrays[k].item() for k in _RESULT_FIELDS if k in arrays}
+        else:
+            data = json.loads(body)
+            out = {k: data.get(k) for k in _RESULT_FIELDS}
+    except Exception:
+        return None
+    obj = out.get("objective_value")
+    if isinstance(obj, float) and obj != obj:
+        out["objective_value"] = None  # npz results carry NaN for "none"
+    return out
+
+
+def sanitize(entry: dict) -> Optional[dict]:
+    """The line written for a raw entry from the middleware; None to skip it."""
+    problem = _problem(entry["content_type"], entry["body"])
+    if problem is None:
+        return None
+    query = {k: v for k, v in entry["query"].items() if k in _QUERY_KEEP}
+    out = {
+        "ts": datetime.fromtimestamp(entry["t"], timezone.utc).isoformat().replace("+00:00", "Z"),
+        "t": entry["t"],
+        "method": entry["method"],
+        "path": entry["path"],
+        "query": query,
+        "content_type": entry["content_type"],
+        **problem,
+        "http_status": entry["status"],
+        "duration_ms": entry["duration_ms"],
+    }
+    if entry.get("response") is not None:
+        out["result"] = _result(entry["response_type"], entry["response"])
+    return out
+
+
+class _Formatter(logging.Formatter):
+    def format(self, record) -> str:
+        # RotatingFileHandler formats once to size the rollover and again to write
+        line = getattr(record, "line", None)
+        if line is None:
+            out = sanitize(record.entry)
+            line = record.line = "" if out is None else json.dumps(out, separators=(",", ":"))
+        return line
+
+
+class _Handler(logging.handlers.RotatingFileHandler):
+    def shouldRollover(self, record) -> bool:
+        # one line over CAPTURE_ROTATE_MB still goes to a fresh file, not an empty backup
+        if self.stream is not None and self.stream.tell() == 0:
+            return False
+        return bool(super().shouldRollover(record))
+
+    def emit(self, record) -> None:
+        if self.format(record):
+            super().emit(record)
+
+
+def _start(directory: str) -> None:
+    global _listener, _queue, _dir
+    os.makedirs(directory, exist_ok=True)
+    handler = _Handler(
+        os.path.join(directory, f"capture-{os.getpid()}.jsonl"),
+        maxBytes=int(settings.CAPTURE_ROTATE_MB * 2**20),
+        backupCount=settings.CAPTURE_KEEP_FILES,
+        encoding="utf-8",
+    )
+    handler.setFormatter(_Formatter())
+    _queue = queue.Queue(maxsize=max(1, settings.CAPTURE_QUEUE_SIZE))
+    _listener = logging.handlers.QueueListener(_queue, handler)
+    _listener.start()
+    _dir = directory
+
+
+def stop_capture() -> None:
+    """Write out what is queued, close the file and stop the writer thread."""
+    global _listener, _queue, _dir
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+    _listener = _queue = _dir = None
+
+
+atexit.register(stop_capture)
+
+
+def _enqueue(entry: dict) -> None:
+    if _dir != settings.CAPTURE_DIR:
+        stop_capture()
+        _start(settings.CAPTURE_DIR)
+    try:
+        _queue.put_nowait(logging.makeLogRecord({"entry": entry}))
+    except queue.Full:
+        metrics.inc("capture_dropped_total")
+
+
+class CaptureMiddleware:
+    """Hands sampled POST /solve requests and their outcome to the capture writer (pure ASGI)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.CAPTURE_DIR
+            or scope["method"] != "POST"
+            or scope["path"] != f"{settings.API_V1_STR}/solve"
+            or random.random() >= settings.CAPTURE_SAMPLE_RATE
+        ):
+            return await self.app(scope, receive, send)
+
+        limit = settings.CAPTURE_MAX_BODY_BYTES
+        headers = dict(scope.get("headers") or ())
+        request, response = [], []
+        sizes = {"request": 0, "response": 0}
+        state = {"status": 500, "response_type": ""}
+        t, t0 = time.time(), time.perf_counter()
+
+        async def _receive():
+            message = await receive()
+            if message["type"] == "http.request" and sizes["request"] <= limit:
+                chunk = message.get("body", b"")
+                sizes["request"] += len(chunk)
+                request.append(chunk)
+            return message
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["response_type"] = dict(message.get("headers") or ()).get(b"content-type", b"").decode()
+            elif message["type"] == "http.response.body" and sizes["response"] <= limit:
+                chunk = message.get("body", b"")
+                sizes["response"] += len(chunk)
+                response.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, _receive, _send)
+        finally:
+            if 0 < sizes["request"] <= limit:
+                _enqueue({
+                    "t": t,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))),
+                    "content_type": headers.get(b"content-type", b"").decode("latin-1"),
+                    "body": b"".join(request),
+                    "status": state["status"],
+                    "duration_ms": round((time.perf_counter() - t0) * 1000, 3),
+                    "response": b"".join(response) if sizes["response"] <= limit else None,
+                    "response_type": state["response_type"],
+                })
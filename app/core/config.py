@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List
 import json
 
 class Settings(BaseSettings):
@@ -9,6 +9,84 @@ class Settings(BaseSettings):
     ENV: str = "dev"
     ALLOWED_ORIGINS_RAW: str = "http://localhost:3000"
     TIMEOUT_SECONDS: int = 8
+    SWEEP_MAX_SCENARIOS: int = 1000
+    SWEEP_MAX_WORKERS: int = 4
+    PRELOAD_SOLVER: bool = True
+    DECOMPOSE_WORKERS: int = 4
+    # bound/activity checks before the model is built (solver/prechecks.py)
+    PRECHECKS: bool = True
+    PRECHECK_ROUNDS: int = 2
+    # solves run on this many threads; each gets SOLVE_THREADS BLAS/solver threads
+    # (0 = cores // SOLVE_CONCURRENCY, see app/services/executor.py)
+    SOLVE_CONCURRENCY: int = 4
+    SOLVE_THREADS: int = 0
+    # async routes run database work here when no async driver is installed
+    DB_THREADS: int = 4
+    # > 1 splits problems/solutions by spec_hash across this many SQLite files so
+    # writers of different problems take different locks (app/db/shards.py);
+    # sharded work always runs on the DB_THREADS pool
+    DB_SHARDS: int = 0
+    # admission control (app/core/admission.py): bodies over MAX_BODY_BYTES and problems
+    # estimated over MAX_PROBLEM_MB get 413; from LARGE_PROBLEM_MB they run on a
+    # separate pool of LARGE_SOLVE_CONCURRENCY threads (0 disables each limit)
+    MAX_BODY_BYTES: int = 128 * 2**20
+    MAX_PROBLEM_MB: float = 4096
+    LARGE_PROBLEM_MB: float = 256
+    LARGE_SOLVE_CONCURRENCY: int = 1
+    # live OSQP/Clarabel instances reused across solves with the same sparsity
+    # pattern (solver/workspaces.py), up to this much estimated memory; 0 disables
+    WORKSPACE_POOL_MB: int = 64
+    # record solver iteration traces unless a request sets options.trace
+    TRACE_SOLVES: bool = False
+    # GET /problems, /solutions: compress bodies at least this large (gzip, br if installed)
+    HTTP_COMPRESS_MIN_BYTES: int = 1024
+    # incremental sessions (app/services/sessions.py) held in memory per worker process;
+    # a worker without the session rebuilds it from the stored versions
+    SESSION_MAX: int = 64
+    SESSION_TTL_SECONDS: int = 1800
+    # /visualize limits: halfspaces in the chosen slice, contour grid points per axis,
+    # |lo| and |hi| of a box (larger ones overflow the geometry's products)
+    VIZ_MAX_HALFSPACES: int = 200
+    VIZ_MAX_GRID: int = 200
+    VIZ_MAX_BOX: float = 1e12
+    # rate-limit buckets and hot result cache shared by all workers (see app/core/shared_state.py)
+    SHARED_STATE_URL: str = "sqlite:///./data/shared_state.db"
+    RESULT_CACHE_TTL_SECONDS: int = 300
+    # memory:// only: values (hot results) kept at most, least recently set dropped first
+    SHARED_STATE_MAX_VALUES: int = 10000
+    # > 0 enables approximate cache matching on a grid of this relative size
+    FUZZY_CACHE_RTOL: float = 0.0
+    FUZZY_VERIFY_TOL: float = 1e-6
+    # retention (app/services/retention.py); 0 disables each policy
+    RETENTION_TTL_SECONDS: int = 0
+    RETENTION_MAX_DB_BYTES: int = 0
+    RETENTION_MAX_ROWS_PER_HASH: int = 0
+    RETENTION_INTERVAL_SECONDS: int = 0
+    RETENTION_BATCH: int = 500
+    # cache hits refresh last_hit_at in one batched write at most this often (0: on every hit)
+    TOUCH_FLUSH_SECONDS: float = 5.0
+    # incremental_vacuum pages freed per transaction, so writers wait for one chunk at most
+    RETENTION_VACUUM_PAGES: int = 256
+    # logging (app/core/logging.py): records go through a bounded queue to a writer thread;
+    # request summaries of successful requests are sampled per route
+    # ("/api/v1/health=0,/api/v1/solve=0.1" or a JSON object); errors and slow requests are always kept
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_SAMPLE_RATES_RAW: str = ""
+    LOG_SLOW_MS: float = 1000.0
+    # X-Profile: 1 requests must send this as X-Profile-Token; empty disables profiling
+    PROFILE_TOKEN: str = ""
+    # /export and python -m app.services.export: rows fetched and encoded per chunk
+    EXPORT_CHUNK_ROWS: int = 5000
+    # traffic capture for python -m app.services.replay (app/core/capture.py); empty CAPTURE_DIR disables
+    CAPTURE_DIR: str = ""
+    CAPTURE_SAMPLE_RATE: float = 1.0
+    CAPTURE_MAX_BODY_BYTES: int = 2**20
+    CAPTURE_ROTATE_MB: float = 64
+    CAPTURE_KEEP_FILES: int = 10
+    CAPTURE_QUEUE_SIZE: int = 1000
+    # /stats rollups: minute buckets older than this are dropped by retention (0 keeps them)
+    STATS_MINUTE_RETENTION_HOURS: int = 48
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
     DATABASE_URL: str = "sqlite:///./cvxviz.db"
 
@@ -24,4 +102,23 @@ class Settings(BaseSettings):
                 pass
         return [s.strip() for s in raw.split(",") if s.strip()]
 
+    @property
+    def LOG_SAMPLE_RATES(self) -> Dict[str, float]:
+        raw = (self.LOG_SAMPLE_RATES_RAW or "").strip()
+        if raw.startswith("{") and raw.endswith("}"):
+            try:
+                return {str(k): float(v) for k, v in json.loads(raw).items()}
+            except Exception:
+                return {}
+        rates = {}
+        for part in raw.split(","):
+            path, sep, rate = part.partition("=")
+            if not sep:
+                continue
+            try:
+                rates[path.strip()] = float(rate)
+            except ValueError:
+                pass
+        return rates
+
 settings = Settings()
@@ -0,0 +1,112 @@
+# app/core/http_cache.py
+"""
+Conditional GET for immutable records (stored problems, solutions, traces).
+
+Each response carries a strong ETag derived from what identifies the record
+(spec_hash / solution id) and the requested representation (fields, media
+type), plus ``Cache-Control: private, immutable``; a matching If-None-Match
+gets a 304 before the large columns are read. Bodies of at least
+HTTP_COMPRESS_MIN_BYTES are compressed with br (if the ``brotli`` package is
+installed) or gzip, as the client accepts. The encoding is appended to the
+ETag ("...-gzip"), and If-None-Match matches any encoding of the same
+record, since the decoded bytes are identical.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+try:
+    import brotli
+    HAVE_BROTLI = True
+except Exception:
+    brotli = None
+    HAVE_BROTLI = False
+
+# authenticated responses: browsers may keep them, shared caches may not
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+_ENCODINGS = ("br", "gzip")
+
+
+def make_etag(*parts) -> str:
+    h = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{h[:32]}"'
+
+
+def _variants(etag: str) -> set[str]:
+    base = etag.strip('"')
+    return {etag} | {f'"{base}-{enc}"' for enc in _ENCODINGS}
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    variants = _variants(etag)
+    # weak comparison, as RFC 9110 prescribes for If-None-Match
+    return any(tag.strip().removeprefix("W/") in variants for tag in header.split(","))
+
+
+def _headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept, Accept-Encoding"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=_headers(etag))
+
+
+def _pick_encoding(request: Request) -> Optional[str]:
+    accepted = set()
+    for part in (request.headers.get("accept-encoding") or "").split(","):
+        name, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    if HAVE_BROTLI and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def cached_response(request: Request, etag: str, body: bytes, media_type: str) -> Response:
+    headers = _headers(etag)
+    encoding = _pick_encoding(request) if len(body) >= settings.HTTP_COMPRESS_MIN_BYTES else None
+    if encoding == "br":
+        body = brotli.compress(body)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=6)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = f'"{etag.strip(chr(34))}-{encoding}"'
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def json_response(request: Request, etag: str, obj) -> Response:
+    body = JSONResponse(jsonable_encoder(obj)).body
+    return cached_response(request, etag, body, "application/json")
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[list[str]]:
+    """``?fields=a,b`` as a list in ``allowed`` order (None: all fields); 422 on unknown names."""
+    if not fields:
+        return None
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(wanted.difference(allowed))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    return [f for f in allowed if f in wanted]
@@ -20,9 +20,12 @@ def _key_from_request(request):
 try:
     from slowapi import Limiter, _rate_limit_exceeded_handler as _rl_handler
     from slowapi.errors import RateLimitExceeded as _RLE
+    from app.core import shared_state as _shared_state  # registers the sqlite:// limits storage
+    from app.core.config import settings
 
     HAVE_SLOWAPI = True
-    limiter = Limiter(key_func=_key_from_request)
+    # buckets live in the shared backend so the limit holds across all workers
+    limiter = Limiter(key_func=_key_from_request, storage_uri=settings.SHARED_STATE_URL)
     _rate_limit_exceeded_handler = _rl_handler
     RateLimitExceeded = _RLE
 except Exception:
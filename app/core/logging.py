@@ -1,17 +1,170 @@
-import logging, sys, structlog
+"""
+Logging setup and the per-request summary record.
 
-def setup_logging():
+Records are rendered to JSON and written by a background thread: the
+request path only puts them on a bounded queue (LOG_QUEUE_SIZE), and when
+the writer falls behind, records are dropped and counted rather than
+blocking the caller.
+
+``RequestSummaryMiddleware`` emits one "request" record per HTTP request
+(method, route, status, duration) plus whatever the handler added with
+``note()`` / ``phase()`` (spec hash, cache outcome, phase timings,
+solver). Summaries of successful requests are sampled per route
+(LOG_SAMPLE_RATE, LOG_SAMPLE_RATES_RAW); errors and requests slower than
+LOG_SLOW_MS are always kept.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+import structlog
+
+from app.core.config import settings
+
+_log = structlog.get_logger("app.request")
+_summary: ContextVar[Optional[dict]] = ContextVar("request_summary", default=None)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller; rendering is left to the writer thread."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _record_time(_, __, event_dict):
+    # stamped when the record was made, not when the writer got to it
+    created = event_dict["_record"].created
+    event_dict["timestamp"] = datetime.fromtimestamp(created, timezone.utc).isoformat().replace("+00:00", "Z")
+    return event_dict
+
+
+def setup_logging(stream=None) -> None:
+    global _listener
     timestamper = structlog.processors.TimeStamper(fmt="iso")
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
             timestamper,
             structlog.processors.add_log_level,
+            # resolve exc_info here: the writer thread has no current exception
             structlog.processors.dict_tracebacks,
-            structlog.processors.JSONRenderer(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         logger_factory=structlog.stdlib.LoggerFactory(),
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
-    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    formatter = structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.JSONRenderer(),
+        ],
+        # records from plain logging.getLogger() loggers
+        foreign_pre_chain=[_record_time, structlog.stdlib.add_log_level, structlog.processors.dict_tracebacks],
+    )
+    out = logging.StreamHandler(stream or sys.stdout)
+    out.setFormatter(formatter)
+
+    root = logging.getLogger()
+    stop_logging()
+    for h in [h for h in root.handlers if isinstance(h, _QueueHandler)]:
+        root.removeHandler(h)
+    q: queue.Queue = queue.Queue(maxsize=max(1, settings.LOG_QUEUE_SIZE))
+    root.addHandler(_QueueHandler(q))
+    root.setLevel(logging.INFO)
+    _listener = logging.handlers.QueueListener(q, out, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Write out what is queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def dropped_records() -> int:
+    return sum(h.dropped for h in logging.getLogger().handlers if isinstance(h, _QueueHandler))
+
+
+# ---------- Per-request summary ----------
+def note(**fields) -> None:
+    """Add ``fields`` to the current request's summary record (no-op outside a request)."""
+    summary = _summary.get()
+    if summary is not None:
+        summary.update(fields)
+
+
+@contextmanager
+def phase(name: str):
+    """Time the block into the summary's ``phases`` as ``name`` (ms)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        summary = _summary.get()
+        if summary is not None:
+            summary.setdefault("phases", {})[name] = round((time.perf_counter() - t0) * 1000, 3)
+
+
+def keep_summary(route: str, status: int, duration_ms: float, rates: dict) -> bool:
+    if status >= 400 or duration_ms >= settings.LOG_SLOW_MS:
+        return True
+    rate = rates.get(route, settings.LOG_SAMPLE_RATE)
+    return rate >= 1 or random.random() < rate
+
+
+class RequestSummaryMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.rates = settings.LOG_SAMPLE_RATES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        summary: dict = {}
+        token = _summary.set(summary)
+        status = 500
+        t0 = time.perf_counter()
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _summary.reset(token)
+            ms = round((time.perf_counter() - t0) * 1000, 3)
+            # the route template (set by the router), so path parameters share a rate
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            if keep_summary(route, status, ms, self.rates):
+                level = "error" if status >= 500 else "warning" if status >= 400 else "info"
+                fields = {**summary, "method": scope["method"], "route": route, "status": status, "duration_ms": ms}
+                getattr(_log, level)("request", **fields)
@@ -0,0 +1,42 @@
+# app/core/metrics.py
+"""
+Process-local counters and gauges, exposed in Prometheus text format at
+/metrics. Names follow Prometheus conventions (``*_total`` for counters).
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+
+    def inc(self, name: str, value: float = 1.0) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0.0) + value
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = float(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {**self._counters, **self._gauges}
+
+    def render(self, extra_gauges: Dict[str, float] | None = None) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = {**self._gauges, **(extra_gauges or {})}
+        lines = []
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            for name in sorted(values):
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {values[name]:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,132 @@
+# app/core/profiling.py
+"""
+On-demand profiling of a single /solve.
+
+A request with ``X-Profile: 1`` and ``X-Profile-Token: <PROFILE_TOKEN>``
+bypasses the caches and runs parsing and the solve under cProfile, in one
+solve-pool thread. The stats are stored next to the solution and served
+from ``/solutions/{id}/profile`` as pstats (``pstats.Stats(path)``,
+snakeviz) or speedscope JSON. Without the header, nothing is set up.
+
+Profiles are taken one at a time per process: the profiler hooks are
+process-wide on newer Pythons, and a second profiled request waits.
+"""
+from __future__ import annotations
+
+import cProfile
+import marshal
+import pstats
+import threading
+import zlib
+from typing import Callable
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+
+_lock = threading.Lock()
+
+
+def wants_profile(request: Request) -> bool:
+    """True for an authorized ``X-Profile: 1`` request; 403 if the token is missing or wrong."""
+    if request.headers.get("x-profile") != "1":
+        return False
+    if not settings.PROFILE_TOKEN or request.headers.get("x-profile-token") != settings.PROFILE_TOKEN:
+        raise HTTPException(status_code=403, detail="Profiling needs a valid X-Profile-Token")
+    return True
+
+
+def run_profiled(fn: Callable, *args, **kwargs) -> tuple:
+    """``(fn(*args, **kwargs), stats_blob)``; blocks while another profile runs."""
+    with _lock:
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            out = fn(*args, **kwargs)
+        finally:
+            prof.disable()
+    return out, encode_stats(prof)
+
+
+def encode_stats(prof: cProfile.Profile) -> bytes:
+    # marshal of the stats dict is what pstats.Stats.dump_stats writes
+    return zlib.compress(marshal.dumps(pstats.Stats(prof).stats))
+
+
+def pstats_bytes(blob: bytes) -> bytes:
+    return zlib.decompress(blob)
+
+
+def speedscope(blob: bytes, name: str, min_fraction: float = 1e-4, max_depth: int = 200) -> dict:
+    """
+    The profile as a speedscope "sampled" profile.
+
+    cProfile keeps caller -> callee totals rather than stacks, so stacks are
+    rebuilt from the roots down, splitting each function's time between its
+    callees in proportion to the edge times (as flame graphs of pstats do);
+    recursion is cut at the first repeat and paths under ``min_fraction`` of
+    the total are dropped.
+    """
+    stats = marshal.loads(pstats_bytes(blob))
+    callees: dict = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [f for f, row in stats.items() if not row[4]]
+    total = sum(stats[f][3] for f in roots) or 1e-12
+    floor = total * min_fraction
+
+    frames: list = []
+    index: dict = {}
+
+    def frame(func) -> int:
+        if func not in index:
+            file, line, fname = func
+            index[func] = len(frames)
+            frames.append({"name": fname, "file": file, "line": line} if file != "~" else {"name": fname})
+        return index[func]
+
+    samples, weights = [], []
+
+    def walk(func, t: float, path: list) -> None:
+        _, _, tt, ct, _ = stats[func]
+        path = path + [frame(func)]
+        share = t / ct if ct > 0 else 0.0
+        if tt * share > 0:
+            samples.append(path)
+            weights.append(tt * share)
+        if len(path) >= max_depth:
+            return
+        for callee, edge_ct in callees.get(func, ()):
+            if index.get(callee) in path or edge_ct * share < floor:
+                continue
+            walk(callee, edge_ct * share, path)
+
+    for root in sorted(roots, key=lambda f: -stats[f][3]):
+        if stats[root][3] >= floor:
+            walk(root, stats[root][3], [])
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "cvxviz",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+def top_functions(blob: bytes, limit: int = 20) -> list:
+    """The ``limit`` functions with the largest cumulative time, for a quick look."""
+    stats = marshal.loads(pstats_bytes(blob))
+    rows = sorted(stats.items(), key=lambda kv: -kv[1][3])[:limit]
+    return [
+        {"function": f"{file}:{line}({fname})", "calls": nc, "tottime": tt, "cumtime": ct}
+        for (file, line, fname), (_, nc, tt, ct, _) in rows
+    ]
@@ -0,0 +1,367 @@
+# app/core/shared_state.py
+"""
+State that must be shared by every worker process: rate-limit buckets and
+the hot /solve result cache.
+
+The backend is chosen by ``SHARED_STATE_URL``:
+
+  - ``sqlite:///path``  one SQLite file (WAL) on local disk; the default,
+                        enough for several workers on one host
+  - ``redis://...``     any Redis-compatible server (needs the ``redis`` package)
+  - ``memory://``       per-process only; for tests and single-worker runs
+
+All counters are updated with a single atomic statement (UPSERT ...
+RETURNING on SQLite, a Lua script doing INCRBY and EXPIRE on Redis), so
+concurrent workers never lose increments and a counter never outlives its
+window.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    import redis
+    HAVE_REDIS = True
+except Exception:
+    redis = None
+    HAVE_REDIS = False
+
+try:
+    from limits.storage import Storage as _LimitsStorage
+    HAVE_LIMITS = True
+except Exception:
+    _LimitsStorage = object
+    HAVE_LIMITS = False
+
+from app.core.config import settings
+
+
+def _sqlite_path(url: str) -> str:
+    path = url.split("://", 1)[1]
+    return path[1:] if path.startswith("/") else path
+
+
+class SQLiteStore:
+    """Counters and values with expiry in one SQLite file, safe across processes."""
+
+    _PURGE_EVERY_S = 60.0
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._local = threading.local()
+        self._last_purge = 0.0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters "
+                "(key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # autocommit: every statement below is its own atomic transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _maybe_purge(self, now: float) -> None:
+        if now - self._last_purge < self._PURGE_EVERY_S:
+            return
+        self._last_purge = now
+        conn = self._conn()
+        conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+        conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def incr(self, key: str, expiry: Optional[float] = None, amount: int = 1) -> int:
+        """Add ``amount``; a counter that has expired restarts from zero with a new expiry."""
+        now = time.time()
+        self._maybe_purge(now)
+        row = self._conn().execute(
+            """
+            INSERT INTO counters (key, value, expires_at) VALUES (:k, :a, :exp)
+            ON CONFLICT(key) DO UPDATE SET
+              value = CASE WHEN counters.expires_at <= :now
+                           THEN excluded.value ELSE counters.value + excluded.value END,
+              expires_at = CASE WHEN counters.expires_at <= :now
+                                THEN excluded.expires_at ELSE counters.expires_at END
+            RETURNING value
+            """,
+            {"k": key, "a": amount, "exp": None if expiry is None else now + expiry, "now": now},
+        ).fetchone()
+        return int(row[0])
+
+    def get_counter(self, key: str) -> int:
+        row = self._conn().execute(
+            "SELECT value FROM counters WHERE key=? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def counter_expiry(self, key: str) -> float:
+        row = self._conn().execute("SELECT expires_at FROM counters WHERE key=?", (key,)).fetchone()
+        return float(row[0]) if row and row[0] is not None else time.time()
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key=? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        self._maybe_purge(now)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, None if ttl is None else now + ttl),
+        )
+
+    def delete(self, key: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM counters WHERE key=?", (key,))
+        conn.execute("DELETE FROM kv WHERE key=?", (key,))
+
+    def clear(self) -> int:
+        conn = self._conn()
+        n = conn.execute("DELETE FROM counters").rowcount
+        conn.execute("DELETE FROM kv")
+        return n
+
+
+class MemoryStore:
+    """
+    Same interface as SQLiteStore, in this process only. Expired entries are
+    purged on write (at most once a minute) and past ``max_values`` values
+    the least recently set go first.
+    """
+
+    _PURGE_EVERY_S = 60.0
+
+    def __init__(self, max_values: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._counters: dict[str, tuple[int, Optional[float]]] = {}
+        self._kv: OrderedDict[str, tuple[bytes, Optional[float]]] = OrderedDict()
+        self._max_values = settings.SHARED_STATE_MAX_VALUES if max_values is None else max_values
+        self._last_purge = 0.0
+
+    @staticmethod
+    def _live(entry, now):
+        return entry is not None and (entry[1] is None or entry[1] > now)
+
+    def _maybe_purge(self, now: float) -> None:
+        # callers hold self._lock
+        if now - self._last_purge < self._PURGE_EVERY_S:
+            return
+        self._last_purge = now
+        for table in (self._counters, self._kv):
+            for key in [k for k, e in table.items() if not self._live(e, now)]:
+                del table[key]
+
+    def incr(self, key: str, expiry: Optional[float] = None, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            self._maybe_purge(now)
+            entry = self._counters.get(key)
+            if not self._live(entry, now):
+                entry = (0, None if expiry is None else now + expiry)
+            entry = (entry[0] + amount, entry[1])
+            self._counters[key] = entry
+            return entry[0]
+
+    def get_counter(self, key: str) -> int:
+        entry = self._counters.get(key)
+        return entry[0] if self._live(entry, time.time()) else 0
+
+    def counter_expiry(self, key: str) -> float:
+        entry = self._counters.get(key)
+        return entry[1] if entry and entry[1] is not None else time.time()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._kv.get(key)
+        return entry[0] if self._live(entry, time.time()) else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._maybe_purge(now)
+            self._kv.pop(key, None)
+            self._kv[key] = (value, None if ttl is None else now + ttl)
+            while self._max_values and len(self._kv) > self._max_values:
+                self._kv.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+            self._kv.pop(key, None)
+
+    def clear(self) -> int:
+        with self._lock:
+            n = len(self._counters)
+            self._counters.clear()
+            self._kv.clear()
+            return n
+
+
+# INCRBY and the window's expiry in one step; a key found without a TTL
+# (-1) gets one too, so no counter can be left throttling forever
+_REDIS_INCR = """
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if ARGV[2] ~= '' and redis.call('PTTL', KEYS[1]) == -1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return value
+"""
+
+
+class RedisStore:
+    """Same interface as SQLiteStore, on a Redis-compatible server, under keys starting with ``prefix``."""
+
+    def __init__(self, url: str, prefix: str = "cvxviz:"):
+        if not HAVE_REDIS:
+            raise RuntimeError("SHARED_STATE_URL is redis:// but the 'redis' package is not installed")
+        self._r = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._incr = self._r.register_script(_REDIS_INCR)
+
+    def _key(self, key: str) -> str:
+        return self._prefix + key
+
+    def incr(self, key: str, expiry: Optional[float] = None, amount: int = 1) -> int:
+        ms = "" if expiry is None else str(max(1, int(expiry * 1000)))
+        return int(self._incr(keys=[self._key(key)], args=[amount, ms]))
+
+    def get_counter(self, key: str) -> int:
+        return int(self._r.get(self._key(key)) or 0)
+
+    def counter_expiry(self, key: str) -> float:
+        return time.time() + max(self._r.pttl(self._key(key)), 0) / 1000
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._r.get(self._key(key))
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._r.set(self._key(key), value, px=None if ttl is None else max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._r.delete(self._key(key))
+
+    def clear(self) -> int:
+        """Delete this store's keys only; the rest of the Redis database is left alone."""
+        n, batch = 0, []
+        for key in self._r.scan_iter(match=self._prefix.replace("*", r"\*") + "*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                n += int(self._r.delete(*batch))
+                batch = []
+        if batch:
+            n += int(self._r.delete(*batch))
+        return n
+
+
+def make_store(url: str):
+    scheme = url.split("://", 1)[0].lower()
+    if scheme == "memory":
+        return MemoryStore()
+    if scheme == "sqlite":
+        return SQLiteStore(_sqlite_path(url))
+    if scheme in ("redis", "rediss"):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported SHARED_STATE_URL scheme: {scheme}")
+
+
+class SQLiteLimiterStorage(_LimitsStorage):
+    """``limits`` storage backed by SQLiteStore, registered for ``sqlite://`` URIs."""
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        self._store = SQLiteStore(_sqlite_path(uri))
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return self._store.incr(f"limit:{key}", expiry, amount)
+
+    def get(self, key: str) -> int:
+        return self._store.get_counter(f"limit:{key}")
+
+    def get_expiry(self, key: str) -> float:
+        return self._store.counter_expiry(f"limit:{key}")
+
+    def check(self) -> bool:
+        try:
+            self._store._conn().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self._store.clear()
+
+    def clear(self, key: str) -> None:
+        self._store.delete(f"limit:{key}")
+
+
+class ResultCache:
+    """Hot /solve responses keyed by spec_hash, visible to every worker on the same backend."""
+
+    def __init__(self, store, ttl: float):
+        self.store = store
+        self.ttl = ttl
+
+    def get(self, h: str) -> Optional[dict]:
+        blob = self.store.get(f"result:{h}")
+        self.store.incr("result_cache:hits" if blob is not None else "result_cache:misses")
+        return json.loads(blob) if blob is not None else None
+
+    def put(self, h: str, res: dict) -> None:
+        self.store.set(f"result:{h}", json.dumps(res, separators=(",", ":")).encode("utf-8"), self.ttl)
+
+    def invalidate(self, hashes) -> None:
+        """Drop the entries of ``hashes``, e.g. after retention deleted their solutions."""
+        for h in hashes:
+            self.store.delete(f"result:{h}")
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.store.get_counter("result_cache:hits"),
+            "misses": self.store.get_counter("result_cache:misses"),
+        }
+
+
+_store = None
+_result_cache: Optional[ResultCache] = None
+_lock = threading.Lock()
+
+def get_store():
+    """The process-wide shared store for SHARED_STATE_URL."""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = make_store(settings.SHARED_STATE_URL)
+        return _store
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    store = get_store()
+    with _lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(store, settings.RESULT_CACHE_TTL_SECONDS)
+        return _result_cache
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Text, DateTime, Float, Integer, ForeignKey, Index
+from sqlalchemy import String, Text, DateTime, Float, Integer, ForeignKey, Index, LargeBinary, UniqueConstraint
 from datetime import datetime
 from .session import Base
 import uuid
@@ -10,7 +10,11 @@ class Problem(Base):
     __tablename__ = "problems"
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
     spec_hash: Mapped[str] = mapped_column(String(64), index=True)
+    fuzzy_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)  # FUZZY_CACHE_RTOL > 0
+    kind: Mapped[str | None] = mapped_column(String(16), nullable=True)  # None: a client solve; "block", "session"
+    parent_id: Mapped[str | None] = mapped_column(String(36), nullable=True, index=True)  # session patches: the session id
     payload_json: Mapped[str] = mapped_column(Text)
+    payload_npz: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)  # set for npz submissions
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 Index("ix_problems_spec_hash_created", Problem.spec_hash, Problem.created_at.desc())
@@ -24,4 +28,46 @@ class Solution(Base):
     solution_json: Mapped[str] = mapped_column(Text)
     duration_ms: Mapped[int] = mapped_column(Integer)
     cached: Mapped[int] = mapped_column(Integer, default=0)  # bool as 0/1
+    duals_npz: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)  # ineq, eq, reduced_costs
+    trace_npz: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)  # per-iteration residuals
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # retention: LRU order (creation, then every cache hit) and per-row TTL
+    last_hit_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True, default=datetime.utcnow)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+
+class Visualization(Base):
+    __tablename__ = "visualizations"
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
+    spec_hash: Mapped[str] = mapped_column(String(64))
+    params_hash: Mapped[str] = mapped_column(String(64))  # dims, fixed, box, grid, levels
+    payload_json: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+Index("ix_visualizations_key", Visualization.spec_hash, Visualization.params_hash)
+
+class Profile(Base):
+    __tablename__ = "profiles"
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
+    # no foreign key: retention deletes solutions without looking here
+    solution_id: Mapped[str] = mapped_column(String(36), index=True)
+    stats_blob: Mapped[bytes] = mapped_column(LargeBinary)  # zlib(marshal(pstats dict))
+    wall_ms: Mapped[float] = mapped_column(Float)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+class SolveStat(Base):
+    """Rollup row for /stats (app/services/stats.py); one per bucket, dimensions and duration bin."""
+    __tablename__ = "solve_stats"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    granularity: Mapped[str] = mapped_column(String(8))  # minute | hour
+    bucket_start: Mapped[datetime] = mapped_column(DateTime)
+    status: Mapped[str] = mapped_column(String(32))
+    cached: Mapped[int] = mapped_column(Integer)
+    solver: Mapped[str] = mapped_column(String(32))
+    bin: Mapped[int] = mapped_column(Integer)  # index into stats.DURATION_BINS_MS
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    duration_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    duration_max: Mapped[float] = mapped_column(Float, default=0.0)
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "status", "cached", "solver", "bin",
+                         name="uq_solve_stats_key"),
+    )
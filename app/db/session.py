@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import os
+from typing import Optional
+
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.pool import StaticPool
@@ -31,6 +33,37 @@ def _make_engine(url: str):
 engine = _make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+def _async_url(url: str) -> Optional[str]:
+    """The async-driver form of ``url`` (aiosqlite, asyncpg), or None if there is none."""
+    override = os.environ.get("ASYNC_DATABASE_URL")
+    if override:
+        return override
+    scheme, sep, rest = url.partition("://")
+    if not sep or "+" in scheme:
+        return None
+    if scheme == "sqlite":
+        # a separate in-memory database would not see the sync engine's tables
+        if not rest.strip("/") or ":memory:" in rest:
+            return None
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return None
+
+# async engine for code that awaits plain statements; needs greenlet and the
+# async driver. run_db stays on the sync engine in threads (see there).
+try:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    _url = _async_url(DATABASE_URL)
+    async_engine = create_async_engine(_url) if _url else None
+except Exception:
+    async_engine = None
+HAVE_ASYNC_DB = async_engine is not None
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    if HAVE_ASYNC_DB else None
+)
+
 @event.listens_for(engine, "connect")
 def _set_sqlite_pragmas(dbapi_conn, _):
     try:
@@ -41,8 +74,5 @@ def _set_sqlite_pragmas(dbapi_conn, _):
     except Exception:
         pass
 
-try:
-    from . import models as _models
-    Base.metadata.create_all(bind=engine)
-except Exception:
-    pass
+if HAVE_ASYNC_DB:
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
@@ -0,0 +1,84 @@
+# app/db/shards.py
+"""
+Optional hash sharding of the store across DB_SHARDS SQLite files.
+
+SQLite lets one writer at a time into a database file, WAL or not, so every
+worker's commits queue on the same lock however many workers there are.
+With DB_SHARDS > 1 the problems/solutions store is split by ``spec_hash``
+into that many files next to DATABASE_URL (``cvxviz.db`` becomes
+``cvxviz.shard0.db``, ``cvxviz.shard1.db``, ...), each with the full schema,
+so writers of different problems take different locks.
+
+Everything about a problem lives on its hash's shard: its rows in problems
+and solutions, its visualizations, the profiles of its solutions and the
+/stats rollups of its solves. Routing is in app/services/persistence.py;
+this module only owns the engines. The main database keeps what was
+stored before sharding was turned on, and lookups by id fall back to it.
+
+Changing DB_SHARDS moves hashes to other shards: what is stored stays
+readable by id and in /history, but cache lookups by hash miss until the
+problem is solved again.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import DATABASE_URL, _make_engine, _set_sqlite_pragmas
+
+_lock = threading.Lock()
+_engines: Optional[list] = None
+_sessions: list = []
+
+
+def shard_url(url: str, i: int) -> str:
+    """URL of shard ``i`` of the SQLite file database at ``url``."""
+    scheme, sep, path = url.partition(":///")
+    if not sep or not scheme.startswith("sqlite") or not path or ":memory:" in path:
+        raise ValueError(f"DB_SHARDS needs a SQLite file database, not {url!r}")
+    root, ext = os.path.splitext(path)
+    return f"{scheme}:///{root}.shard{i}{ext or '.db'}"
+
+
+def configure(n: int, url: Optional[str] = None) -> None:
+    """Use ``n`` shards of ``url`` (default DATABASE_URL); n <= 1 turns sharding off."""
+    global _engines, _sessions
+    with _lock:
+        for eng in _engines or ():
+            eng.dispose()
+        engines = []
+        for i in range(n if n > 1 else 0):
+            eng = _make_engine(shard_url(url or DATABASE_URL, i))
+            event.listen(eng, "connect", _set_sqlite_pragmas)
+            engines.append(eng)
+        _sessions = [sessionmaker(bind=eng, autoflush=False, autocommit=False) for eng in engines]
+        _engines = engines
+
+
+def engines() -> list:
+    """The shard engines, in shard order; empty when sharding is off."""
+    if _engines is None:
+        from app.core.config import settings
+        configure(settings.DB_SHARDS)
+    return _engines
+
+
+def count() -> int:
+    return len(engines())
+
+
+def for_hash(h: str) -> Optional[int]:
+    """Shard holding ``spec_hash`` ``h`` (by its leading hex digits), or None when unsharded."""
+    n = count()
+    if not n:
+        return None
+    return int(h[:8], 16) % n
+
+
+def session_factory(i: int) -> sessionmaker:
+    engines()
+    return _sessions[i]
@@ -1,10 +1,13 @@
+import threading
+
 from fastapi import FastAPI
-from app.db.session import engine, Base
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.api.v1.routes import router as v1_router
-from app.core.logging import setup_logging
+from app.core.admission import BodyLimitMiddleware
+from app.core.capture import CaptureMiddleware
+from app.core.logging import RequestSummaryMiddleware, setup_logging
 from app.core.errors import BadInput, bad_input_handler, timeout_handler
 
 from app.core.limiting import (
@@ -34,6 +37,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CaptureMiddleware)
+app.add_middleware(BodyLimitMiddleware)
+# outermost, so the summary covers rate-limited and failed requests too
+app.add_middleware(RequestSummaryMiddleware)
 
 
 app.add_exception_handler(BadInput, bad_input_handler)
@@ -41,11 +48,32 @@ app.add_exception_handler(TimeoutError, timeout_handler)
 
 @app.on_event("startup")
 def on_startup():
+    from app.services.executor import configure_threads
+    configure_threads()
     try:
         from app.services.persistence import create_tables
         create_tables()
     except Exception as e:
         import logging
         logging.getLogger(__name__).exception("DB init failed: %s", e)
+    if settings.PRELOAD_SOLVER:
+        # the solver stack takes seconds to import; load it off the event loop
+        # so /health answers immediately and the first /solve does not pay for it
+        from app.services.solver_interface import preload
+        threading.Thread(target=preload, name="solver-preload", daemon=True).start()
+    from app.services.retention import start_background
+    start_background()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    from app.services.retention import stop_background
+    stop_background()
+    from app.services.persistence import flush_touches
+    flush_touches()
+    from app.services.executor import shutdown
+    shutdown()
+    from app.db.session import HAVE_ASYNC_DB, async_engine
+    if HAVE_ASYNC_DB:
+        await async_engine.dispose()
 
 app.include_router(v1_router, prefix=settings.API_V1_STR)
\ No newline at end of file
@@ -1,16 +1,102 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Any, Dict, List, Optional, Tuple
+
+class SolveOptions(BaseModel):
+    """How to solve; never part of spec_hash."""
+    presolve: bool = Field(False, description="Reduce the problem before solving")
+    scale: bool = Field(False, description="Ruiz-equilibrate rows/columns before solving")
+    warm_start_id: Optional[str] = Field(
+        None, description="Solution id whose primal/dual values seed this solve"
+    )
+    decompose: bool = Field(
+        False, description="Solve independent blocks separately (in parallel, cached per block)"
+    )
+    trace: Optional[bool] = Field(
+        None, description="Record per-iteration residuals for GET /solutions/{id}/trace (default: TRACE_SOLVES)"
+    )
 
 class ProblemInput(BaseModel):
     c: List[Optional[float]] = Field(..., description="Objective vector")
     A: Optional[List[List[float]]] = None
     b: Optional[List[Optional[float]]] = None
+    A_eq: Optional[List[List[float]]] = None
+    b_eq: Optional[List[Optional[float]]] = None
     Q: Optional[List[List[float]]] = None
     bounds: Optional[List[Tuple[Optional[float], Optional[float]]]] = None
     sense: str = "minimize"
+    options: Optional[SolveOptions] = None
 
 class ProblemResult(BaseModel):
     status: str
     objective_value: Optional[float] = None
     solution: Optional[List[float]] = None
     message: Optional[str] = None
+    stats: Optional[Dict[str, Any]] = None
+    # "ineq" (Ax <= b), "eq" (A_eq x = b_eq), "lower"/"upper" (bounds), minimize form
+    duals: Optional[Dict[str, List[Optional[float]]]] = None
+    reduced_costs: Optional[List[Optional[float]]] = None
+    # iterations x solver.trace.TRACE_COLUMNS; persisted, not part of the response
+    _trace: Any = PrivateAttr(default=None)
+
+class SweepInput(BaseModel):
+    """One base problem re-solved once per row of c_scenarios and/or b_scenarios."""
+    problem: ProblemInput
+    c_scenarios: Optional[List[List[float]]] = Field(None, description="Rows replace c, one per scenario")
+    b_scenarios: Optional[List[List[float]]] = Field(None, description="Rows replace b, one per scenario")
+    workers: int = Field(1, ge=1, description="Processes to spread the scenarios over")
+    return_solutions: bool = False
+
+class SweepResult(BaseModel):
+    status: List[str]
+    objective_value: List[Optional[float]]
+    solutions: Optional[List[List[Optional[float]]]] = None
+    stats: Optional[Dict[str, Any]] = None
+
+
+class SessionPatch(BaseModel):
+    """Edits to a registered problem; applied in field order, then re-solved."""
+    remove_rows: Optional[List[int]] = Field(None, description="Rows of A to drop (indices before this patch)")
+    add_A: Optional[List[List[float]]] = Field(None, description="Rows appended to A")
+    add_b: Optional[List[float]] = Field(None, description="Right-hand sides of add_A")
+    b: Optional[List[Tuple[int, float]]] = Field(None, description="(row, value) updates to b, after removals/additions")
+    bounds: Optional[List[Tuple[int, Optional[float], Optional[float]]]] = Field(
+        None, description="(index, lb, ub) updates; None means unbounded"
+    )
+    c: Optional[List[float]] = Field(None, description="Replaces the objective vector")
+
+class SessionResult(ProblemResult):
+    session_id: str
+    problem_id: Optional[str] = None
+    solution_id: Optional[str] = None
+    version: int = 0
+    rebuilt: bool = False
+    latency_ms: float
+    previous_latency_ms: Optional[float] = None
+    delta_ms: Optional[float] = None
+
+class VisualizeInput(BaseModel):
+    """Feasible region and objective levels of a problem in 2 or 3 of its variables."""
+    problem: ProblemInput
+    dims: Optional[List[int]] = Field(None, description="2 or 3 variable indices (default: all, when len(c) <= 3)")
+    fixed: Optional[List[float]] = Field(None, description="Values for the other variables (default: the optimum)")
+    box: Optional[List[Tuple[float, float]]] = Field(None, description="Per-dim (lo, hi) clip for unbounded regions")
+    grid: int = Field(50, ge=5, description="Contour grid points per axis (2D only)")
+    levels: int = Field(10, ge=1, le=50, description="Number of contour levels")
+
+class VisualizationResult(BaseModel):
+    dims: List[int]
+    empty: bool
+    bounded: bool
+    vertices: List[List[float]]
+    # 3D only: vertex indices per face, in cyclic order
+    faces: Optional[List[List[int]]] = None
+    objective_at_vertices: List[float]
+    # 2D only: objective on an x/y grid, z[i][j] at (x[j], y[i])
+    contours: Optional[Dict[str, Any]] = None
+    box: Optional[List[List[float]]] = None
+    optimum: Optional[List[float]] = None
+    status: Optional[str] = None
+    objective_value: Optional[float] = None
+    problem_id: Optional[str] = None
+    solution_id: Optional[str] = None
+    stats: Optional[Dict[str, Any]] = None
@@ -0,0 +1,123 @@
+# app/services/codec.py
+"""
+Binary (npz) wire format for /solve.
+
+Requests posted with ``Content-Type: application/x-npz`` carry one array per
+problem field (``c``, ``A``, ``b``, ``A_eq``, ``b_eq``, ``Q``, ``bounds``) plus
+0-d string arrays ``sense`` and ``options`` (the SolveOptions JSON). Unbounded
+sides of ``bounds`` are NaN or +/-inf. Arrays are decoded straight into
+float64 numpy buffers and wrapped in a ``ProblemInput`` without per-element
+Python objects, so validation and ``spec_hash`` treat them exactly like the
+JSON path.
+"""
+from __future__ import annotations
+
+import io
+import zipfile
+from typing import Any, Optional
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.core.errors import BadInput
+from app.models.schema import ProblemInput, SolveOptions
+
+NPZ_MEDIA_TYPE = "application/x-npz"
+
+ARRAY_FIELDS = ("c", "A", "b", "A_eq", "b_eq", "Q", "bounds")
+_NDIM = {"c": 1, "A": 2, "b": 1, "A_eq": 2, "b_eq": 1, "Q": 2, "bounds": 2}
+_STR_FIELDS = ("sense", "options")
+
+
+def is_npz(media_type: Optional[str]) -> bool:
+    return bool(media_type) and NPZ_MEDIA_TYPE in media_type.lower()
+
+
+def decode_problem(body: bytes) -> ProblemInput:
+    try:
+        npz = np.load(io.BytesIO(body), allow_pickle=False)
+    except (ValueError, OSError, zipfile.BadZipFile) as e:
+        raise BadInput(f"Invalid npz payload: {e}")
+
+    fields: dict[str, Any] = {}
+    with npz:
+        unknown = set(npz.files) - set(ARRAY_FIELDS) - set(_STR_FIELDS)
+        if unknown:
+            raise BadInput(f"Unknown npz fields: {', '.join(sorted(unknown))}")
+        if "c" not in npz.files:
+            raise BadInput("c (objective) is required")
+        for name in ARRAY_FIELDS:
+            if name not in npz.files:
+                continue
+            arr = npz[name]
+            if arr.dtype.kind not in "biuf":
+                raise BadInput(f"{name} must be numeric, got dtype {arr.dtype}")
+            if arr.ndim != _NDIM[name]:
+                raise BadInput(f"{name} must be {_NDIM[name]}-dimensional")
+            fields[name] = np.ascontiguousarray(arr, dtype=np.float64)
+        if "sense" in npz.files:
+            fields["sense"] = str(npz["sense"][()])
+        if "options" in npz.files:
+            try:
+                fields["options"] = SolveOptions.model_validate_json(str(npz["options"][()]))
+            except ValidationError as e:
+                raise BadInput(f"Invalid options: {e}")
+
+    return ProblemInput.model_construct(**fields)
+
+
+def encode_problem(p: ProblemInput) -> bytes:
+    arrays: dict[str, np.ndarray] = {}
+    for name in ARRAY_FIELDS:
+        v = getattr(p, name, None)
+        if v is not None:
+            arrays[name] = np.asarray(v, dtype=np.float64)
+    arrays["sense"] = np.array(p.sense)
+    if p.options is not None:
+        arrays["options"] = np.array(p.options.model_dump_json())
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+
+def encode_arrays(**arrays) -> bytes:
+    """npz bytes of float64 arrays (None entries skipped)."""
+    buf = io.BytesIO()
+    np.savez(buf, **{k: np.asarray(v, dtype=np.float64) for k, v in arrays.items() if v is not None})
+    return buf.getvalue()
+
+
+def decode_arrays(blob: bytes) -> dict[str, np.ndarray]:
+    with np.load(io.BytesIO(blob), allow_pickle=False) as npz:
+        return {k: npz[k] for k in npz.files}
+
+
+def _add_entry(arrays: dict, key: str, v: Any) -> None:
+    if isinstance(v, (list, tuple)) and v and isinstance(v[0], str):
+        arrays[key] = np.array(v)  # e.g. per-scenario status of /sweep
+    elif isinstance(v, (list, tuple, np.ndarray)):
+        arrays[key] = np.asarray(v, dtype=np.float64)
+    elif isinstance(v, (bool, int, float, str)):
+        arrays[key] = np.array(v)
+
+
+def encode_result(res: dict) -> bytes:
+    """
+    Pack a /solve response dict: arrays stay arrays, scalars become 0-d
+    entries and one level of nested dicts is flattened (``duals_ineq``).
+    """
+    arrays: dict[str, np.ndarray] = {}
+    for key, v in res.items():
+        if v is None:
+            continue
+        if isinstance(v, dict):
+            for sub, sv in v.items():
+                if sv is not None and not isinstance(sv, dict):
+                    _add_entry(arrays, f"{key}_{sub}", sv)
+            continue
+        _add_entry(arrays, key, v)
+    if "objective_value" not in arrays:
+        arrays["objective_value"] = np.array(np.nan)
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
@@ -0,0 +1,64 @@
+# app/services/executor.py
+"""
+Where solves run.
+
+Handlers are async, and a solve is CPU-bound, so solves run on a pool of
+SOLVE_CONCURRENCY threads instead of on the event loop. Each solve gets
+a budget of SOLVE_THREADS BLAS/solver threads (0 = cores // SOLVE_CONCURRENCY;
+see solver/threads.py), so concurrent solves share the cores rather than
+each starting a thread per core.
+
+Problems that admission control sizes as large (app/core/admission.py) run
+on a separate pool of LARGE_SOLVE_CONCURRENCY threads, so a few big solves
+cannot take every slot from the small ones.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def configure_threads() -> dict:
+    from solver.threads import configure, threads_per_solve
+    budget = settings.SOLVE_THREADS or threads_per_solve(settings.SOLVE_CONCURRENCY)
+    info = {**configure(budget), "concurrency": settings.SOLVE_CONCURRENCY}
+    log.info("solve threads: %s", info)
+    return info
+
+
+def _get_pool(name: str = "solve") -> ThreadPoolExecutor:
+    with _lock:
+        if name not in _pools:
+            workers = settings.LARGE_SOLVE_CONCURRENCY if name == "large" else settings.SOLVE_CONCURRENCY
+            _pools[name] = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=name)
+        return _pools[name]
+
+
+async def run_solve(fn, *args, **kwargs):
+    """``fn(*args, **kwargs)`` on the solve pool; at most SOLVE_CONCURRENCY run at once."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_large(fn, *args, **kwargs):
+    """``fn(*args, **kwargs)`` on the large-problem pool; at most LARGE_SOLVE_CONCURRENCY at once."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool("large"), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown() -> None:
+    with _lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False)
+        _pools.clear()
@@ -0,0 +1,238 @@
+# app/services/export.py
+"""
+Streaming export of the solve history (problems joined with solutions).
+
+Rows come from one server-side cursor (``stream_results``) and are fetched
+and encoded EXPORT_CHUNK_ROWS at a time, so memory stays flat however many
+rows match and the database sees a single query instead of OFFSET pages.
+With DB_SHARDS there is one cursor per shard (and one on the main
+database), merged by solve time.
+Formats: NDJSON, CSV and, when ``pyarrow`` is installed, Parquet (one row
+group per chunk).
+
+Also a CLI:
+
+    python -m app.services.export --format csv --since 2025-01-01 --status optimal -o history.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import io
+import itertools
+import json
+import sys
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import shards
+from app.db.session import engine
+from app.services.stats import _utc
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAVE_PYARROW = True
+except Exception:
+    pa = pq = None
+    HAVE_PYARROW = False
+
+FORMATS = ("ndjson", "csv", "parquet")
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUMNS = ("problem_id", "spec_hash", "problem_created_at", "solution_id", "status",
+           "objective_value", "duration_ms", "cached", "solved_at")
+
+# same text form SQLAlchemy's DateTime uses on SQLite (see app/services/retention.py)
+_TS = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def _query(since: Optional[datetime], until: Optional[datetime], statuses: Sequence[str],
+           include_solution: bool) -> tuple[str, dict]:
+    where, params = ["COALESCE(p.kind, '') <> 'block'"], {}
+    if since is not None:
+        where.append("s.created_at >= :since")
+        params["since"] = _utc(since).strftime(_TS)
+    if until is not None:
+        where.append("s.created_at < :until")
+        params["until"] = _utc(until).strftime(_TS)
+    if statuses:
+        names = [f"st{i}" for i in range(len(statuses))]
+        where.append(f"s.status IN ({', '.join(':' + n for n in names)})")
+        params.update(zip(names, statuses))
+    sql = f"""
+        SELECT p.id AS problem_id, p.spec_hash, p.created_at AS problem_created_at,
+               s.id AS solution_id, s.status, s.objective_value, s.duration_ms, s.cached,
+               s.created_at AS solved_at{", s.solution_json" if include_solution else ""}
+        FROM solutions s
+        JOIN problems p ON p.id = s.problem_id
+        WHERE {" AND ".join(where)}
+        ORDER BY s.created_at, s.id
+    """
+    return sql, params
+
+
+def _row(r, include_solution: bool) -> dict:
+    out = {c: r[c] for c in COLUMNS}
+    for c in ("problem_created_at", "solved_at"):
+        if isinstance(out[c], datetime):
+            out[c] = out[c].isoformat()
+    if include_solution:
+        try:
+            out["solution"] = json.loads(r["solution_json"] or "{}").get("solution")
+        except Exception:
+            out["solution"] = None
+    return out
+
+
+def iter_chunks(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    statuses: Sequence[str] = (),
+    include_solution: bool = False,
+    chunk_rows: Optional[int] = None,
+) -> Iterator[list[dict]]:
+    """Matching rows, oldest solve first, as lists of at most ``chunk_rows`` dicts."""
+    sql, params = _query(since, until, statuses, include_solution)
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+    with ExitStack() as stack:
+        results = []
+        for eng in [engine, *shards.engines()]:
+            conn = stack.enter_context(eng.connect().execution_options(stream_results=True, yield_per=chunk_rows))
+            results.append(conn.execute(text(sql), params).mappings())
+        rows = results[0] if len(results) == 1 else heapq.merge(
+            *results, key=lambda r: (str(r["solved_at"]), r["solution_id"])
+        )
+        while True:
+            part = list(itertools.islice(rows, chunk_rows))
+            if not part:
+                return
+            yield [_row(r, include_solution) for r in part]
+
+
+def _ndjson(chunks) -> Iterator[bytes]:
+    for rows in chunks:
+        yield "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rows).encode("utf-8")
+
+
+def _csv(chunks, include_solution: bool) -> Iterator[bytes]:
+    header = list(COLUMNS) + (["solution"] if include_solution else [])
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for rows in chunks:
+        for r in rows:
+            if include_solution:
+                r = {**r, "solution": None if r["solution"] is None else json.dumps(r["solution"])}
+            writer.writerow([r[c] for c in header])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out, self._parts = b"".join(self._parts), []
+        return out
+
+
+def _parquet_schema(include_solution: bool):
+    fields = [
+        ("problem_id", pa.string()), ("spec_hash", pa.string()), ("problem_created_at", pa.string()),
+        ("solution_id", pa.string()), ("status", pa.string()), ("objective_value", pa.float64()),
+        ("duration_ms", pa.int64()), ("cached", pa.int64()), ("solved_at", pa.string()),
+    ]
+    if include_solution:
+        fields.append(("solution", pa.list_(pa.float64())))
+    return pa.schema(fields)
+
+
+def _parquet(chunks, include_solution: bool) -> Iterator[bytes]:
+    schema = _parquet_schema(include_solution)
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream(
+    fmt: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    statuses: Sequence[str] = (),
+    include_solution: bool = False,
+    chunk_rows: Optional[int] = None,
+) -> Iterator[bytes]:
+    """The export encoded as ``fmt``, in chunks; ValueError for an unknown or unavailable format."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if fmt == "parquet" and not HAVE_PYARROW:
+        raise ValueError("parquet export needs the pyarrow package")
+    chunks = iter_chunks(since, until, statuses, include_solution, chunk_rows)
+    if fmt == "ndjson":
+        return _ndjson(chunks)
+    if fmt == "csv":
+        return _csv(chunks, include_solution)
+    return _parquet(chunks, include_solution)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.services.export", description="Export the solve history.")
+    ap.add_argument("--format", choices=FORMATS, default="ndjson")
+    ap.add_argument("--since", type=datetime.fromisoformat, help="solved at or after (ISO date/time, UTC)")
+    ap.add_argument("--until", type=datetime.fromisoformat, help="solved before (ISO date/time, UTC)")
+    ap.add_argument("--status", action="append", default=[], help="keep only this status (repeatable)")
+    ap.add_argument("--include-solution", action="store_true", help="add the solution vector")
+    ap.add_argument("--chunk-rows", type=int, default=None)
+    ap.add_argument("-o", "--output", help="file to write (default: stdout)")
+    args = ap.parse_args(argv)
+    try:
+        parts = stream(args.format, args.since, args.until, args.status, args.include_solution, args.chunk_rows)
+    except ValueError as e:
+        ap.error(str(e))
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for part in parts:
+            out.write(part)
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,27 @@
 # app/services/persistence.py
 from __future__ import annotations
 
-import json, hashlib, re
-from contextlib import contextmanager
+import asyncio, functools, heapq, itertools, json, hashlib, logging, re, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
 from typing import Optional, Tuple, Any
 
-from sqlalchemy import text
+import numpy as np
+from sqlalchemy import text, inspect
 from sqlalchemy.orm import Session
 
+from app.db import shards
 from app.db.session import SessionLocal, engine, Base
-from app.db.models import Problem, Solution
-from app.models.schema import ProblemInput
+from app.db.models import Problem, Profile, Solution, Visualization
+from app.models.schema import ProblemInput, VisualizeInput
+from app.services import stats as solve_stats
 
 
 @contextmanager
-def get_session() -> Session:
-    db = SessionLocal()
+def get_session(shard: Optional[int] = None) -> Session:
+    """A transaction on the main database, or on shard ``shard`` (see shard_of)."""
+    db = SessionLocal() if shard is None else shards.session_factory(shard)()
     try:
         yield db
         db.commit()
@@ -25,8 +31,62 @@ def get_session() -> Session:
     finally:
         db.close()
 
+_tables_lock = threading.Lock()
+_tables_ready: set = set()
+
 def create_tables() -> None:
-    Base.metadata.create_all(bind=engine)
+    """Create/upgrade the schema of the main database and of each shard; repeat calls are no-ops."""
+    with _tables_lock:
+        for eng in [engine, *shards.engines()]:
+            if eng.url in _tables_ready:
+                continue
+            Base.metadata.create_all(bind=eng)
+            _add_missing_columns(eng)
+            _tables_ready.add(eng.url)
+
+def _add_missing_columns(engine) -> None:
+    """create_all never alters existing tables; add new (nullable) model columns in place."""
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            have = {col["name"] for col in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in have:
+                    ddl = col.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {ddl}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+# ---------- Shard routing (app/db/shards.py) ----------
+def shard_of(h: str) -> Optional[int]:
+    """Shard that stores problems with spec_hash ``h``; None for the main database (unsharded)."""
+    return shards.for_hash(h)
+
+def locate(table: str, row_id: str) -> Optional[int]:
+    """
+    Shard holding row ``row_id`` of ``table`` (problems or solutions), found
+    by primary key on each shard; None for the main database, which also
+    answers for rows stored before sharding was turned on.
+    """
+    for i in range(shards.count()):
+        with get_session(i) as db:
+            if db.execute(text(f"SELECT 1 FROM {table} WHERE id=:id"), {"id": row_id}).scalar():
+                return i
+    return None
+
+def session_for_id(table: str, row_id: str):
+    """get_session on the database holding row ``row_id`` of ``table``."""
+    return get_session(locate(table, row_id))
+
+@contextmanager
+def shard_sessions():
+    """Sessions on the main database and every shard, for reads that span them all."""
+    with ExitStack() as stack:
+        yield [stack.enter_context(get_session(i)) for i in (None, *range(shards.count()))]
+
+_HASH_FIELDS = ("c", "A", "b", "A_eq", "b_eq", "Q", "bounds")
 
 def _canonical_problem_dict(p: ProblemInput) -> dict:
     return {
@@ -40,11 +100,130 @@ def _canonical_problem_dict(p: ProblemInput) -> dict:
         "sense": getattr(p, "sense", None),
     }
 
+def _dumps_rows(d: dict) -> str:
+    """
+    ``json.dumps(d, separators=(",", ":"))``, encoding matrices a row at a time.
+
+    One dumps call holds the GIL until it returns, so a large A stalls the
+    event loop even from a DB thread; between rows the loop gets its turn.
+    """
+    parts = []
+    for k, v in d.items():
+        if isinstance(v, list) and v and isinstance(v[0], list):
+            enc = "[" + ",".join(json.dumps(row, separators=(",", ":")) for row in v) + "]"
+        else:
+            enc = json.dumps(v, separators=(",", ":"))
+        parts.append(f"{json.dumps(k)}:{enc}")
+    return "{" + ",".join(parts) + "}"
+
+def _has_arrays(d: dict) -> bool:
+    return any(isinstance(v, np.ndarray) for v in d.values())
+
+def _canonical_array(name: str, v: Any) -> np.ndarray:
+    arr = np.asarray(v, dtype="<f8")
+    if name == "bounds":
+        # None, NaN and +/-inf all mean "no bound"
+        arr = np.where(np.isfinite(arr), arr, np.nan)
+    return np.ascontiguousarray(arr + 0.0)  # folds -0.0 into 0.0
+
+def _quantize(arr: np.ndarray, rtol: float) -> np.ndarray:
+    """Snap to a grid of rtol * (power of two nearest max |arr|); NaN (no bound) passes through."""
+    mag = np.abs(arr[np.isfinite(arr)]).max(initial=0.0)
+    if mag == 0.0:
+        return arr
+    # a power-of-two scale keeps noise in max|arr| from moving the grid; rounding
+    # the exponent puts the switch points at 2**(k + 1/2), away from round inputs
+    step = rtol * 2.0 ** np.round(np.log2(mag))
+    return np.round(arr / step) + 0.0
+
+def _digest(p: ProblemInput, rtol: Optional[float] = None) -> str:
+    h = hashlib.sha256()
+    if rtol is not None:
+        h.update(f"fuzzy:{rtol!r}".encode("ascii"))
+    for name in _HASH_FIELDS:
+        v = getattr(p, name, None)
+        h.update(name.encode("ascii"))
+        if v is None:
+            h.update(b"\x00")
+            continue
+        try:
+            arr = _canonical_array(name, v)
+        except (TypeError, ValueError):
+            # ragged input; validation rejects it, hash the text form
+            h.update(json.dumps(v, separators=(",", ":")).encode("utf-8"))
+            continue
+        if rtol is not None:
+            arr = _quantize(arr, rtol)
+        h.update(repr(arr.shape).encode("ascii"))
+        h.update(arr.tobytes())
+    h.update(b"sense")
+    h.update(str(getattr(p, "sense", None)).encode("utf-8"))
+    return h.hexdigest()
+
 def spec_hash(p: ProblemInput) -> str:
-    js = json.dumps(_canonical_problem_dict(p), sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(js.encode("utf-8")).hexdigest()
+    """
+    Hash of the numeric content of a problem, independent of wire format:
+    a JSON list and an npz float64 array holding the same values hash equal
+    (as do 1 and 1.0).
+    """
+    return _digest(p)
+
+def fuzzy_hash(p: ProblemInput, rtol: float) -> str:
+    """
+    Like spec_hash, but each field is quantized to a relative grid of
+    ``rtol`` first, so inputs that differ only by floating-point noise share
+    a key. Values right on a grid boundary can still split; a match is only
+    a candidate and must pass verify_solution.
+    """
+    return _digest(p, rtol)
+
+def verify_solution(p: ProblemInput, x: Any, objective_value: Optional[float], tol: float) -> Optional[float]:
+    """
+    Objective of ``x`` on ``p``'s data if ``x`` is feasible for ``p`` and that
+    objective agrees with ``objective_value``, both within relative ``tol``;
+    otherwise None.
+    """
+    if x is None or objective_value is None:
+        return None
+    try:
+        x = np.asarray(x, dtype=np.float64)
+        c = np.asarray(p.c, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    if x.shape != c.shape or not np.isfinite(x).all():
+        return None
+
+    def _close(lhs, rhs):
+        return lhs - rhs <= tol * (1.0 + np.maximum(np.abs(lhs), np.abs(rhs)))
+
+    if p.A is not None and p.b is not None:
+        Ax = np.asarray(p.A, dtype=np.float64).reshape(-1, c.size) @ x
+        if not _close(Ax, np.asarray(p.b, dtype=np.float64)).all():
+            return None
+    if p.A_eq is not None and p.b_eq is not None:
+        Ax = np.asarray(p.A_eq, dtype=np.float64).reshape(-1, c.size) @ x
+        b_eq = np.asarray(p.b_eq, dtype=np.float64)
+        if not (_close(Ax, b_eq).all() and _close(b_eq, Ax).all()):
+            return None
+    if p.bounds is not None:
+        bounds = np.asarray(p.bounds, dtype=np.float64).reshape(-1, 2)
+        lb, ub = bounds[:, 0], bounds[:, 1]
+        has_lb, has_ub = np.isfinite(lb), np.isfinite(ub)
+        if not (_close(lb[has_lb], x[has_lb]).all() and _close(x[has_ub], ub[has_ub]).all()):
+            return None
+
+    obj = float(c @ x)
+    if p.Q is not None:
+        obj += 0.5 * float(x @ np.asarray(p.Q, dtype=np.float64) @ x)
+    if abs(obj - objective_value) > tol * (1.0 + abs(objective_value)):
+        return None
+    return obj
 
 # ---------- Cache lookup (flexible) ----------
+_CACHE_COLUMNS = """s.id, s.problem_id, s.status, s.objective_value, s.solution_json,
+           s.duration_ms, s.cached, s.created_at, s.duals_npz"""
+_FUZZY_CANDIDATES = 5
+
 def find_cached_solution_by_hash(*args: Any, **kwargs: Any) -> Optional[dict]:
     db: Optional[Session] = kwargs.get("db")
     h: Optional[str] = kwargs.get("h")
@@ -59,9 +238,15 @@ def find_cached_solution_by_hash(*args: Any, **kwargs: Any) -> Optional[dict]:
     if not h:
         raise TypeError("find_cached_solution_by_hash() missing required 'h'")
 
-    sql = """
-    SELECT s.id, s.problem_id, s.status, s.objective_value, s.solution_json,
-           s.duration_ms, s.cached, s.created_at
+    # with the problem itself, an exact miss falls back to the fuzzy key (if enabled)
+    problem: Optional[ProblemInput] = kwargs.get("problem")
+    rtol = kwargs.get("rtol")
+    if rtol is None:
+        from app.core.config import settings
+        rtol = settings.FUZZY_CACHE_RTOL
+
+    sql = f"""
+    SELECT {_CACHE_COLUMNS}
     FROM solutions s
     JOIN problems p ON p.id = s.problem_id
     WHERE p.spec_hash = :h
@@ -69,13 +254,264 @@ def find_cached_solution_by_hash(*args: Any, **kwargs: Any) -> Optional[dict]:
     LIMIT 1
     """
 
+    def _lookup(_db: Session) -> Optional[dict]:
+        row = _db.execute(text(sql), {"h": h}).mappings().first()
+        if row:
+            return dict(row)
+        if problem is not None and rtol > 0:
+            return _find_fuzzy(_db, problem, rtol, shard_of(h))
+        return None
+
     if db is None:
-        with get_session() as _db:
-            row = _db.execute(text(sql), {"h": h}).mappings().first()
-            return dict(row) if row else None
-    else:
-        row = db.execute(text(sql), {"h": h}).mappings().first()
-        return dict(row) if row else None
+        with get_session(shard_of(h)) as _db:
+            return _lookup(_db)
+    return _lookup(db)
+
+_FUZZY_SQL = f"""
+    SELECT {_CACHE_COLUMNS}
+    FROM solutions s
+    JOIN problems p ON p.id = s.problem_id
+    WHERE p.fuzzy_hash = :fh AND s.status IN ('optimal', 'optimal_inaccurate')
+    ORDER BY s.created_at DESC
+    LIMIT :k
+"""
+
+def _find_fuzzy(db: Session, problem: ProblemInput, rtol: float, shard: Optional[int] = None) -> Optional[dict]:
+    """
+    Most recent solution under the same fuzzy key that is still valid for
+    ``problem``; ``db`` is the session on ``shard``. Rows are routed by
+    spec_hash, so near-duplicates land on any shard: sharded, every shard
+    (and the main database) is searched and the candidates merged by age.
+    The hit carries the ``shard`` it was found on.
+    """
+    from app.core.config import settings
+    params = {"fh": fuzzy_hash(problem, rtol), "k": _FUZZY_CANDIDATES}
+    rows = [(shard, r) for r in db.execute(text(_FUZZY_SQL), params).mappings().all()]
+    if shards.count():
+        for i in (None, *range(shards.count())):
+            if i != shard:
+                with get_session(i) as other:
+                    rows += [(i, r) for r in other.execute(text(_FUZZY_SQL), params).mappings().all()]
+        rows = sorted(rows, key=lambda t: t[1]["created_at"], reverse=True)[:_FUZZY_CANDIDATES]
+    for i, row in rows:
+        try:
+            x = json.loads(row["solution_json"] or "{}").get("solution")
+        except Exception:
+            continue
+        obj = verify_solution(problem, x, row["objective_value"], settings.FUZZY_VERIFY_TOL)
+        if obj is not None:
+            # report the objective on the data actually submitted
+            return {**row, "objective_value": obj, "fuzzy": True, "shard": i}
+    return None
+
+def touch_solution(db: Session, solution_id: str) -> None:
+    """Record a cache hit; retention evicts least-recently-hit solutions first."""
+    db.execute(
+        text("UPDATE solutions SET last_hit_at=:now WHERE id=:id"),
+        {"now": datetime.utcnow(), "id": solution_id},
+    )
+
+# A cache hit only moves last_hit_at (retention's LRU order) and the /stats
+# counts, so hits are collected here and written at most every
+# TOUCH_FLUSH_SECONDS, one transaction per shard, instead of taking the
+# write lock on every hit. The flush runs on the DB_THREADS pool, so hot
+# hits answered on the event loop never wait for it.
+_touches: dict = {}  # (shard, solution_id) -> time of the latest hit
+_touches_lock = threading.Lock()
+_touches_flushed = time.monotonic()
+
+def _flush_quietly() -> None:
+    try:
+        flush_touches()
+    except Exception:
+        logging.getLogger(__name__).exception("flushing cache-hit touches failed")
+
+def touch_later(solution_id: str, shard: Optional[int] = None) -> None:
+    """Record a cache hit for the next flush_touches()."""
+    from app.core.config import settings
+    with _touches_lock:
+        _touches[(shard, solution_id)] = datetime.utcnow()
+        due = time.monotonic() - _touches_flushed >= settings.TOUCH_FLUSH_SECONDS
+    if due:
+        if settings.TOUCH_FLUSH_SECONDS <= 0:
+            _flush_quietly()
+        else:
+            _get_db_pool().submit(_flush_quietly)
+
+def note_cache_hit(h: str, solution_id: Optional[str], status: Optional[str]) -> None:
+    """A result served from a cache (hot or database): count it and touch its solution."""
+    solve_stats.count_hit(status)
+    if solution_id:
+        touch_later(solution_id, shard_of(h))
+
+def flush_touches() -> int:
+    """Write the pending touches and hit counts; returns how many solutions were touched."""
+    global _touches, _touches_flushed
+    with _touches_lock:
+        pending, _touches = _touches, {}
+        _touches_flushed = time.monotonic()
+    by_shard: dict = {}
+    for (shard, solution_id), t in pending.items():
+        by_shard.setdefault(shard, []).append({"id": solution_id, "now": t})
+    for shard, rows in by_shard.items():
+        with get_session(shard) as db:
+            db.execute(text("UPDATE solutions SET last_hit_at=:now WHERE id=:id"), rows)
+    with get_session() as db:
+        solve_stats.flush_hits(db)
+    return len(pending)
+
+# ---------- Duals (stored as npz next to the solution) ----------
+def encode_duals(result: dict) -> Optional[bytes]:
+    duals = result.get("duals")
+    if not duals:
+        return None
+    from app.services.codec import encode_arrays
+    # lower/upper are max(±reduced_costs, 0), so reduced_costs alone carries both
+    return encode_arrays(
+        ineq=duals.get("ineq"),
+        eq=duals.get("eq"),
+        reduced_costs=result.get("reduced_costs"),
+    )
+
+def decode_duals(blob: Optional[bytes]) -> Tuple[Optional[dict], Optional[list]]:
+    """(duals, reduced_costs) in the ProblemResult layout, or (None, None)."""
+    if not blob:
+        return None, None
+    from app.services.codec import decode_arrays
+    arrs = decode_arrays(blob)
+    rc = arrs.get("reduced_costs", np.zeros(0))
+    duals = {
+        "ineq": arrs.get("ineq", np.zeros(0)).tolist(),
+        "eq": arrs.get("eq", np.zeros(0)).tolist(),
+        "lower": np.maximum(rc, 0.0).tolist(),
+        "upper": np.maximum(-rc, 0.0).tolist(),
+    }
+    return duals, rc.tolist()
+
+# ---------- Iteration traces (compressed float32 npz next to the solution) ----------
+def encode_trace(result: dict) -> Optional[bytes]:
+    trace = result.get("trace")
+    if trace is None or len(trace) == 0:
+        return None
+    import io
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf,
+        trace=np.asarray(trace, dtype=np.float32),
+        solver=np.array((result.get("stats") or {}).get("solver") or ""),
+    )
+    return buf.getvalue()
+
+def decode_trace(blob: Optional[bytes]) -> Optional[dict]:
+    """{"solver", "columns", "data"} with data as an (iterations x columns) array, or None."""
+    if not blob:
+        return None
+    from app.services.codec import decode_arrays
+    from solver.trace import TRACE_COLUMNS
+    arrs = decode_arrays(blob)
+    return {"solver": str(arrs["solver"]) or None, "columns": list(TRACE_COLUMNS), "data": arrs["trace"]}
+
+def get_warm_start(db: Session, solution_id: str) -> Optional[dict]:
+    """Primal and dual values of a stored solution, in the shape solve_lp(warm_start=...) takes."""
+    row = db.execute(
+        text("SELECT solution_json, duals_npz FROM solutions WHERE id=:id"), {"id": solution_id}
+    ).mappings().first()
+    if not row:
+        return None
+    try:
+        x = json.loads(row["solution_json"] or "{}").get("solution")
+    except Exception:
+        x = None
+    duals, _ = decode_duals(row["duals_npz"])
+    if x is None and duals is None:
+        return None
+    return {"x": x, "duals": duals}
+
+# ---------- Per-block cache for decomposed solves ----------
+class BlockCache:
+    """
+    solve_lp(block_cache=...) adapter: each block of a decomposed problem is
+    looked up and stored as a problem of its own, under its own spec_hash,
+    so blocks shared between submissions are solved once. Blocks are stored
+    with kind "block" and left out of /history, /export and /stats.
+
+    Each lookup and store is its own short transaction on the block's shard:
+    the blocks are solved in parallel, and a session held across the solve
+    would keep other writers waiting.
+    """
+
+    def __init__(self):
+        self.hits = 0
+
+    @staticmethod
+    def _problem(sub: dict) -> ProblemInput:
+        return ProblemInput.model_construct(**{k: v for k, v in sub.items() if v is not None})
+
+    def get(self, sub: dict) -> Optional[dict]:
+        h = spec_hash(self._problem(sub))
+        row = find_cached_solution_by_hash(h)
+        if not row:
+            return None
+        try:
+            payload = json.loads(row.get("solution_json") or "{}")
+        except Exception:
+            return None
+        if payload.get("solution") is None and row.get("status") in ("optimal", "optimal_inaccurate"):
+            return None
+        touch_later(row["id"], shard_of(h))
+        self.hits += 1
+        duals, reduced_costs = decode_duals(row.get("duals_npz"))
+        return {
+            "status": row.get("status"),
+            "objective_value": row.get("objective_value"),
+            "solution": payload.get("solution"),
+            "duals": duals,
+            "reduced_costs": reduced_costs,
+        }
+
+    def put(self, sub: dict, result: dict) -> None:
+        ms = (result.get("stats") or {}).get("wall_ms") or 0
+        persist_problem_and_solution(self._problem(sub), result, ms, cached=False, kind="block")
+
+# ---------- Visualizations (per spec_hash and view parameters) ----------
+def visualization_key(v: VisualizeInput) -> str:
+    """Hash of what, besides the problem, shapes a /visualize result."""
+    view = {"dims": v.dims, "fixed": v.fixed, "box": v.box, "grid": v.grid, "levels": v.levels}
+    return hashlib.sha256(json.dumps(view, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def find_visualization(db: Session, h: str, key: str) -> Optional[dict]:
+    blob = db.execute(
+        text("""
+            SELECT payload_json FROM visualizations
+            WHERE spec_hash=:h AND params_hash=:k
+            ORDER BY created_at DESC LIMIT 1
+        """),
+        {"h": h, "k": key},
+    ).scalar()
+    return json.loads(blob) if blob else None
+
+def store_visualization(db: Session, h: str, key: str, payload: dict) -> str:
+    row = Visualization(spec_hash=h, params_hash=key, payload_json=json.dumps(payload, separators=(",", ":")))
+    db.add(row)
+    db.flush()
+    return row.id
+
+# ---------- Profiles (X-Profile requests) ----------
+def store_profile(db: Session, solution_id: str, stats_blob: bytes, wall_ms: float) -> str:
+    row = Profile(solution_id=solution_id, stats_blob=stats_blob, wall_ms=wall_ms)
+    db.add(row)
+    db.flush()
+    return row.id
+
+def find_profile(db: Session, solution_id: str) -> Optional[dict]:
+    row = db.execute(
+        text("""
+            SELECT id, stats_blob, wall_ms, created_at FROM profiles
+            WHERE solution_id=:id ORDER BY created_at DESC LIMIT 1
+        """),
+        {"id": solution_id},
+    ).mappings().first()
+    return dict(row) if row else None
 
 # ---------- Persist (flexible, backward-compatible) ----------
 _HEX = re.compile(r"^[0-9a-fA-F]{16,64}$")
@@ -89,8 +525,14 @@ def persist_problem_and_solution(*args: Any, **kwargs: Any) -> Tuple[str, str]:
       - (db, problem, result, spec_hash, duration_ms, cached)
       - or use keywords: db=..., problem=..., result=..., duration_ms=..., cached=...
     The spec hash param is optional and ignored if present (we recompute to be safe).
+    ``kind`` marks rows that are not client solves and stay out of /stats:
+    "block" for a block of a decomposed problem (also left out of /history
+    and /export), "session" for a solve of an incremental session; a
+    session's patched versions carry the session id in ``parent_id``.
     """
     db: Optional[Session] = kwargs.pop("db", None)
+    kind: Optional[str] = kwargs.pop("kind", None)
+    parent_id: Optional[str] = kwargs.pop("parent_id", None)
 
     pos = list(args)
     if pos and isinstance(pos[0], Session):
@@ -120,13 +562,33 @@ def persist_problem_and_solution(*args: Any, **kwargs: Any) -> Tuple[str, str]:
 
 
     h = spec_hash(problem)
-    payload_json = json.dumps(_canonical_problem_dict(problem), separators=(",", ":"))
-    res_json = json.dumps(result, separators=(",", ":"))
+    from app.core.config import settings
+    fh = fuzzy_hash(problem, settings.FUZZY_CACHE_RTOL) if settings.FUZZY_CACHE_RTOL > 0 else None
+    canonical = _canonical_problem_dict(problem)
+    payload_npz = None
+    if _has_arrays(canonical):
+        # binary submissions are stored as submitted; payload_json only marks the encoding
+        from app.services.codec import encode_problem
+        payload_npz = encode_problem(problem)
+        payload_json = json.dumps({"encoding": "npz", "sense": canonical["sense"]}, separators=(",", ":"))
+    else:
+        payload_json = _dumps_rows(canonical)
+    duals_npz = encode_duals(result)
+    trace_npz = encode_trace(result)
+    res_json = json.dumps(
+        {k: v for k, v in result.items() if k not in ("duals", "reduced_costs", "trace")},
+        separators=(",", ":"),
+    )
     dur = int(duration_ms)
     cached_i = 1 if cached else 0
+    expires_at = (
+        datetime.utcnow() + timedelta(seconds=settings.RETENTION_TTL_SECONDS)
+        if settings.RETENTION_TTL_SECONDS > 0 else None
+    )
 
     def _insert(_db: Session) -> Tuple[str, str]:
-        pr = Problem(spec_hash=h, payload_json=payload_json)
+        pr = Problem(spec_hash=h, fuzzy_hash=fh, kind=kind, parent_id=parent_id,
+                     payload_json=payload_json, payload_npz=payload_npz)
         _db.add(pr)
         _db.flush()
 
@@ -137,13 +599,165 @@ def persist_problem_and_solution(*args: Any, **kwargs: Any) -> Tuple[str, str]:
             solution_json=res_json,
             duration_ms=dur,
             cached=cached_i,
+            duals_npz=duals_npz,
+            trace_npz=trace_npz,
+            expires_at=expires_at,
         )
         _db.add(sol)
         _db.flush()
+        if kind is None:
+            solve_stats.record(_db, result.get("status"), bool(cached_i), (result.get("stats") or {}).get("solver"), dur)
         return str(pr.id), str(sol.id)
 
     if db is None:
-        with get_session() as _db:
+        with get_session(shard_of(h)) as _db:
             return _insert(_db)
     else:
         return _insert(db)
+
+# ---------- History (merged across shards) ----------
+_HISTORY_SQL = """
+    SELECT p.id as problem_id, p.spec_hash, p.created_at,
+           s.id as solution_id, s.status, s.objective_value, s.duration_ms, s.cached, s.created_at as solved_at
+    FROM problems p
+    JOIN solutions s ON s.problem_id = p.id
+    WHERE COALESCE(p.kind, '') <> 'block'
+    ORDER BY p.created_at DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+def get_history(limit: int, offset: int) -> list:
+    """
+    Solves, newest problem first. Sharded, each shard (and the main
+    database) returns its newest ``offset + limit`` rows and they are merged
+    by timestamp, so deep pages cost O(shards x (offset + limit)).
+    """
+    if not shards.count():
+        with get_session() as db:
+            return db.execute(text(_HISTORY_SQL), {"limit": limit, "offset": offset}).mappings().all()
+    parts = []
+    for shard in (None, *range(shards.count())):
+        with get_session(shard) as db:
+            parts.append(db.execute(text(_HISTORY_SQL), {"limit": limit + offset, "offset": 0}).mappings().all())
+    merged = heapq.merge(*parts, key=lambda r: r["created_at"], reverse=True)
+    return list(itertools.islice(merged, offset, offset + limit))
+
+# ---------- Sessions (app/services/sessions.py) ----------
+_SESSION_VERSIONS_SQL = """
+    SELECT id, payload_json, payload_npz, created_at FROM problems
+    WHERE (id = :sid AND kind = 'session') OR parent_id = :sid
+    ORDER BY created_at DESC
+"""
+
+def load_problem(row: dict) -> ProblemInput:
+    """The ProblemInput stored in a problems row (payload_json, or payload_npz for binary submissions)."""
+    if row.get("payload_npz") is not None:
+        from app.services.codec import decode_problem
+        return decode_problem(row["payload_npz"])
+    return ProblemInput(**json.loads(row["payload_json"]))
+
+def latest_session_problem(session_id: str) -> Optional[Tuple[ProblemInput, int]]:
+    """
+    The latest stored version of an open session and its version number,
+    or None if the session was never opened or has been closed. Versions
+    are routed by their own spec_hash, so every shard is read.
+    """
+    latest, versions, is_open = None, 0, False
+    with shard_sessions() as dbs:
+        for db in dbs:
+            rows = db.execute(text(_SESSION_VERSIONS_SQL), {"sid": session_id}).mappings().all()
+            versions += len(rows)
+            is_open = is_open or any(r["id"] == session_id for r in rows)
+            if rows and (latest is None or rows[0]["created_at"] > latest["created_at"]):
+                latest = dict(rows[0])
+    if not is_open:
+        return None
+    return load_problem(latest), versions - 1
+
+def close_stored_session(session_id: str) -> bool:
+    """Mark a session closed so no worker rebuilds it; False if it is not stored as open."""
+    with session_for_id("problems", session_id) as db:
+        return db.execute(
+            text("UPDATE problems SET kind='session_closed' WHERE id=:id AND kind='session'"), {"id": session_id}
+        ).rowcount > 0
+
+# ---------- Async access (for the async routes) ----------
+_db_pool: Optional[ThreadPoolExecutor] = None
+_db_pool_lock = threading.Lock()
+
+def _get_db_pool() -> ThreadPoolExecutor:
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None:
+            from app.core.config import settings
+            _db_pool = ThreadPoolExecutor(max_workers=max(1, settings.DB_THREADS), thread_name_prefix="db")
+        return _db_pool
+
+def _in_session(fn, shard: Optional[int], *args: Any, **kwargs: Any):
+    with get_session(shard) as db:
+        return fn(db, *args, **kwargs)
+
+def _in_row_session(fn, table: str, row_id: str, *args: Any):
+    with session_for_id(table, row_id) as db:
+        return fn(db, row_id, *args)
+
+async def run_db(fn, *args: Any, shard: Optional[int] = None, **kwargs: Any):
+    """
+    ``fn(db, *args, **kwargs)`` in one transaction, without blocking the event loop.
+
+    ``fn`` runs on the sync engine in a pool of DB_THREADS threads, with or
+    without an async driver: the helpers hash, encode and verify in Python,
+    and under the async engine's run_sync that work would run on the loop
+    thread between its awaits.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_db_pool(), functools.partial(_in_session, fn, shard, *args, **kwargs))
+
+async def _run_db_by_id(fn, table: str, row_id: str, *args: Any):
+    """``fn(db, row_id, *args)`` on the database holding ``row_id`` (see locate)."""
+    if not shards.count():
+        return await run_db(fn, row_id, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_db_pool(), functools.partial(_in_row_session, fn, table, row_id, *args))
+
+def _find_and_touch(db: Session, h: str, problem: Optional[ProblemInput]) -> Optional[dict]:
+    row = find_cached_solution_by_hash(db, h, problem=problem)
+    if row:
+        solve_stats.count_hit(row.get("status"))
+        touch_later(row["id"], row.pop("shard", shard_of(h)))
+    return row
+
+async def find_cached_solution_async(h: str, problem: Optional[ProblemInput] = None) -> Optional[dict]:
+    """find_cached_solution_by_hash, recording the hit (see touch_later)."""
+    return await run_db(_find_and_touch, h, problem, shard=shard_of(h))
+
+async def latest_session_problem_async(session_id: str) -> Optional[Tuple[ProblemInput, int]]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_db_pool(), latest_session_problem, session_id)
+
+async def get_warm_start_async(solution_id: str) -> Optional[dict]:
+    return await _run_db_by_id(get_warm_start, "solutions", solution_id)
+
+async def persist_problem_and_solution_async(
+    problem: ProblemInput, result: dict, duration_ms: int, cached: bool = False, kind: Optional[str] = None,
+    parent_id: Optional[str] = None,
+) -> Tuple[str, str]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_db_pool(), functools.partial(
+        _persist_on_shard, problem, result, duration_ms, cached, kind, parent_id))
+
+def _persist_on_shard(problem, result, duration_ms, cached, kind, parent_id):
+    # the shard needs spec_hash, so pick it here rather than on the loop
+    shard = shard_of(spec_hash(problem)) if shards.count() else None
+    return _in_session(persist_problem_and_solution, shard, problem, result, duration_ms, cached,
+                       kind=kind, parent_id=parent_id)
+
+async def store_profile_async(solution_id: str, stats_blob: bytes, wall_ms: float) -> str:
+    # next to its solution, so retention drops both together
+    return await _run_db_by_id(store_profile, "solutions", solution_id, stats_blob, wall_ms)
+
+async def find_visualization_async(h: str, key: str) -> Optional[dict]:
+    return await run_db(find_visualization, h, key, shard=shard_of(h))
+
+async def store_visualization_async(h: str, key: str, payload: dict) -> str:
+    return await run_db(store_visualization, h, key, payload, shard=shard_of(h))
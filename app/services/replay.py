@@ -0,0 +1,239 @@
+# app/services/replay.py
+"""
+Replay captured /solve traffic (app/core/capture.py) and compare.
+
+Records are sent in capture order, spaced as they arrived divided by
+``--speed`` (0: as fast as ``--concurrency`` allows), either to this app
+in-process (the default; rate limiting and capture are switched off for
+the run) or to a running server with ``--url``. The report has the latency
+distribution of the replay next to the captured one, the HTTP status
+codes, and where the results diverge from what was captured: a different
+HTTP status, solver status, or an objective off by more than ``--rtol``.
+
+    python -m app.services.replay data/capture --speed 10 --concurrency 8
+    python -m app.services.replay capture-123.jsonl --url http://localhost:8000 --no-cache --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import glob
+import json
+import math
+import os
+import sys
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.codec import NPZ_MEDIA_TYPE, decode_arrays, is_npz
+
+
+def load(paths: Sequence[str]) -> list[dict]:
+    """Captured records from files and directories (their capture-*.jsonl*), oldest first."""
+    files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "capture-*.jsonl*"))))
+        else:
+            files.append(path)
+    records = []
+    for name in files:
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    records.sort(key=lambda r: r["t"])
+    return records
+
+
+def _request(rec: dict, api_key: str, force_recompute: bool) -> dict:
+    headers = {"X-API-Key": api_key}
+    if force_recompute:
+        headers["X-Force-Recompute"] = "1"
+    if "problem_npz" in rec:
+        headers["Content-Type"] = NPZ_MEDIA_TYPE
+        headers["Accept"] = NPZ_MEDIA_TYPE
+        content = base64.b64decode(rec["problem_npz"])
+    else:
+        headers["Content-Type"] = "application/json"
+        content = json.dumps(rec["problem"]).encode("utf-8")
+    return {"method": rec.get("method", "POST"), "url": rec["path"], "params": rec.get("query") or {},
+            "headers": headers, "content": content}
+
+
+def _result(response) -> Optional[dict]:
+    try:
+        if is_npz(response.headers.get("content-type")):
+            arrays = decode_arrays(response.content)
+            obj = arrays["objective_value"].item() if "objective_value" in arrays else None
+            return {"status": arrays["status"].item() if "status" in arrays else None,
+                    "objective_value": None if obj is None or obj != obj else obj}
+        data = response.json()
+        return {"status": data.get("status"), "objective_value": data.get("objective_value")}
+    except Exception:
+        return None
+
+
+async def replay(records: Sequence[dict], url: Optional[str] = None, speed: float = 1.0, concurrency: int = 8,
+                 api_key: Optional[str] = None, force_recompute: bool = False) -> dict:
+    """Send ``records`` and return per-request outcomes plus the run's wall time and schedule lag."""
+    import httpx
+
+    api_key = api_key or settings.API_TOKEN
+    if url is None:
+        from app.core.limiting import limiter
+        from app.main import app
+        from app.services.persistence import create_tables
+
+        create_tables()
+        transport, base_url = httpx.ASGITransport(app=app), "http://replay"
+    else:
+        limiter = None
+        transport, base_url = None, url
+
+    outcomes: list = [None] * len(records)
+    sem = asyncio.Semaphore(max(1, concurrency))
+    lag = 0.0
+
+    async def one(i: int, client) -> None:
+        try:
+            t = time.perf_counter()
+            r = await client.request(**_request(records[i], api_key, force_recompute))
+            outcomes[i] = {"latency_ms": (time.perf_counter() - t) * 1000, "http_status": r.status_code,
+                           "result": _result(r)}
+        except Exception as e:
+            outcomes[i] = {"latency_ms": None, "http_status": None, "result": None, "error": repr(e)}
+        finally:
+            sem.release()
+
+    # replaying must neither hit the rate limit nor capture itself
+    saved = (limiter.enabled if limiter is not None else None, settings.CAPTURE_DIR)
+    if limiter is not None:
+        limiter.enabled = False
+    settings.CAPTURE_DIR = ""
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=None) as client:
+            t0 = time.perf_counter()
+            first = records[0]["t"] if records else 0.0
+            tasks = []
+            for i, rec in enumerate(records):
+                if speed > 0:
+                    due = (rec["t"] - first) / speed
+                    wait = due - (time.perf_counter() - t0)
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                await sem.acquire()
+                if speed > 0:
+                    lag = max(lag, time.perf_counter() - t0 - due)
+                tasks.append(asyncio.create_task(one(i, client)))
+            await asyncio.gather(*tasks)
+            wall = time.perf_counter() - t0
+    finally:
+        if limiter is not None:
+            limiter.enabled = saved[0]
+        settings.CAPTURE_DIR = saved[1]
+    return {"outcomes": outcomes, "wall_s": wall, "max_schedule_lag_ms": lag * 1000}
+
+
+def _distribution(values) -> Optional[dict]:
+    v = np.asarray([x for x in values if x is not None], dtype=np.float64)
+    if not v.size:
+        return None
+    p50, p90, p99 = np.percentile(v, [50, 90, 99])
+    return {"n": int(v.size), "mean": round(float(v.mean()), 3), "p50": round(float(p50), 3),
+            "p90": round(float(p90), 3), "p99": round(float(p99), 3), "max": round(float(v.max()), 3)}
+
+
+def _objective_differs(a, b, rtol: float) -> bool:
+    if a is None or b is None:
+        return (a is None) != (b is None)
+    a, b = float(a), float(b)
+    if not (math.isfinite(a) and math.isfinite(b)):
+        return a != b
+    return abs(a - b) > rtol * max(1.0, abs(a))
+
+
+def report(records: Sequence[dict], run: dict, rtol: float = 1e-6, examples: int = 10) -> dict:
+    outcomes = run["outcomes"]
+    codes: dict = {}
+    diverged = {"http_status": 0, "status": 0, "objective": 0, "requests": 0}
+    shown = []
+    for i, (rec, out) in enumerate(zip(records, outcomes)):
+        code = str(out["http_status"]) if out["http_status"] is not None else "error"
+        codes[code] = codes.get(code, 0) + 1
+        kinds = []
+        if out["http_status"] != rec.get("http_status"):
+            kinds.append("http_status")
+        before, after = rec.get("result") or {}, out["result"] or {}
+        if out["http_status"] == rec.get("http_status") == 200:
+            if before.get("status") != after.get("status"):
+                kinds.append("status")
+            elif _objective_differs(before.get("objective_value"), after.get("objective_value"), rtol):
+                kinds.append("objective")
+        for k in kinds:
+            diverged[k] += 1
+        diverged["requests"] += bool(kinds)
+        if kinds and len(shown) < examples:
+            shown.append({"index": i, "ts": rec.get("ts"), "kinds": kinds,
+                          "captured": {"http_status": rec.get("http_status"), **before},
+                          "replayed": {"http_status": out["http_status"], **after, "error": out.get("error")}})
+    return {
+        "requests": len(records),
+        "wall_s": round(run["wall_s"], 3),
+        "max_schedule_lag_ms": round(run["max_schedule_lag_ms"], 3),
+        "http_status": codes,
+        "latency_ms": _distribution(o["latency_ms"] for o in outcomes),
+        "captured_latency_ms": _distribution(r.get("duration_ms") for r in records),
+        "diverged": diverged,
+        "examples": shown,
+    }
+
+
+def _print(rep: dict, out) -> None:
+    print(f"{rep['requests']} requests in {rep['wall_s']} s (max schedule lag {rep['max_schedule_lag_ms']} ms)", file=out)
+    print("http status: " + ", ".join(f"{k}={v}" for k, v in sorted(rep["http_status"].items())), file=out)
+    for name in ("captured_latency_ms", "latency_ms"):
+        d = rep[name]
+        label = "captured" if name.startswith("captured") else "replayed"
+        if d:
+            print(f"{label:9s} latency ms: p50={d['p50']} p90={d['p90']} p99={d['p99']} max={d['max']} mean={d['mean']}", file=out)
+    dv = rep["diverged"]
+    print(f"diverged: {dv['requests']} requests (http_status={dv['http_status']} status={dv['status']} "
+          f"objective={dv['objective']})", file=out)
+    for ex in rep["examples"]:
+        print(f"  #{ex['index']} {ex['ts']} {','.join(ex['kinds'])}: captured {ex['captured']} replayed {ex['replayed']}", file=out)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.services.replay", description="Replay captured /solve traffic.")
+    ap.add_argument("paths", nargs="+", help="capture files or directories")
+    ap.add_argument("--url", help="server to replay against (default: this app, in-process)")
+    ap.add_argument("--speed", type=float, default=1.0, help="time compression; 0 sends as fast as possible")
+    ap.add_argument("--concurrency", type=int, default=8, help="requests in flight at most")
+    ap.add_argument("--limit", type=int, default=None, help="replay only the first N records")
+    ap.add_argument("--no-cache", action="store_true", help="send X-Force-Recompute so every request solves")
+    ap.add_argument("--rtol", type=float, default=1e-6, help="objective tolerance for divergence")
+    ap.add_argument("--api-key", default=None, help="default: API_TOKEN")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args(argv)
+
+    records = load(args.paths)[: args.limit]
+    if not records:
+        ap.error("no captured records found")
+    run = asyncio.run(replay(records, args.url, args.speed, args.concurrency, args.api_key, args.no_cache))
+    rep = report(records, run, args.rtol)
+    if args.json:
+        json.dump(rep, sys.stdout, indent=2)
+        print()
+    else:
+        _print(rep, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
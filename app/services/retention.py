@@ -0,0 +1,292 @@
+# app/services/retention.py
+"""
+Retention for the problems/solutions store.
+
+Policies (each off when its setting is 0):
+
+  - RETENTION_TTL_SECONDS        solutions expire this long after they were stored
+  - RETENTION_MAX_ROWS_PER_HASH  keep only the most recently hit solutions per spec_hash
+  - RETENTION_MAX_DB_BYTES       evict least-recently-hit solutions until the live
+                                 pages fit
+
+``compact()`` applies them in that order, RETENTION_BATCH rows per
+transaction so writers are never blocked for long, drops problems left
+without solutions (and visualizations left without problems, profiles
+left without solutions) and then
+returns free pages to the OS with ``PRAGMA incremental_vacuum``. The
+background job runs it every RETENTION_INTERVAL_SECONDS on one worker at a
+time.
+
+With DB_SHARDS each shard is compacted on its own (everything about a
+problem lives on one shard, app/db/shards.py), as is the main database;
+RETENTION_MAX_DB_BYTES is split evenly between them.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db import shards
+from app.db.session import engine
+from app.services import stats as solve_stats
+from app.services.persistence import flush_touches
+
+log = logging.getLogger(__name__)
+
+# same text form SQLAlchemy's DateTime uses on SQLite, so comparisons are lexical-safe
+_TS = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def _databases() -> list:
+    return [engine, *shards.engines()]
+
+
+def _is_sqlite(eng) -> bool:
+    return eng.dialect.name == "sqlite"
+
+
+def _file_bytes(eng) -> dict:
+    if not _is_sqlite(eng):
+        return {"file_bytes": 0, "free_bytes": 0}
+    with eng.connect() as conn:
+        page = conn.execute(text("PRAGMA page_size")).scalar()
+        pages = conn.execute(text("PRAGMA page_count")).scalar()
+        free = conn.execute(text("PRAGMA freelist_count")).scalar()
+    return {"file_bytes": page * pages, "free_bytes": page * free}
+
+
+def db_bytes() -> dict:
+    """File size and bytes held by free pages (SQLite only), summed over the shards."""
+    sizes = [_file_bytes(eng) for eng in _databases()]
+    return {k: sum(s[k] for s in sizes) for k in ("file_bytes", "free_bytes")}
+
+
+def _delete_solutions(conn, sql: str, params: dict, hashes: set) -> int:
+    """Run ``sql`` (a DELETE FROM solutions); adds the spec_hashes it touched to ``hashes``."""
+    problem_ids = conn.execute(text(sql + " RETURNING problem_id"), params).scalars().all()
+    for i in range(0, len(problem_ids), 500):
+        part = problem_ids[i:i + 500]
+        names = [f"p{j}" for j in range(len(part))]
+        hashes.update(conn.execute(
+            text(f"SELECT spec_hash FROM problems WHERE id IN ({', '.join(':' + n for n in names)})"),
+            dict(zip(names, part)),
+        ).scalars())
+    return len(problem_ids)
+
+
+def _delete_batches(eng, sql: str, params: dict, hashes: set) -> int:
+    """Run ``sql`` (a DELETE bounded by :batch) until it deletes nothing."""
+    total = 0
+    while True:
+        with eng.begin() as conn:
+            n = _delete_solutions(conn, sql, {**params, "batch": settings.RETENTION_BATCH}, hashes)
+        total += n
+        if n == 0:
+            return total
+
+
+def _expire(eng, now: datetime, hashes: set) -> int:
+    return _delete_batches(
+        eng,
+        """
+        DELETE FROM solutions WHERE id IN (
+            SELECT id FROM solutions WHERE expires_at <= :now LIMIT :batch
+        )
+        """,
+        {"now": now.strftime(_TS)},
+        hashes,
+    )
+
+
+def _trim_per_hash(eng, keep: int, hashes: set) -> int:
+    return _delete_batches(
+        eng,
+        """
+        DELETE FROM solutions WHERE id IN (
+            SELECT id FROM (
+                SELECT s.id, ROW_NUMBER() OVER (
+                    PARTITION BY p.spec_hash ORDER BY s.last_hit_at DESC
+                ) AS rn
+                FROM solutions s JOIN problems p ON p.id = s.problem_id
+            ) WHERE rn > :keep LIMIT :batch
+        )
+        """,
+        {"keep": keep},
+        hashes,
+    )
+
+
+def _evict_to_size(eng, max_bytes: int, hashes: set) -> int:
+    evicted = 0
+    while True:
+        sizes = _file_bytes(eng)
+        if sizes["file_bytes"] - sizes["free_bytes"] <= max_bytes:
+            return evicted
+        with eng.begin() as conn:
+            n = _delete_solutions(
+                conn,
+                """
+                    DELETE FROM solutions WHERE id IN (
+                        SELECT id FROM solutions ORDER BY last_hit_at ASC LIMIT :batch
+                    )
+                """,
+                {"batch": settings.RETENTION_BATCH},
+                hashes,
+            )
+            # the rows' problems go with them, or the pages would not come free
+            _drop_orphans(conn)
+        if n == 0:
+            return evicted
+        evicted += n
+
+
+def _drop_orphans(conn) -> int:
+    return conn.execute(text("""
+        DELETE FROM problems WHERE NOT EXISTS (
+            SELECT 1 FROM solutions s WHERE s.problem_id = problems.id
+        )
+    """)).rowcount
+
+
+def _drop_orphan_visualizations(conn) -> int:
+    """Cached visualizations go once no stored problem has their spec_hash."""
+    return conn.execute(text("""
+        DELETE FROM visualizations WHERE NOT EXISTS (
+            SELECT 1 FROM problems p WHERE p.spec_hash = visualizations.spec_hash
+        )
+    """)).rowcount
+
+
+def _drop_orphan_profiles(conn) -> int:
+    return conn.execute(text("""
+        DELETE FROM profiles WHERE NOT EXISTS (
+            SELECT 1 FROM solutions s WHERE s.id = profiles.solution_id
+        )
+    """)).rowcount
+
+
+def _vacuum(eng) -> None:
+    with eng.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+            # one-off conversion: auto_vacuum only takes effect after a full VACUUM
+            conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+            conn.execute(text("VACUUM"))
+        free = conn.execute(text("PRAGMA freelist_count")).scalar()
+        if not free:
+            return
+        # incremental_vacuum frees one page per step and sqlite3 steps a
+        # statement only once, so issue it per free page, committing every
+        # RETENTION_VACUUM_PAGES pages so writers wait for one chunk at most
+        chunk = max(1, settings.RETENTION_VACUUM_PAGES)
+        cur = conn.connection.dbapi_connection.cursor()
+        try:
+            while free > 0:
+                cur.execute("BEGIN IMMEDIATE")
+                try:
+                    for _ in range(min(chunk, free)):
+                        cur.execute("PRAGMA incremental_vacuum(1)")
+                    cur.execute("COMMIT")
+                except Exception:
+                    cur.execute("ROLLBACK")
+                    raise
+                free -= chunk
+                time.sleep(0)  # let waiting writers in
+        finally:
+            cur.close()
+
+
+def _compact_one(eng, now: datetime, max_bytes: int, hashes: set) -> dict:
+    with eng.begin() as conn:
+        # rows from before the column existed count as hit when stored
+        conn.execute(text("UPDATE solutions SET last_hit_at = created_at WHERE last_hit_at IS NULL"))
+
+    stats = {"expired": 0, "trimmed": 0, "evicted": 0}
+    if settings.RETENTION_TTL_SECONDS > 0:
+        stats["expired"] = _expire(eng, now, hashes)
+    if settings.RETENTION_MAX_ROWS_PER_HASH > 0:
+        stats["trimmed"] = _trim_per_hash(eng, settings.RETENTION_MAX_ROWS_PER_HASH, hashes)
+    if max_bytes > 0 and _is_sqlite(eng):
+        stats["evicted"] = _evict_to_size(eng, max_bytes, hashes)
+    with eng.begin() as conn:
+        stats["problems_dropped"] = _drop_orphans(conn)
+        stats["visualizations_dropped"] = _drop_orphan_visualizations(conn)
+        stats["profiles_dropped"] = _drop_orphan_profiles(conn)
+        if settings.STATS_MINUTE_RETENTION_HOURS > 0:
+            stats["stat_rows_dropped"] = solve_stats.drop_before(
+                conn, "minute", now - timedelta(hours=settings.STATS_MINUTE_RETENTION_HOURS)
+            )
+
+    if _is_sqlite(eng):
+        _vacuum(eng)
+    return stats
+
+
+def compact(now: Optional[datetime] = None) -> dict:
+    """Apply the retention policies once; returns what was removed and reclaimed."""
+    t0 = time.perf_counter()
+    now = now or datetime.utcnow()
+    # the LRU policies need every hit recorded so far
+    flush_touches()
+    before = db_bytes()["file_bytes"]
+
+    databases = _databases()
+    stats: dict = {}
+    hashes: set = set()
+    for eng in databases:
+        for key, n in _compact_one(eng, now, settings.RETENTION_MAX_DB_BYTES // len(databases), hashes).items():
+            stats[key] = stats.get(key, 0) + n
+    # hot entries of deleted solutions would hand out ids that no longer resolve
+    from app.core.shared_state import get_result_cache
+    get_result_cache().invalidate(hashes)
+
+    after = db_bytes()["file_bytes"]
+    stats["bytes_reclaimed"] = max(before - after, 0)
+    stats["db_bytes"] = after
+    stats["compact_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+
+    metrics.inc("retention_runs_total")
+    for key in ("expired", "trimmed", "evicted"):
+        metrics.inc(f"retention_{key}_total", stats[key])
+    metrics.inc("retention_bytes_reclaimed_total", stats["bytes_reclaimed"])
+    metrics.set("db_bytes", after)
+    log.info("retention compact: %s", stats)
+    return stats
+
+
+# ---------- background job ----------
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _loop(interval: float) -> None:
+    from app.core.shared_state import get_store
+    while not _stop.wait(interval):
+        try:
+            # one worker per interval wins the shared counter and runs the pass
+            if get_store().incr("retention:leader", interval) != 1:
+                continue
+            compact()
+        except Exception:
+            log.exception("retention compact failed")
+
+
+def start_background() -> bool:
+    global _thread
+    interval = settings.RETENTION_INTERVAL_SECONDS
+    if interval <= 0 or (_thread is not None and _thread.is_alive()):
+        return False
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, args=(interval,), name="retention", daemon=True)
+    _thread.start()
+    return True
+
+
+def stop_background() -> None:
+    _stop.set()
@@ -0,0 +1,195 @@
+# app/services/sessions.py
+"""
+Incremental re-solve sessions.
+
+A problem registered with ``open_session`` keeps its CVXPY model in this
+process (solver/session.py), so later patches re-solve from the retained
+model and the previous iterate instead of starting over. Sessions live in an
+LRU of at most SESSION_MAX entries and are dropped after SESSION_TTL_SECONDS
+without use. They are not shared between worker processes: every version
+is persisted (the first under the session id, later ones with it as
+parent_id), and a worker that does not hold a session rebuilds it from the
+latest stored version (restore_session) before applying a patch.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.errors import BadInput
+from app.models.schema import ProblemInput, SessionPatch
+from app.services.validators import validate_problem
+
+
+class _Entry:
+    def __init__(self, session, problem: ProblemInput):
+        self.session = session
+        self.problem = problem
+        self.lock = asyncio.Lock()   # held across the awaited re-solve
+        self.version = 0
+        self.latency_ms: Optional[float] = None
+        self.used_at = time.monotonic()
+
+
+class SessionRegistry:
+    def __init__(self, max_sessions: int, ttl: float):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    def _expire(self, now: float) -> None:
+        if self.ttl <= 0:
+            return
+        for key in [k for k, e in self._entries.items() if now - e.used_at > self.ttl]:
+            del self._entries[key]
+
+    def add(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._expire(time.monotonic())
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(self.max_sessions, 1):
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.used_at = now
+                self._entries.move_to_end(key)
+            return entry
+
+    def setdefault(self, key: str, entry: _Entry) -> _Entry:
+        """``entry`` under ``key`` unless another request registered one first."""
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > max(self.max_sessions, 1):
+                    self._entries.popitem(last=False)
+            return self._entries[key]
+
+    def pop(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+registry = SessionRegistry(settings.SESSION_MAX, settings.SESSION_TTL_SECONDS)
+
+
+def _problem_input(session, sense: str) -> ProblemInput:
+    """The session's current data as a ProblemInput, for persistence."""
+    kw = session.problem_kwargs()
+
+    def _rows(v):
+        return None if v is None else np.asarray(v).tolist()
+
+    bounds = None
+    if kw["bounds"] is not None:
+        bounds = [
+            (float(lo) if np.isfinite(lo) else None, float(hi) if np.isfinite(hi) else None)
+            for lo, hi in kw["bounds"]
+        ]
+    return ProblemInput(
+        c=_rows(kw["c"]), A=_rows(kw["A"]), b=_rows(kw["b"]),
+        A_eq=_rows(kw["A_eq"]), b_eq=_rows(kw["b_eq"]), Q=_rows(kw["Q"]),
+        bounds=bounds, sense=sense,
+    )
+
+
+def _timed_solve(entry: _Entry) -> tuple[dict, float]:
+    t0 = time.perf_counter()
+    res = entry.session.solve()
+    return res, round((time.perf_counter() - t0) * 1000, 3)
+
+
+def _new_entry(p: ProblemInput) -> _Entry:
+    from solver.session import SolveSession
+
+    session = SolveSession(
+        c=p.c, A=p.A, b=p.b, Q=p.Q, bounds=p.bounds, A_eq=p.A_eq, b_eq=p.b_eq, sense=p.sense,
+    )
+    return _Entry(session, p)
+
+
+def open_session(p: ProblemInput) -> tuple[_Entry, dict, float]:
+    """Build and solve ``p``; the caller registers the entry under its problem id."""
+    try:
+        validate_problem(p)
+    except ValueError as e:
+        raise BadInput(str(e))
+    entry = _new_entry(p)
+    res, ms = _timed_solve(entry)
+    entry.latency_ms = ms
+    return entry, res, ms
+
+
+def restore_session(p: ProblemInput, version: int) -> _Entry:
+    """Rebuild the model of a stored session version, unsolved; the next patch solves it."""
+    entry = _new_entry(p)
+    entry.version = version
+    return entry
+
+
+def _check_patch(session, patch: SessionPatch) -> None:
+    n, m = session.n, session.b.size
+    if patch.remove_rows is not None and any(not 0 <= r < m for r in patch.remove_rows):
+        raise ValueError(f"remove_rows must be in [0, {m})")
+    m -= len(set(patch.remove_rows or ()))
+    if (patch.add_A is None) != (patch.add_b is None):
+        raise ValueError("add_A and add_b go together")
+    if patch.add_A is not None:
+        if len(patch.add_A) != len(patch.add_b):
+            raise ValueError("len(add_b) must equal number of rows in add_A")
+        if any(len(row) != n for row in patch.add_A):
+            raise ValueError("Each row of add_A must have len(c) columns")
+        if not np.isfinite(np.asarray(patch.add_A, dtype=np.float64)).all():
+            raise ValueError("add_A contains NaN/Inf")
+        if not np.isfinite(np.asarray(patch.add_b, dtype=np.float64)).all():
+            raise ValueError("add_b contains NaN/Inf")
+        m += len(patch.add_A)
+    if patch.b is not None and any(not 0 <= r < m or not np.isfinite(v) for r, v in patch.b):
+        raise ValueError(f"b updates need a row in [0, {m}) and a finite value")
+    if patch.bounds is not None and any(not 0 <= i < n for i, _, _ in patch.bounds):
+        raise ValueError(f"bounds updates need an index in [0, {n})")
+    if patch.bounds is not None and any(v is not None and np.isnan(v) for _, lb, ub in patch.bounds for v in (lb, ub)):
+        raise ValueError("bounds updates contain NaN (use None for no bound)")
+    if patch.c is not None and (len(patch.c) != n or not np.isfinite(patch.c).all()):
+        raise ValueError("c must have len(c) finite entries")
+
+
+def apply_patch(entry: _Entry, patch: SessionPatch) -> tuple[dict, float]:
+    """Apply ``patch`` and re-solve; the caller holds ``entry.lock``."""
+    session = entry.session
+    try:
+        _check_patch(session, patch)
+    except ValueError as e:
+        raise BadInput(str(e))
+    if patch.remove_rows:
+        session.remove_rows(patch.remove_rows)
+    if patch.add_A:
+        session.add_rows(patch.add_A, patch.add_b)
+    if patch.b:
+        rows, values = zip(*patch.b)
+        session.set_b(list(rows), list(values))
+    for index, lb, ub in patch.bounds or ():
+        session.set_bounds(index, lb, ub)
+    if patch.c is not None:
+        session.set_c(patch.c)
+
+    res, ms = _timed_solve(entry)
+    entry.version += 1
+    entry.problem = _problem_input(session, entry.problem.sense)
+    return res, ms
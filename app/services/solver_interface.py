@@ -1,8 +1,13 @@
 import math
-from app.models.schema import ProblemInput, ProblemResult
-from solver.solve import solve_lp
+import sys
+from typing import Optional
+from app.core.config import settings
+from app.models.schema import (
+    ProblemInput, ProblemResult, SolveOptions, SweepInput, SweepResult, VisualizeInput, VisualizationResult,
+)
 from app.services.validators import validate_problem
 from app.core.errors import BadInput
+from app.core.metrics import metrics
 
 def _finite(x) -> bool:
     try:
@@ -21,31 +26,208 @@ def _sanitize_solution(sol):
             out.append(x)
     return out
 
-def solve_problem(p: ProblemInput) -> ProblemResult:
+def preload() -> None:
+    """Import the solver stack (cvxpy, scipy, backends) ahead of the first solve."""
+    import solver.solve  # noqa: F401
+    import solver.sweep  # noqa: F401
+    import solver.session  # noqa: F401
+
+def workspace_stats() -> dict:
+    """Counters of the solver workspace pool as /metrics gauges; empty before the first solve."""
+    ws = sys.modules.get("solver.workspaces")
+    if ws is None or not ws.enabled():
+        return {}
+    return {f"solver_workspace_{k}": v for k, v in ws.get_pool().stats().items()}
+
+def _precheck(p: ProblemInput) -> Optional[dict]:
+    from solver.prechecks import precheck
+
+    res = precheck(c=p.c, A=p.A, b=p.b, Q=p.Q, bounds=p.bounds, A_eq=p.A_eq, b_eq=p.b_eq, sense=p.sense,
+                   rounds=settings.PRECHECK_ROUNDS)
+    metrics.inc("prechecks_total")
+    if res is not None:
+        metrics.inc(f"precheck_{res['status']}_total")
+    return res
+
+def solve_problem(p: ProblemInput, warm_start: Optional[dict] = None, block_cache=None) -> ProblemResult:
     try:
         validate_problem(p)
     except ValueError as e:
         raise BadInput(str(e))
 
+    # trivially infeasible/unbounded problems never build a model
+    if settings.PRECHECKS:
+        res = _precheck(p)
+        if res is not None:
+            return to_result(res)
+
+    # solver imports are deferred so that importing the app stays cheap
+    from solver import workspaces
+    from solver.solve import solve_lp
+
+    workspaces.configure(settings.WORKSPACE_POOL_MB * 2**20)
+
+    opts = p.options or SolveOptions()
     res = solve_lp(
         c=p.c,
         Q=p.Q,
         A=p.A,
         b=p.b,
+        A_eq=p.A_eq,
+        b_eq=p.b_eq,
         bounds=p.bounds,
         sense=p.sense,
+        presolve=opts.presolve,
+        scale=opts.scale,
+        warm_start=warm_start,
+        decompose=opts.decompose,
+        workers=settings.DECOMPOSE_WORKERS,
+        block_cache=block_cache,
+        trace=(settings.TRACE_SOLVES if opts.trace is None else opts.trace) and not opts.decompose,
     )
 
+    return to_result(res)
+
+def to_result(res: dict) -> ProblemResult:
+    """ProblemResult from a solver result dict, non-finite values as None."""
     status = res.get("status", "unknown")
     obj = res.get("objective_value")
     if isinstance(obj, float) and not _finite(obj):
         obj = None
 
     sol = _sanitize_solution(res.get("solution"))
+    duals = res.get("duals")
+    if duals is not None:
+        duals = {k: _sanitize_solution(list(v)) for k, v in duals.items()}
 
-    return ProblemResult(
+    stats = res.get("stats")
+    trace = res.get("trace")
+    if trace is not None:
+        stats = {**(stats or {}), "trace_rows": len(trace)}
+
+    out = ProblemResult(
         status=status,
         objective_value=obj,
         solution=sol,
         message=res.get("message"),
+        stats=stats,
+        duals=duals,
+        reduced_costs=_sanitize_solution(res.get("reduced_costs")),
+    )
+    out._trace = trace
+    return out
+
+def _validate_scenarios(s: SweepInput) -> int:
+    p = s.problem
+    if s.c_scenarios is None and s.b_scenarios is None:
+        raise ValueError("c_scenarios or b_scenarios is required")
+    counts = set()
+    if s.c_scenarios is not None:
+        if any(len(row) != len(p.c) for row in s.c_scenarios):
+            raise ValueError("Each row of c_scenarios must have len(c) entries")
+        if not all(_finite(x) for row in s.c_scenarios for x in row):
+            raise ValueError("c_scenarios contains NaN/Inf")
+        counts.add(len(s.c_scenarios))
+    if s.b_scenarios is not None:
+        if p.A is None or p.b is None:
+            raise ValueError("b_scenarios requires A and b")
+        if any(len(row) != len(p.b) for row in s.b_scenarios):
+            raise ValueError("Each row of b_scenarios must have len(b) entries")
+        if not all(_finite(x) for row in s.b_scenarios for x in row):
+            raise ValueError("b_scenarios contains NaN/Inf")
+        counts.add(len(s.b_scenarios))
+    if len(counts) > 1:
+        raise ValueError("c_scenarios and b_scenarios must have the same number of rows")
+    k = counts.pop()
+    if k == 0:
+        raise ValueError("At least one scenario is required")
+    if k > settings.SWEEP_MAX_SCENARIOS:
+        raise ValueError(f"At most {settings.SWEEP_MAX_SCENARIOS} scenarios per sweep")
+    return k
+
+def sweep_problem(s: SweepInput) -> SweepResult:
+    from solver.sweep import sweep_lp
+
+    try:
+        validate_problem(s.problem)
+        _validate_scenarios(s)
+    except ValueError as e:
+        raise BadInput(str(e))
+
+    p = s.problem
+    res = sweep_lp(
+        c=p.c,
+        Q=p.Q,
+        A=p.A,
+        b=p.b,
+        A_eq=p.A_eq,
+        b_eq=p.b_eq,
+        bounds=p.bounds,
+        sense=p.sense,
+        c_scenarios=s.c_scenarios,
+        b_scenarios=s.b_scenarios,
+        workers=min(s.workers, settings.SWEEP_MAX_WORKERS),
+        return_solutions=s.return_solutions,
+    )
+
+    sols = res.get("solutions")
+    return SweepResult(
+        status=res["status"],
+        objective_value=_sanitize_solution(res["objective_value"].tolist()),
+        solutions=None if sols is None else [_sanitize_solution(row) for row in sols.tolist()],
+        stats=res.get("stats"),
+    )
+
+def _validate_view(v: VisualizeInput) -> None:
+    p = v.problem
+    n = len(p.c)
+    dims = v.dims
+    if dims is None:
+        if n not in (2, 3):
+            raise ValueError("dims (2 or 3 variable indices) is required unless len(c) is 2 or 3")
+        dims = list(range(n))
+    if len(dims) not in (2, 3) or len(set(dims)) != len(dims):
+        raise ValueError("dims must name 2 or 3 distinct variables")
+    if any(not 0 <= d < n for d in dims):
+        raise ValueError(f"dims must be in [0, {n})")
+    if v.fixed is not None and (len(v.fixed) != n or not all(_finite(x) for x in v.fixed)):
+        raise ValueError("fixed must have len(c) finite entries")
+    if v.box is not None and (len(v.box) != len(dims) or any(not lo < hi for lo, hi in v.box)):
+        raise ValueError("box must have one (lo, hi) pair per dim, lo < hi")
+    if v.box is not None and not all(_finite(x) and abs(x) <= settings.VIZ_MAX_BOX for pair in v.box for x in pair):
+        raise ValueError(f"box entries must be finite and at most {settings.VIZ_MAX_BOX:g} in magnitude")
+    if v.grid > settings.VIZ_MAX_GRID:
+        raise ValueError(f"grid must be at most {settings.VIZ_MAX_GRID}")
+    halfspaces = len(p.b or ()) + 2 * len(p.b_eq or ()) + 2 * len(dims)
+    if halfspaces > settings.VIZ_MAX_HALFSPACES:
+        raise ValueError(f"At most {settings.VIZ_MAX_HALFSPACES} constraints can be visualized")
+
+def visualize_problem(v: VisualizeInput, optimum: Optional[list] = None) -> VisualizationResult:
+    """Feasible region of ``v.problem`` in ``v.dims``; ``optimum`` anchors the slice and the view."""
+    from solver.geometry import feasible_region
+
+    try:
+        validate_problem(v.problem)
+        _validate_view(v)
+    except ValueError as e:
+        raise BadInput(str(e))
+
+    if optimum is not None and any(x is None for x in optimum):
+        optimum = None
+    p = v.problem
+    res = feasible_region(
+        c=p.c,
+        Q=p.Q,
+        A=p.A,
+        b=p.b,
+        A_eq=p.A_eq,
+        b_eq=p.b_eq,
+        bounds=p.bounds,
+        dims=v.dims,
+        fixed=v.fixed,
+        box=v.box,
+        grid=v.grid,
+        levels=v.levels,
+        optimum=optimum,
     )
+    return VisualizationResult(**res)
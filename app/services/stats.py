@@ -0,0 +1,205 @@
+# app/services/stats.py
+"""
+Rollups of solve statistics for /stats.
+
+Every persisted solve and every database cache hit adds one to a row of
+``solve_stats`` keyed by (granularity, bucket_start, status, cached,
+solver, duration bin), for a minute and an hour bucket, in the transaction
+that stores the solution. /stats then reads O(buckets x bins) rows rather
+than scanning ``solutions``. Durations go into the fixed log-spaced bins of
+DURATION_BINS_MS, so percentiles are interpolated within a bin (accurate
+to a bin's width); mean and max are exact.
+
+With DB_SHARDS each shard keeps the rollups of the solves stored on it
+and /stats sums them.
+
+Cache hits, from the hot cache or the database, are counted in memory
+and added to the rollups in batches (count_hit, flush_hits), so a hit
+takes no write lock. Only client solves are counted: blocks of decomposed
+problems and session re-solves (problems.kind) are not.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence, Union
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# upper edges (ms); the last bin is open
+DURATION_BINS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, 300000)
+GRANULARITIES = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1)}
+
+# same text form SQLAlchemy's DateTime uses on SQLite (see app/services/retention.py)
+_TS = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def _utc(t: datetime) -> datetime:
+    """Naive UTC, as stored."""
+    return t if t.tzinfo is None else t.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_start(t: datetime, granularity: str) -> datetime:
+    if granularity == "minute":
+        return t.replace(second=0, microsecond=0)
+    return t.replace(minute=0, second=0, microsecond=0)
+
+
+def duration_bin(ms: float) -> int:
+    return bisect.bisect_left(DURATION_BINS_MS, ms)
+
+
+def record(db: Session, status: Optional[str], cached: bool, solver: Optional[str], duration_ms: float,
+           now: Optional[datetime] = None, n: int = 1) -> None:
+    """Count ``n`` solves (or cache hits) of ``duration_ms`` each in the minute and hour rollups."""
+    now = now or datetime.utcnow()
+    greatest = "MAX" if db.get_bind().dialect.name == "sqlite" else "GREATEST"
+    sql = text(f"""
+        INSERT INTO solve_stats (granularity, bucket_start, status, cached, solver, bin,
+                                 count, duration_sum, duration_max)
+        VALUES (:g, :t, :status, :cached, :solver, :bin, :n, :dsum, :d)
+        ON CONFLICT (granularity, bucket_start, status, cached, solver, bin) DO UPDATE SET
+            count = solve_stats.count + excluded.count,
+            duration_sum = solve_stats.duration_sum + excluded.duration_sum,
+            duration_max = {greatest}(solve_stats.duration_max, excluded.duration_max)
+    """)
+    d = float(duration_ms or 0)
+    base = {"status": status or "", "cached": 1 if cached else 0, "solver": solver or "",
+            "bin": duration_bin(d), "d": d, "n": n, "dsum": d * n}
+    for g in GRANULARITIES:
+        db.execute(sql, {**base, "g": g, "t": bucket_start(now, g).strftime(_TS)})
+
+
+# cache hits (hot and database) are counted here and written to the rollups
+# in batches by persistence.flush_touches, so a hit takes no write lock
+_hits: dict = {}  # (minute bucket, status) -> count
+_hits_lock = threading.Lock()
+
+
+def count_hit(status: Optional[str], now: Optional[datetime] = None) -> None:
+    key = (bucket_start(now or datetime.utcnow(), "minute"), status)
+    with _hits_lock:
+        _hits[key] = _hits.get(key, 0) + 1
+
+
+def flush_hits(db: Session) -> int:
+    """Write the counted cache hits to the rollups; returns how many there were."""
+    global _hits
+    with _hits_lock:
+        pending, _hits = _hits, {}
+    for (minute, status), n in pending.items():
+        record(db, status, True, None, 0, now=minute, n=n)
+    return sum(pending.values())
+
+
+def _percentile(hist: list, q: float) -> Optional[float]:
+    """``q``-quantile of binned durations, linear within the bin; the open bin reports its lower edge."""
+    total = sum(hist)
+    if total == 0:
+        return None
+    rank = q * total
+    seen = 0
+    for i, n in enumerate(hist):
+        if n and seen + n >= rank:
+            lo = DURATION_BINS_MS[i - 1] if i > 0 else 0.0
+            if i >= len(DURATION_BINS_MS):
+                return float(lo)
+            return round(lo + (DURATION_BINS_MS[i] - lo) * (rank - seen) / n, 3)
+        seen += n
+    return float(DURATION_BINS_MS[-1])
+
+
+class _Agg:
+    def __init__(self):
+        self.count = 0
+        self.cached = 0
+        self.solves = 0
+        self.duration_sum = 0.0
+        self.duration_max = 0.0
+        self.hist = [0] * (len(DURATION_BINS_MS) + 1)
+        self.by_status: dict = {}
+        self.by_solver: dict = {}
+
+    def add(self, r) -> None:
+        n = r["count"]
+        self.count += n
+        self.by_status[r["status"] or "unknown"] = self.by_status.get(r["status"] or "unknown", 0) + n
+        if r["cached"]:
+            self.cached += n
+            return
+        # duration figures describe actual solves, not cache lookups
+        self.solves += n
+        if r["solver"]:
+            self.by_solver[r["solver"]] = self.by_solver.get(r["solver"], 0) + n
+        self.duration_sum += r["duration_sum"]
+        self.duration_max = max(self.duration_max, r["duration_max"])
+        self.hist[r["bin"]] += n
+
+    def out(self) -> dict:
+        return {
+            "count": self.count,
+            "cached": self.cached,
+            "cache_hit_ratio": round(self.cached / self.count, 6) if self.count else None,
+            "by_status": self.by_status,
+            "by_solver": self.by_solver,
+            "duration_ms": {
+                "solves": self.solves,
+                "mean": round(self.duration_sum / self.solves, 3) if self.solves else None,
+                "p50": _percentile(self.hist, 0.50),
+                "p95": _percentile(self.hist, 0.95),
+                "p99": _percentile(self.hist, 0.99),
+                "max": self.duration_max if self.solves else None,
+            },
+        }
+
+
+def query(db: Union[Session, Sequence[Session]], granularity: str, since: datetime, until: datetime,
+          status: Optional[str] = None, solver: Optional[str] = None) -> dict:
+    """
+    Totals and a per-bucket series over [since, until) from the rollups; with
+    several sessions (one per shard) their rows are summed.
+    """
+    since, until = _utc(since), _utc(until)
+    where = ["granularity = :g", "bucket_start >= :since", "bucket_start < :until"]
+    params = {"g": granularity, "since": bucket_start(since, granularity).strftime(_TS),
+              "until": until.strftime(_TS)}
+    if status is not None:
+        where.append("status = :status")
+        params["status"] = status
+    if solver is not None:
+        where.append("solver = :solver")
+        params["solver"] = solver
+    sql = text(f"""
+        SELECT bucket_start, status, cached, solver, bin, count, duration_sum, duration_max
+        FROM solve_stats WHERE {" AND ".join(where)}
+        ORDER BY bucket_start
+    """)
+    dbs = [db] if isinstance(db, Session) else db
+    rows = [r for d in dbs for r in d.execute(sql, params).mappings().all()]
+    if len(dbs) > 1:
+        rows.sort(key=lambda r: str(r["bucket_start"]))
+
+    total = _Agg()
+    series: dict = {}
+    for r in rows:
+        total.add(r)
+        key = str(r["bucket_start"])
+        series.setdefault(key, _Agg()).add(r)
+    return {
+        "granularity": granularity,
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "buckets": len(series),
+        "rows_read": len(rows),
+        "totals": total.out(),
+        "series": [{"bucket_start": k, **agg.out()} for k, agg in series.items()],
+    }
+
+
+def drop_before(conn, granularity: str, cutoff: datetime) -> int:
+    return conn.execute(
+        text("DELETE FROM solve_stats WHERE granularity = :g AND bucket_start < :t"),
+        {"g": granularity, "t": cutoff.strftime(_TS)},
+    ).rowcount
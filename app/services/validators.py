@@ -1,30 +1,62 @@
-import math
+import numpy as np
 from app.models.schema import ProblemInput
 
-def _has_nan_inf(arr):
-    for v in arr:
-        if v is None:
-            return True
-        if isinstance(v, float) and (math.isnan(v) or math.isinf(v)):
-            return True
-    return False
+def _present(v) -> bool:
+    return v is not None and len(v) > 0
+
+def _as_array(v, ndim: int):
+    """float64 view of a list or ndarray field; None entries become NaN. None if ragged."""
+    try:
+        arr = np.asarray(v, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    return arr if arr.ndim == ndim else None
+
+def _has_nan_inf(arr) -> bool:
+    return not bool(np.isfinite(arr).all())
 
 def validate_problem(p: ProblemInput):
-    if not p.c or len(p.c) == 0:
+    if p.c is None or len(p.c) == 0:
         raise ValueError("c (objective) is required")
-    n = len(p.c)
-    if p.A:
-        for row in p.A:
-            if len(row) != n:
-                raise ValueError("Each row of A must have len(c) columns")
-    if p.b and p.A and len(p.b) != len(p.A):
+    c = _as_array(p.c, 1)
+    if c is None:
+        raise ValueError("c must be a flat vector")
+    n = c.shape[0]
+    if _present(p.A):
+        A = _as_array(p.A, 2)
+        if A is None or A.shape[1] != n:
+            raise ValueError("Each row of A must have len(c) columns")
+        if _has_nan_inf(A):
+            raise ValueError("A contains NaN/Inf")
+    if _present(p.b) and _present(p.A) and len(p.b) != len(p.A):
         raise ValueError("len(b) must equal number of rows in A")
-    if p.bounds and len(p.bounds) != n:
-        raise ValueError("len(bounds) must equal len(c)")
-    if _has_nan_inf(p.c):
+    if _present(p.A_eq):
+        A_eq = _as_array(p.A_eq, 2)
+        if A_eq is None or A_eq.shape[1] != n:
+            raise ValueError("Each row of A_eq must have len(c) columns")
+        if _has_nan_inf(A_eq):
+            raise ValueError("A_eq contains NaN/Inf")
+    if _present(p.b_eq) and _present(p.A_eq) and len(p.b_eq) != len(p.A_eq):
+        raise ValueError("len(b_eq) must equal number of rows in A_eq")
+    if _present(p.bounds):
+        if len(p.bounds) != n:
+            raise ValueError("len(bounds) must equal len(c)")
+        bounds = _as_array(p.bounds, 2)
+        if bounds is None or bounds.shape[1] != 2:
+            raise ValueError("bounds must be (lb, ub) pairs")
+    if _has_nan_inf(c):
         raise ValueError("c contains NaN/Inf")
-    if p.b and _has_nan_inf(p.b):
-        raise ValueError("b contains NaN/Inf")
-    if p.Q:
-        if len(p.Q) != n or any(len(row) != n for row in p.Q):
+    if _present(p.b):
+        b = _as_array(p.b, 1)
+        if b is None or _has_nan_inf(b):
+            raise ValueError("b contains NaN/Inf")
+    if _present(p.b_eq):
+        b_eq = _as_array(p.b_eq, 1)
+        if b_eq is None or _has_nan_inf(b_eq):
+            raise ValueError("b_eq contains NaN/Inf")
+    if _present(p.Q):
+        Q = _as_array(p.Q, 2)
+        if Q is None or Q.shape != (n, n):
             raise ValueError("Q must be square with size len(c)")
+        if _has_nan_inf(Q):
+            raise ValueError("Q contains NaN/Inf")
@@ -0,0 +1,72 @@
+"""
+Latency of small /solve requests while large ones arrive at the same time.
+
+"shared" is the path before admission control: every body is parsed on the
+event loop and every solve takes a slot of the one solve pool. "routed" is
+what /solve does now: problems sized as large (app/core/admission.py) are
+parsed and solved on the large-problem pool. Reported: small-request
+latency percentiles and how long the large batch took.
+
+    python -m benchmarks.bench_admission [large_requests] [small_requests] [size]
+"""
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.api.v1.routes import _parse
+from app.core.admission import admit
+from app.core.config import settings
+from app.services.executor import run_large, run_solve, shutdown
+from app.services.solver_interface import preload, solve_problem
+
+
+def _bodies(size):
+    rng = np.random.default_rng(0)
+    A = rng.random((size, 2 * size))
+    large = {"c": (-rng.random(2 * size)).tolist(), "A": A.tolist(), "b": A.sum(1).tolist(),
+             "bounds": [[0, 1]] * (2 * size)}
+    small = {"c": [-1.0, -2.0], "A": [[1.0, 1.0]], "b": [3.0], "bounds": [[0, None], [0, None]]}
+    return json.dumps(large).encode(), json.dumps(small).encode()
+
+
+async def _request(mode, body):
+    size = admit("application/json", body)
+    if mode == "routed" and size is not None and size.large:
+        return await run_large(lambda: solve_problem(_parse("application/json", body)))
+    return await run_solve(solve_problem, _parse("application/json", body))
+
+
+async def _run(mode, large_body, small_body, n_large, n_small):
+    latencies = []
+
+    async def small():
+        for _ in range(n_small):
+            t = time.perf_counter()
+            await _request(mode, small_body)
+            latencies.append((time.perf_counter() - t) * 1000)
+            await asyncio.sleep(0.01)
+
+    t0 = time.perf_counter()
+    big = asyncio.gather(*(_request(mode, large_body) for _ in range(n_large)))
+    await asyncio.gather(small(), small())
+    await big
+    return np.percentile(latencies, [50, 99]), max(latencies), time.perf_counter() - t0
+
+
+def main(n_large=4, n_small=20, size=400):
+    preload()
+    large_body, small_body = _bodies(size)
+    settings.LARGE_PROBLEM_MB = admit("application/json", large_body).est_mb / 2
+    print(f"large: {size}x{2 * size} dense, {len(large_body) / 2**20:.1f} MB body  "
+          f"solve pool={settings.SOLVE_CONCURRENCY}  large pool={settings.LARGE_SOLVE_CONCURRENCY}")
+    for mode in ("shared", "routed"):
+        (p50, p99), worst, total = asyncio.run(_run(mode, large_body, small_body, n_large, n_small))
+        print(f"{mode:7s} small p50={p50:8.1f}ms  p99={p99:8.1f}ms  max={worst:8.1f}ms  all done in {total:6.2f}s")
+        shutdown()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,100 @@
+"""
+Cache-hit throughput with many simultaneous clients: each client looks up
+a stored solution by spec_hash, as /solve does on a cache miss in the hot
+cache. "blocking" runs the sync lookup on the event loop (as the routes did
+before the async path); "async" uses find_cached_solution_async. The loop
+lag column is the worst delay seen by a 1 ms ticker running alongside, i.e.
+how long other requests would have waited.
+
+Then one large LP (rows x cols) is stored and looked up through the async
+path (the same with or without the async driver): its hashing and
+encoding must not hold the loop for most of the call.
+
+    python -m benchmarks.bench_db [clients] [lookups_per_client] [rows] [cols]
+"""
+import asyncio
+import sys
+import time
+
+import numpy as np
+
+from app.db.session import HAVE_ASYNC_DB
+from app.models.schema import ProblemInput
+from app.services.persistence import (
+    _find_and_touch,
+    create_tables,
+    find_cached_solution_async,
+    get_session,
+    persist_problem_and_solution,
+    persist_problem_and_solution_async,
+    spec_hash,
+)
+
+
+def _blocking(h):
+    with get_session() as db:
+        return _find_and_touch(db, h, None)
+
+
+async def _ticking(coro):
+    """(result of coro, seconds it took, worst delay of a 1 ms ticker alongside)."""
+    lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal lag
+        while not done.is_set():
+            t = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - t - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    t0 = time.perf_counter()
+    out = await coro
+    elapsed = time.perf_counter() - t0
+    done.set()
+    await tick
+    return out, elapsed, lag
+
+
+async def _run(mode, h, clients, lookups):
+    async def client():
+        for _ in range(lookups):
+            if mode == "async":
+                await find_cached_solution_async(h)
+            else:
+                _blocking(h)
+                await asyncio.sleep(0)
+
+    _, elapsed, lag = await _ticking(asyncio.gather(*(client() for _ in range(clients))))
+    return clients * lookups / elapsed, lag * 1000
+
+
+def _large(rows, cols):
+    rng = np.random.default_rng(0)
+    p = ProblemInput(c=rng.random(cols).tolist(), A=rng.random((rows, cols)).tolist(), b=rng.random(rows).tolist(),
+                     bounds=[(0, None)] * cols)
+    result = {"status": "optimal", "objective_value": 0.0, "solution": rng.random(cols).tolist(),
+              "duals": {"ineq": rng.random(rows).tolist(), "eq": []}}
+    _, store_s, store_lag = asyncio.run(_ticking(persist_problem_and_solution_async(p, result, 1)))
+    _, find_s, find_lag = asyncio.run(_ticking(find_cached_solution_async(spec_hash(p), p)))
+    for label, s, lag in (("store", store_s, store_lag), ("lookup", find_s, find_lag)):
+        print(f"{label:9s}  {rows}x{cols}  {s * 1000:8.1f}ms  max loop lag={lag * 1000:8.2f}ms")
+        assert lag < max(s / 2, 0.05), f"{label} held the event loop for {lag * 1000:.0f}ms of {s * 1000:.0f}ms"
+
+
+def main(clients=64, lookups=20, rows=600, cols=800):
+    create_tables()
+    p = ProblemInput(c=[1.0, 2.0], A=[[1.0, 1.0]], b=[5.0], bounds=[(0, None), (0, None)])
+    persist_problem_and_solution(p, {"status": "optimal", "objective_value": 0.0, "solution": [0.0, 0.0]}, 1, False)
+    h = spec_hash(p)
+    print(f"clients={clients}  lookups/client={lookups}  async driver={HAVE_ASYNC_DB}")
+    for mode in ("blocking", "async"):
+        asyncio.run(_run(mode, h, 4, 2))  # warm connections and the pool
+        rate, lag = asyncio.run(_run(mode, h, clients, lookups))
+        print(f"{mode:9s}  {rate:9.1f} hits/s  max loop lag={lag:8.2f}ms")
+    _large(rows, cols)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
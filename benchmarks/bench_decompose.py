@@ -0,0 +1,50 @@
+"""
+Wall time of one solve over k independent QP blocks, monolithic versus
+decomposed (sequential and across worker processes).
+
+    python -m benchmarks.bench_decompose [blocks] [block_size] [workers]
+"""
+import sys
+import time
+
+import numpy as np
+import scipy.linalg as la
+
+from solver.solve import solve_lp
+
+
+def make_problem(k, size, seed=0):
+    rng = np.random.default_rng(seed)
+    Qs, As, bs = [], [], []
+    for _ in range(k):
+        M = rng.standard_normal((size, size))
+        Qs.append(M @ M.T / size + np.eye(size))
+        A = rng.standard_normal((size // 2, size))
+        As.append(A)
+        bs.append(A @ rng.random(size) + 1.0)
+    return dict(
+        c=rng.standard_normal(k * size),
+        Q=la.block_diag(*Qs),
+        A=la.block_diag(*As),
+        b=np.concatenate(bs),
+    )
+
+
+def _run(label, **kwargs):
+    t0 = time.perf_counter()
+    res = solve_lp(**kwargs)
+    print(f"{label:22} status={res['status']:10} obj={res['objective_value']:.6f} "
+          f"wall={(time.perf_counter() - t0) * 1000:9.1f}ms")
+
+
+def main(k=8, size=60, workers=4):
+    kwargs = make_problem(k, size)
+    _run("monolithic", **kwargs)
+    _run("decomposed", decompose=True, **kwargs)
+    # the first parallel call pays for starting the pool; time the second
+    solve_lp(decompose=True, workers=workers, **kwargs)
+    _run(f"decomposed x{workers}", decompose=True, workers=workers, **kwargs)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,101 @@
+"""
+Per-request cost of the request summary record: a trivial ASGI app called
+directly (no server, no network) bare, behind RequestSummaryMiddleware with
+the previous inline setup (render and write on the request path), and behind
+it with the queued writer. Output goes to /dev/null, and then to a sink that
+takes 200us per write, standing in for a stdout pipe under backpressure.
+
+    python -m benchmarks.bench_logging [requests]
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+
+import structlog
+
+from app.core.logging import RequestSummaryMiddleware, note, setup_logging, stop_logging
+
+
+async def _endpoint(scope, receive, send):
+    note(spec_hash="0" * 64, cache="hot", phases={"hot_lookup": 0.1})
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def _clear_handlers():
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+
+
+def _inline_logging(stream):
+    """The setup before the queue: JSON rendered and written by the caller."""
+    stop_logging()
+    _clear_handlers()
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.add_log_level,
+            structlog.processors.dict_tracebacks,
+            structlog.processors.JSONRenderer(),
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=False,
+    )
+    logging.getLogger().addHandler(logging.StreamHandler(stream))
+    logging.getLogger().setLevel(logging.INFO)
+
+
+class _SlowSink:
+    def __init__(self, stream, delay):
+        self.stream, self.delay = stream, delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _us_per_request(app, n):
+    scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(_):
+        pass
+
+    async def run():
+        for _ in range(n):
+            await app(scope, receive, send)
+
+    t0 = time.perf_counter()
+    asyncio.run(run())
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main(n=20000):
+    devnull = open(os.devnull, "w")
+    wrapped = RequestSummaryMiddleware(_endpoint)
+    bare = _us_per_request(_endpoint, n)
+    print(f"requests={n}  bare={bare:.1f} us/request")
+    for label, stream in (("/dev/null", devnull), ("200us/write", _SlowSink(devnull, 2e-4))):
+        # inline first: setup_logging() caches loggers on first use
+        _inline_logging(stream)
+        inline = _us_per_request(wrapped, n)
+        _clear_handlers()
+        setup_logging(stream=stream)
+        queued = _us_per_request(wrapped, n)
+        stop_logging()
+        structlog.reset_defaults()
+        print(f"{label:12s} summary inline {inline:8.1f} us/request   queued {queued:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
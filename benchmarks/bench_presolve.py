@@ -0,0 +1,43 @@
+"""
+Wall time of solve_lp with and without presolve on an LP padded with the
+redundancy presolve removes (fixed variables, duplicate and singleton rows).
+
+    python -m benchmarks.bench_presolve [n] [repeats]
+"""
+import sys
+import time
+
+import numpy as np
+
+from solver.solve import solve_lp
+
+
+def make_problem(n, seed=0):
+    rng = np.random.default_rng(seed)
+    m = n // 2
+    A = rng.random((m, n))
+    b = A.sum(axis=1) * 0.5
+    A = np.vstack([A, A * 2.0, np.eye(n)[: n // 4]])           # duplicates + singletons
+    b = np.concatenate([b, b * 2.0, np.full(n // 4, 0.9)])
+    bounds = [(0.0, 1.0)] * n
+    for j in range(0, n, 5):                                    # every 5th variable fixed
+        bounds[j] = (0.25, 0.25)
+    return dict(c=-rng.random(n), A=A, b=b, bounds=bounds)
+
+
+def main(n=200, repeats=3):
+    kwargs = make_problem(n)
+    for presolve in (False, True):
+        best, res = float("inf"), None
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            res = solve_lp(presolve=presolve, **kwargs)
+            best = min(best, time.perf_counter() - t0)
+        print(f"presolve={presolve!s:5} status={res['status']:8} obj={res['objective_value']:.6f} "
+              f"best={best * 1000:.1f}ms")
+        if presolve:
+            print("  ", res["stats"]["presolve"])
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""
+Iterations and solve time with and without Ruiz equilibration on a QP whose
+rows and columns span many orders of magnitude.
+
+    python -m benchmarks.bench_scaling [n] [decades]
+"""
+import sys
+
+import numpy as np
+
+from solver.solve import solve_lp
+
+
+def make_problem(n, decades, seed=0):
+    rng = np.random.default_rng(seed)
+    m = n
+    row_mag = 10.0 ** rng.uniform(-decades / 2, decades / 2, m)
+    col_mag = 10.0 ** rng.uniform(-decades / 2, decades / 2, n)
+    A = rng.standard_normal((m, n)) * row_mag[:, None] * col_mag[None, :]
+    x0 = rng.random(n) / col_mag
+    b = A @ x0 + row_mag
+    Q = np.diag(rng.uniform(0.5, 1.5, n) * col_mag ** 2)
+    c = rng.standard_normal(n) * col_mag
+    return dict(c=c, A=A, b=b, Q=Q)
+
+
+def main(n=60, decades=6):
+    kwargs = make_problem(n, decades)
+    for scale in (False, True):
+        res = solve_lp(scale=scale, **kwargs)
+        st = res.get("stats", {})
+        print(f"scale={scale!s:5} status={res['status']:18} obj={res['objective_value']!s:22} "
+              f"solver={st.get('solver')} iters={st.get('iterations')} "
+              f"solve={st.get('solve_time_ms')}ms wall={st.get('wall_ms')}ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
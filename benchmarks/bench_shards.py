@@ -0,0 +1,72 @@
+"""
+Persist throughput of several worker processes writing at once, for
+DB_SHARDS = 1, 2, 4, 8. Each writer stores distinct small problems with
+persist_problem_and_solution (one transaction per solve, as /solve does)
+into a fresh database directory; with one shard every commit waits for the
+same SQLite write lock, with more they spread over as many files.
+
+    python -m benchmarks.bench_shards [writers] [solves_per_writer]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SHARDS = (1, 2, 4, 8)
+
+
+def _env(directory, shards):
+    return {**os.environ, "API_TOKEN": os.environ.get("API_TOKEN", "bench"),
+            "DATABASE_URL": f"sqlite:///{directory}/cvxviz.db", "DB_SHARDS": str(shards)}
+
+
+def _child(writer, solves, start_at):
+    from app.models.schema import ProblemInput
+    from app.services.persistence import persist_problem_and_solution
+
+    problems = [ProblemInput(c=[1.0, float(writer), float(i)], A=[[-1.0, -1.0, -1.0]], b=[-1.0])
+                for i in range(solves)]
+    result = {"status": "optimal", "objective_value": 1.0, "solution": [1.0, 0.0, 0.0]}
+    time.sleep(max(0.0, start_at - time.time()))
+    for p in problems:
+        persist_problem_and_solution(p, result, 1, False)
+    print(f"{time.time():.6f}")
+
+
+def _run(shards, writers, solves):
+    with tempfile.TemporaryDirectory() as d:
+        env = _env(d, shards)
+        # schema first, so the writers only insert
+        subprocess.run([sys.executable, "-c", "from app.services.persistence import create_tables; create_tables()"],
+                       env=env, check=True)
+        start_at = time.time() + 2.0  # past every child's imports
+        procs = [
+            subprocess.Popen([sys.executable, "-m", "benchmarks.bench_shards", "--child",
+                              str(w), str(solves), repr(start_at)],
+                             env=env, stdout=subprocess.PIPE, text=True)
+            for w in range(writers)
+        ]
+        ends = []
+        for p in procs:
+            out, _ = p.communicate()
+            if p.returncode:
+                raise RuntimeError(f"writer failed with exit code {p.returncode}")
+            ends.append(float(out.strip().splitlines()[-1]))
+        return writers * solves / (max(ends) - start_at)
+
+
+def main(writers=8, solves=200):
+    print(f"writers={writers}  solves/writer={solves}  cores={os.cpu_count()}")
+    base = None
+    for n in SHARDS:
+        rate = _run(n, writers, solves)
+        base = base or rate
+        print(f"shards={n}  {rate:9.1f} solves/s  x{rate / base:.2f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]))
+    else:
+        main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,54 @@
+"""
+Throughput of concurrent solves for combinations of solve concurrency and
+per-solve BLAS/solver threads. Each combination runs in a fresh process,
+since BLAS reads its thread count once, when numpy loads.
+
+    python -m benchmarks.bench_threads [n] [solves]
+"""
+import os
+import subprocess
+import sys
+import time
+
+COMBOS = ((1, 1), (1, 0), (2, 1), (4, 1), (4, 0), (8, 1))   # (concurrency, threads); 0 = all cores
+
+
+def _child(concurrency, threads, n, solves):
+    from solver.threads import configure, cpu_count
+    configure(threads or cpu_count())
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from benchmarks.bench_trace import make_problem
+    from solver.solve import solve_lp
+
+    problems = [make_problem(n, qp=i % 2 == 1, seed=i) for i in range(solves)]
+    solve_lp(**problems[0])  # warm imports and caches
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda kw: solve_lp(**kw), problems))
+    print(f"{solves / (time.perf_counter() - t0):.2f}")
+
+
+def main(n=150, solves=24):
+    from solver.threads import cpu_count
+    cpus = cpu_count()
+    print(f"cores={cpus}  n={n}  solves={solves} (half LP, half QP)")
+    for concurrency, threads in COMBOS:
+        per_solve = threads or cpus
+        env = {**os.environ, "OMP_NUM_THREADS": str(per_solve), "OPENBLAS_NUM_THREADS": str(per_solve),
+               "MKL_NUM_THREADS": str(per_solve)}
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_threads", "--child",
+             str(concurrency), str(threads), str(n), str(solves)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        print(f"concurrency={concurrency:2d}  threads/solve={per_solve:3d}  "
+              f"total={concurrency * per_solve:3d}  {float(out):8.2f} solves/s")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(*(int(a) for a in sys.argv[2:6]))
+    else:
+        main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,103 @@
+"""
+Overhead of trace mode, alone and under concurrency.
+
+First the median wall time of the same solve with and without
+per-iteration capture, for an LP (Clarabel) and a QP (OSQP). Then a child
+process runs ``threads`` solvers (LPs and QPs alternating) for ``seconds``
+while another thread writes numbered log lines to stdout; the parent counts
+the lines that arrive, so output a capture swallowed shows up as lost.
+
+    python -m benchmarks.bench_trace [n] [repeats] [threads] [seconds]
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from solver.solve import solve_lp
+
+
+def make_problem(n, qp, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((n // 2, n))
+    out = dict(
+        c=rng.standard_normal(n),
+        A=A,
+        b=A @ rng.random(n) + 1.0,
+        bounds=np.column_stack([np.zeros(n), np.full(n, 10.0)]),
+    )
+    if qp:
+        M = rng.standard_normal((n, n))
+        out["Q"] = M @ M.T / n + np.eye(n)
+    return out
+
+
+def _median_ms(repeats, **kwargs):
+    times, res = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        res = solve_lp(**kwargs)
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.median(times)), res
+
+
+def _child(n, threads, seconds, traced):
+    problems = [make_problem(n, qp=bool(i % 2), seed=i) for i in range(threads)]
+    for kwargs in problems[:2]:
+        solve_lp(**kwargs)  # warm imports and caches
+    solves = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def solver(i):
+        while time.perf_counter() < deadline:
+            solve_lp(trace=traced, **problems[i])
+            solves[i] += 1
+
+    workers = [threading.Thread(target=solver, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    logged = 0
+    while time.perf_counter() < deadline:
+        print(f"log {logged}", flush=True)
+        logged += 1
+        time.sleep(0.001)
+    for t in workers:
+        t.join()
+    print(f"{sum(solves)} {logged}", file=sys.stderr)
+
+
+def _concurrent(n, threads, seconds, traced):
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_trace", "--child", str(n), str(threads), str(seconds),
+         "1" if traced else "0"],
+        capture_output=True, text=True, check=True,
+    )
+    solves, logged = (int(v) for v in proc.stderr.strip().splitlines()[-1].split())
+    received = sum(line.startswith("log ") for line in proc.stdout.splitlines())
+    return solves / seconds, logged, logged - received
+
+
+def main(n=200, repeats=15, threads=4, seconds=3):
+    for label, qp in (("LP", False), ("QP", True)):
+        kwargs = make_problem(n, qp)
+        solve_lp(**kwargs)  # warm imports and caches
+        plain, _ = _median_ms(repeats, **kwargs)
+        traced, res = _median_ms(repeats, trace=True, **kwargs)
+        rows = 0 if res.get("trace") is None else len(res["trace"])
+        print(f"{label} n={n:5d}  plain={plain:8.2f}ms  traced={traced:8.2f}ms  "
+              f"overhead={(traced / plain - 1) * 100:6.1f}%  rows={rows}")
+
+    print(f"threads={threads}  seconds={seconds}  cores={os.cpu_count()}")
+    for traced in (False, True):
+        rate, logged, lost = _concurrent(n, threads, seconds, traced)
+        print(f"{'traced' if traced else 'plain ':6s}  {rate:8.1f} solves/s  log lines lost {lost}/{logged}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]), sys.argv[5] == "1")
+    else:
+        main(*(int(a) for a in sys.argv[1:]))
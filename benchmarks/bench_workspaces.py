@@ -0,0 +1,63 @@
+"""
+Setup time saved by reusing solver workspaces (solver/workspaces.py).
+
+A sequence of problems shares one sparsity pattern and differs in c and b,
+as when a user re-solves with new costs or capacities. "fresh" solves
+through CVXPY (a new model and solver every time, as solve_lp does without
+the pool); "pooled" updates the live OSQP (QP) or Clarabel (LP) instance in
+place. Also reports the pool's memory estimate for what it keeps.
+
+    python -m benchmarks.bench_workspaces [n] [rows] [solves]
+"""
+import sys
+import time
+
+import numpy as np
+
+from solver import workspaces
+from solver.solve import solve_lp
+
+
+def _problems(n, m, k, qp):
+    rng = np.random.default_rng(0)
+    A = rng.random((m, n)) * (rng.random((m, n)) < 0.2)
+    Q = None
+    if qp:
+        F = rng.random((n, 5))
+        Q = F @ F.T + np.eye(n) * 0.1
+    for _ in range(k):
+        yield dict(c=-rng.random(n), A=A, b=rng.random(m) * n * 0.1 + 1, Q=Q,
+                   bounds=np.column_stack([np.zeros(n), np.ones(n)]))
+
+
+def _run(problems):
+    wall, solve, objs = [], [], []
+    for p in problems:
+        t = time.perf_counter()
+        res = solve_lp(**p)
+        wall.append((time.perf_counter() - t) * 1000)
+        solve.append(res["stats"].get("solve_time_ms") or 0.0)
+        objs.append(res["objective_value"])
+    return np.mean(wall[1:]), np.mean(solve[1:]), objs
+
+
+def main(n=300, m=200, k=20):
+    print(f"n={n}  rows={m}  solves={k}  (first solve of each run left out of the means)")
+    for qp in (True, False):
+        kind = "QP/OSQP" if qp else "LP/Clarabel"
+        workspaces.configure(0)
+        f_wall, f_solve, f_obj = _run(_problems(n, m, k, qp))
+        workspaces.configure(256 * 2**20)
+        p_wall, p_solve, p_obj = _run(_problems(n, m, k, qp))
+        st = workspaces.get_pool().stats()
+        gap = max(abs(a - b) / max(1.0, abs(a)) for a, b in zip(f_obj, p_obj))
+        print(f"{kind:12s} fresh  {f_wall:8.2f} ms/solve (in the solver {f_solve:7.2f} ms)")
+        print(f"{'':12s} pooled {p_wall:8.2f} ms/solve (in the solver {p_solve:7.2f} ms)  "
+              f"setup saved {st['setup_saved_ms'] / max(1, st['hits']):.2f} ms/hit over {st['hits']} hits  "
+              f"max rel objective gap {gap:.1e}")
+        print(f"{'':12s} pool holds {st['workspaces']} workspace(s), estimated {st['bytes'] / 1024:.0f} KB")
+        workspaces.configure(0)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,71 @@
+"""
+Where API cold-start time goes: a per-package breakdown of ``import app.main``
+(from ``python -X importtime``) and the wall time from process start until a
+real uvicorn worker answers /health.
+
+    python -m benchmarks.startup_profile [top] [port]
+"""
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+
+def import_breakdown(module="app.main"):
+    """Cumulative import time (ms) per top-level package, plus the total."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=os.environ.copy(), check=True,
+    )
+    per_pkg = defaultdict(float)
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        ms = int(cumulative) / 1000
+        indent = len(name) - len(name.lstrip())
+        name = name.strip()
+        if indent <= 1:  # top-level imports of the -c statement
+            total += ms
+        pkg = name.split(".")[0]
+        # the outermost line of a package already includes its submodules
+        per_pkg[pkg] = max(per_pkg[pkg], ms)
+    return dict(per_pkg), total
+
+
+def time_to_health(port=8765, timeout=60.0):
+    """Seconds from spawning uvicorn until GET /health returns 200."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    url = f"http://127.0.0.1:{port}/api/v1/health"
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - t0
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"/health did not answer within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(top=15, port=8765):
+    os.environ.setdefault("API_TOKEN", "profile")
+    per_pkg, total = import_breakdown()
+    print(f"imports at startup: {total:.1f} ms")
+    for name, ms in sorted(per_pkg.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {name:24} {ms:9.1f} ms")
+    print(f"time to first /health: {time_to_health(port) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
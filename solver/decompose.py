@@ -0,0 +1,266 @@
+"""
+Block-diagonal decomposition.
+
+Variables and constraint rows form a bipartite graph (an edge per nonzero of
+A / A_eq, plus an edge per off-diagonal nonzero of Q between two variables).
+Each connected component is an independent sub-problem: it is solved on its
+own, possibly in another process, and the pieces are stitched back into one
+result. Wall time then follows the largest block rather than the sum.
+
+Rows with no nonzeros belong to no block; they are only checked for
+feasibility (0 <= b, 0 = b_eq).
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from solver.solve import bounds_to_arrays, solve_lp
+from solver.threads import init_worker, worker_threads
+
+_EMPTY_ROW_TOL = 1e-9
+
+
+@dataclass
+class Block:
+    cols: np.ndarray      # variable indices
+    rows: np.ndarray      # rows of A
+    eq_rows: np.ndarray   # rows of A_eq
+
+    @property
+    def size(self) -> int:
+        return self.cols.size + self.rows.size + self.eq_rows.size
+
+
+def _matrix(M, n):
+    return sp.csr_matrix((0, n)) if M is None else sp.csr_matrix(np.asarray(M, dtype=np.float64).reshape(-1, n))
+
+
+def find_blocks(n, A=None, A_eq=None, Q=None) -> List[Block]:
+    """Connected components of the variable-constraint graph, ordered by first variable."""
+    A, A_eq = _matrix(A, n), _matrix(A_eq, n)
+    m, m_eq = A.shape[0], A_eq.shape[0]
+    # node ids: variables 0..n-1, then rows of A, then rows of A_eq
+    r, v = A.nonzero()
+    r_eq, v_eq = A_eq.nonzero()
+    src = [r + n, r_eq + n + m]
+    dst = [v, v_eq]
+    if Q is not None:
+        qi, qj = sp.coo_matrix(np.asarray(Q, dtype=np.float64)).nonzero()
+        off = qi != qj
+        src.append(qi[off])
+        dst.append(qj[off])
+    src, dst = np.concatenate(src), np.concatenate(dst)
+    size = n + m + m_eq
+    graph = sp.coo_matrix((np.ones(src.size), (src, dst)), shape=(size, size))
+    _, labels = connected_components(graph, directed=False)
+
+    var_labels = labels[:n]
+    row_labels, eq_labels = labels[n:n + m], labels[n + m:]
+    blocks = []
+    # np.unique on the variables' labels drops components that are lone empty rows
+    _, first = np.unique(var_labels, return_index=True)
+    for lab in var_labels[np.sort(first)]:
+        blocks.append(Block(
+            cols=np.flatnonzero(var_labels == lab),
+            rows=np.flatnonzero(row_labels == lab),
+            eq_rows=np.flatnonzero(eq_labels == lab),
+        ))
+    return blocks
+
+
+def empty_rows_status(blocks, A, b, A_eq, b_eq) -> Optional[str]:
+    """"infeasible" if a row that touches no variable cannot hold, else None."""
+    used = np.concatenate([blk.rows for blk in blocks]) if blocks else np.zeros(0, dtype=int)
+    used_eq = np.concatenate([blk.eq_rows for blk in blocks]) if blocks else np.zeros(0, dtype=int)
+    if A is not None and b is not None:
+        b = np.asarray(b, dtype=np.float64)
+        free = np.setdiff1d(np.arange(b.size), used)
+        if (b[free] < -_EMPTY_ROW_TOL).any():
+            return "infeasible"
+    if A_eq is not None and b_eq is not None:
+        b_eq = np.asarray(b_eq, dtype=np.float64)
+        free = np.setdiff1d(np.arange(b_eq.size), used_eq)
+        if (np.abs(b_eq[free]) > _EMPTY_ROW_TOL).any():
+            return "infeasible"
+    return None
+
+
+def split_problem(block, c, A, b, Q, bounds, A_eq, b_eq):
+    """solve_lp keyword arguments for one block; absent parts stay None."""
+    cols = block.cols
+    n = len(c)
+    out = {"c": np.asarray(c, dtype=np.float64)[cols], "A": None, "b": None,
+           "Q": None, "bounds": None, "A_eq": None, "b_eq": None}
+    if block.rows.size:
+        out["A"] = np.asarray(A, dtype=np.float64).reshape(-1, n)[np.ix_(block.rows, cols)]
+        out["b"] = np.asarray(b, dtype=np.float64)[block.rows]
+    if block.eq_rows.size:
+        out["A_eq"] = np.asarray(A_eq, dtype=np.float64).reshape(-1, n)[np.ix_(block.eq_rows, cols)]
+        out["b_eq"] = np.asarray(b_eq, dtype=np.float64)[block.eq_rows]
+    if Q is not None:
+        out["Q"] = np.asarray(Q, dtype=np.float64)[np.ix_(cols, cols)]
+    if bounds is not None:
+        lb, ub = bounds_to_arrays(bounds, n)
+        out["bounds"] = np.column_stack([lb[cols], ub[cols]])
+    return out
+
+
+def split_warm_start(block, warm_start):
+    if not warm_start:
+        return None
+    out = {}
+    x = warm_start.get("x")
+    if x is not None:
+        out["x"] = np.asarray(x, dtype=np.float64)[block.cols]
+    duals = warm_start.get("duals") or {}
+    parts = {"ineq": block.rows, "eq": block.eq_rows, "lower": block.cols, "upper": block.cols}
+    out["duals"] = {
+        k: np.asarray(duals[k], dtype=np.float64)[idx]
+        for k, idx in parts.items() if duals.get(k) is not None
+    }
+    return out
+
+
+def _combined_status(statuses):
+    for bad in ("infeasible", "infeasible_inaccurate", "unbounded", "unbounded_inaccurate"):
+        if bad in statuses:
+            return bad
+    for s in statuses:
+        if s not in ("optimal", "optimal_inaccurate"):
+            return s
+    return "optimal_inaccurate" if "optimal_inaccurate" in statuses else "optimal"
+
+
+def stitch(blocks, results, n, m, m_eq):
+    """One solve_lp-style result from per-block results."""
+    status = _combined_status([r.get("status") for r in results])
+    if status not in ("optimal", "optimal_inaccurate"):
+        return {"status": status, "objective_value": None, "solution": None}
+
+    x = np.zeros(n)
+    objective = 0.0
+    have_duals = all(r.get("duals") is not None for r in results)
+    y, nu, lower, upper = np.zeros(m), np.zeros(m_eq), np.zeros(n), np.zeros(n)
+    for blk, r in zip(blocks, results):
+        x[blk.cols] = r["solution"]
+        objective += float(r["objective_value"] or 0.0)
+        if have_duals:
+            d = r["duals"]
+            y[blk.rows] = d["ineq"]
+            nu[blk.eq_rows] = d["eq"]
+            lower[blk.cols] = d["lower"]
+            upper[blk.cols] = d["upper"]
+    out = {"status": status, "objective_value": objective, "solution": x.tolist()}
+    if have_duals:
+        out["duals"] = {"ineq": y.tolist(), "eq": nu.tolist(), "lower": lower.tolist(), "upper": upper.tolist()}
+        out["reduced_costs"] = (lower - upper).tolist()
+    return out
+
+
+# ---------- parallel execution ----------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def _get_pool(workers):
+    """A long-lived pool, so workers keep the solver stack imported between calls."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"),
+            initializer=init_worker, initargs=(worker_threads(workers),),
+        )
+        _pool_workers = workers
+    return _pool
+
+
+def _solve_chunk(subproblems, solve_kwargs):
+    return [solve_lp(**sub, **solve_kwargs) for sub in subproblems]
+
+
+def solve_blocks(subproblems, sizes, workers=1, **solve_kwargs):
+    """Solve each sub-problem; with workers > 1, largest-first across a process pool."""
+    workers = max(1, int(workers))
+    chunks = min(workers, len(subproblems))
+    if chunks == 1:
+        return _solve_chunk(subproblems, solve_kwargs)
+
+    # longest-processing-time assignment: biggest block to the least-loaded worker
+    load = np.zeros(chunks)
+    assigned = [[] for _ in range(chunks)]
+    for i in np.argsort(sizes)[::-1]:
+        w = int(np.argmin(load))
+        assigned[w].append(int(i))
+        load[w] += sizes[i]
+    pool = _get_pool(workers)
+    futures = [
+        (idx, pool.submit(_solve_chunk, [subproblems[i] for i in idx], solve_kwargs))
+        for idx in assigned if idx
+    ]
+    results = [None] * len(subproblems)
+    for idx, fut in futures:
+        for i, r in zip(idx, fut.result()):
+            results[i] = r
+    return results
+
+
+def solve_decomposed(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense="minimize",
+                     workers=1, block_cache=None, warm_start=None, **solve_kwargs):
+    """
+    Solve block by block and stitch the result.
+
+    block_cache : optional object with ``get(sub) -> result or None`` and
+                  ``put(sub, result)``, where ``sub`` is the block's
+                  solve_lp keyword arguments plus ``sense``; blocks found
+                  there are not re-solved.
+    """
+    t0 = time.perf_counter()
+    c = np.asarray(c, dtype=np.float64)
+    n = c.size
+    has_A = A is not None and b is not None
+    has_eq = A_eq is not None and b_eq is not None
+    m = len(b) if has_A else 0
+    m_eq = len(b_eq) if has_eq else 0
+    blocks = find_blocks(n, A if has_A else None, A_eq if has_eq else None, Q)
+    stats = {"blocks": len(blocks), "largest_block": max((blk.cols.size for blk in blocks), default=0)}
+
+    status = empty_rows_status(blocks, A, b, A_eq, b_eq)
+    if status is not None:
+        stats["decompose_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return {"status": status, "objective_value": None, "solution": None, "stats": {"decomposition": stats}}
+
+    subs = [dict(split_problem(blk, c, A, b, Q, bounds, A_eq, b_eq), sense=sense) for blk in blocks]
+    results = [block_cache.get(sub) if block_cache is not None else None for sub in subs]
+    todo = [i for i, r in enumerate(results) if r is None]
+    stats["cached_blocks"] = len(blocks) - len(todo)
+
+    if todo:
+        if warm_start:
+            solved = [
+                solve_lp(**subs[i], warm_start=split_warm_start(blocks[i], warm_start), **solve_kwargs)
+                for i in todo
+            ]
+        else:
+            solved = solve_blocks([subs[i] for i in todo], [blocks[i].size for i in todo], workers, **solve_kwargs)
+        for i, r in zip(todo, solved):
+            results[i] = r
+            if block_cache is not None:
+                block_cache.put(subs[i], r)
+
+    out = stitch(blocks, results, n, m, m_eq)
+    stats["decompose_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    out["stats"] = {
+        "solver": next((r.get("stats", {}).get("solver") for r in results if r.get("stats")), None),
+        "wall_ms": stats["decompose_ms"],
+        "iterations": sum(int(r.get("stats", {}).get("iterations") or 0) for r in results),
+        "decomposition": stats,
+    }
+    return out
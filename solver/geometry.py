@@ -0,0 +1,229 @@
+"""
+Feasible regions and objective level sets for plotting.
+
+The problem is restricted to 2 or 3 of its variables (``dims``), the others
+held at ``fixed``; every constraint then becomes a halfspace G y <= h in
+that space. Vertices are all intersections of k = len(dims) boundary
+hyperplanes that satisfy every halfspace, enumerated in batches with one
+vectorized solve per batch. Unbounded regions are clipped to ``box`` (by
+default a box around the finite vertices and the optimum), and ``bounded``
+tells whether the box was needed.
+"""
+import time
+from itertools import combinations
+
+import numpy as np
+
+from solver.solve import bounds_to_arrays
+
+_TOL = 1e-9
+_BATCH = 50_000
+
+
+def slice_problem(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, dims=(0, 1), fixed=None):
+    """
+    Halfspaces G y <= h and objective 0.5 y'Qy + c'y + const of the problem
+    restricted to ``dims``. Returns (G, h, c, Q, const, empty): rows that no
+    longer involve ``dims`` are dropped, and ``empty`` is True if one of them
+    cannot hold.
+    """
+    c = np.asarray(c, dtype=np.float64)
+    n = c.size
+    dims = np.asarray(dims, dtype=int)
+    rest = np.setdiff1d(np.arange(n), dims)
+    x0 = np.zeros(n) if fixed is None else np.asarray(fixed, dtype=np.float64)
+    k = dims.size
+
+    G, h = [np.zeros((0, k))], [np.zeros(0)]
+    if A is not None and b is not None:
+        A = np.asarray(A, dtype=np.float64).reshape(-1, n)
+        G.append(A[:, dims])
+        h.append(np.asarray(b, dtype=np.float64) - A[:, rest] @ x0[rest])
+    if A_eq is not None and b_eq is not None:
+        A_eq = np.asarray(A_eq, dtype=np.float64).reshape(-1, n)
+        r = np.asarray(b_eq, dtype=np.float64) - A_eq[:, rest] @ x0[rest]
+        G += [A_eq[:, dims], -A_eq[:, dims]]
+        h += [r, -r]
+    if bounds is not None:
+        lb, ub = bounds_to_arrays(bounds, n)
+        eye = np.eye(k)
+        has_lb, has_ub = np.isfinite(lb[dims]), np.isfinite(ub[dims])
+        G += [-eye[has_lb], eye[has_ub]]
+        h += [-lb[dims][has_lb], ub[dims][has_ub]]
+        # bounds on the held variables decide emptiness like any other dropped row
+        if ((x0[rest] < lb[rest] - _TOL) | (x0[rest] > ub[rest] + _TOL)).any():
+            return np.zeros((0, k)), np.zeros(0), c[dims], None, 0.0, True
+    G, h = np.vstack(G), np.concatenate(h)
+
+    live = np.abs(G).max(axis=1, initial=0.0) > _TOL
+    empty = bool((h[~live] < -_TOL * (1.0 + np.abs(h[~live]))).any())
+    G, h = G[live], h[live]
+
+    c_s = c[dims].copy()
+    const = float(c[rest] @ x0[rest])
+    Q_s = None
+    if Q is not None:
+        Q = np.asarray(Q, dtype=np.float64)
+        Q_s = Q[np.ix_(dims, dims)]
+        c_s += 0.5 * (Q[np.ix_(dims, rest)] + Q[np.ix_(rest, dims)].T) @ x0[rest]
+        const += 0.5 * float(x0[rest] @ Q[np.ix_(rest, rest)] @ x0[rest])
+    return G, h, c_s, Q_s, const, empty
+
+
+def _box_halfspaces(box):
+    lo, hi = box[:, 0], box[:, 1]
+    eye = np.eye(lo.size)
+    return np.vstack([-eye, eye]), np.concatenate([-lo, hi])
+
+
+def enumerate_vertices(G, h):
+    """Feasible intersections of k of the hyperplanes G_i y = h_i (rows of G: k columns), deduplicated."""
+    m, k = G.shape
+    if m < k:
+        return np.zeros((0, k)), 0
+    scale = 1.0 + np.abs(h)
+    combos = combinations(range(m), k)
+    found, candidates = [], 0
+    while True:
+        idx = np.fromiter((i for t in _take(combos, _BATCH) for i in t), dtype=int).reshape(-1, k)
+        if idx.size == 0:
+            break
+        M = G[idx]
+        ok = np.abs(np.linalg.det(M)) > _TOL * np.prod(np.linalg.norm(M, axis=2), axis=1)
+        if ok.any():
+            V = np.linalg.solve(M[ok], h[idx[ok]][..., None])[..., 0]
+            candidates += V.shape[0]
+            feasible = ((V @ G.T - h) <= 1e-7 * scale).all(axis=1)
+            found.append(V[feasible])
+    if not found:
+        return np.zeros((0, k)), candidates
+    V = np.vstack(found)
+    if V.size == 0:
+        return V, candidates
+    # snap to a grid relative to the region's size so near-duplicates merge
+    q = 1e-7 * max(1.0, np.abs(V).max())
+    _, first = np.unique(np.round(V / q), axis=0, return_index=True)
+    return V[np.sort(first)] + 0.0, candidates
+
+
+def _take(it, n):
+    for _ in range(n):
+        try:
+            yield next(it)
+        except StopIteration:
+            return
+
+
+def _order_polygon(V):
+    if V.shape[0] < 3:
+        return V
+    d = V - V.mean(axis=0)
+    return V[np.argsort(np.arctan2(d[:, 1], d[:, 0]))]
+
+
+def _faces(G, h, V):
+    """Per boundary halfspace with >= 3 vertices on it, those vertex indices in cyclic order."""
+    on = np.abs(V @ G.T - h) <= 1e-7 * (1.0 + np.abs(h))   # vertices x halfspaces
+    faces, seen = [], set()
+    for j in np.flatnonzero(on.sum(axis=0) >= 3):
+        idx = np.flatnonzero(on[:, j])
+        key = tuple(idx)
+        if key in seen:
+            continue
+        seen.add(key)
+        # order around the face centre in a basis of the face plane
+        normal = G[j] / np.linalg.norm(G[j])
+        u = np.linalg.svd(np.eye(3) - np.outer(normal, normal))[0][:, :2]
+        d = (V[idx] - V[idx].mean(axis=0)) @ u
+        faces.append(idx[np.argsort(np.arctan2(d[:, 1], d[:, 0]))].tolist())
+    return faces
+
+
+def _objective(Y, c, Q, const):
+    f = Y @ c + const
+    if Q is not None:
+        f += 0.5 * np.einsum("...i,ij,...j->...", Y, Q, Y)
+    return f
+
+
+def default_box(V, anchor=None):
+    """A box around the finite vertices (and ``anchor``), with room to show unbounded directions."""
+    pts = [V] if V.size else []
+    if anchor is not None:
+        pts.append(np.asarray(anchor, dtype=np.float64)[None, :])
+    k = V.shape[1]
+    if not pts:
+        return np.column_stack([-np.ones(k), np.ones(k)])
+    P = np.vstack(pts)
+    lo, hi = P.min(axis=0), P.max(axis=0)
+    pad = np.maximum(0.5 * (hi - lo), 1.0)
+    return np.column_stack([lo - pad, hi + pad])
+
+
+def feasible_region(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None,
+                    dims=None, fixed=None, box=None, grid=50, levels=10, optimum=None):
+    """
+    Vertices (2D: in boundary order; 3D: with faces) and objective levels of
+    the feasible region restricted to ``dims``.
+
+    fixed   : values for the variables outside ``dims`` (default ``optimum``, else 0)
+    box     : per-dim (lo, hi) clip for unbounded regions
+    optimum : full solution vector, used for the default ``fixed``/box and the
+              contour level through the optimum
+    """
+    t0 = time.perf_counter()
+    c = np.asarray(c, dtype=np.float64)
+    n = c.size
+    dims = np.arange(n) if dims is None else np.asarray(dims, dtype=int)
+    k = dims.size
+    if k not in (2, 3):
+        raise ValueError("dims must name 2 or 3 variables")
+    if fixed is None:
+        fixed = optimum
+    opt = None if optimum is None else np.asarray(optimum, dtype=np.float64)
+
+    G, h, c_s, Q_s, const, empty = slice_problem(c, A, b, Q, bounds, A_eq, b_eq, dims, fixed)
+    out = {"dims": dims.tolist(), "empty": empty, "bounded": True, "vertices": [],
+           "faces": None, "objective_at_vertices": [], "contours": None, "box": None}
+    candidates = 0
+    if not empty:
+        V, candidates = enumerate_vertices(G, h)
+        box = default_box(V, None if opt is None else opt[dims]) if box is None else np.asarray(box, dtype=np.float64)
+        Gb, hb = _box_halfspaces(box)
+        Vc, more = enumerate_vertices(np.vstack([G, Gb]), np.concatenate([h, hb]))
+        candidates += more
+        # a vertex on the box that is not a vertex of the region itself means clipping
+        on_box = (np.abs(Vc @ Gb.T - hb) <= 1e-7 * (1.0 + np.abs(hb))).any(axis=1)
+        on_region = (np.abs(Vc @ G.T - h) <= 1e-7 * (1.0 + np.abs(h))).sum(axis=1) >= k
+        out["bounded"] = not (on_box & ~on_region).any()
+        out["box"] = box.tolist()
+        out["empty"] = Vc.shape[0] == 0
+        if k == 2:
+            Vc = _order_polygon(Vc)
+        elif Vc.shape[0]:
+            out["faces"] = _faces(np.vstack([G, Gb]), np.concatenate([h, hb]), Vc)
+        out["vertices"] = Vc.tolist()
+        out["objective_at_vertices"] = _objective(Vc, c_s, Q_s, const).tolist()
+
+    if opt is not None:
+        out["optimum"] = opt[dims].tolist()
+    if k == 2 and out["box"] is not None:
+        lo, hi = np.asarray(out["box"])[:, 0], np.asarray(out["box"])[:, 1]
+        if out["vertices"]:
+            Vc = np.asarray(out["vertices"])
+            span = np.maximum(Vc.max(axis=0) - Vc.min(axis=0), 1e-6)
+            lo, hi = Vc.min(axis=0) - 0.1 * span, Vc.max(axis=0) + 0.1 * span
+        xs, ys = np.linspace(lo[0], hi[0], grid), np.linspace(lo[1], hi[1], grid)
+        X, Y = np.meshgrid(xs, ys)
+        Z = _objective(np.stack([X, Y], axis=-1), c_s, Q_s, const)
+        lv = np.linspace(Z.min(), Z.max(), levels + 2)[1:-1]
+        if opt is not None:
+            lv = np.unique(np.append(lv, _objective(opt[dims], c_s, Q_s, const)))
+        out["contours"] = {"x": xs.tolist(), "y": ys.tolist(), "z": Z.tolist(), "levels": lv.tolist()}
+
+    out["stats"] = {
+        "halfspaces": int(G.shape[0]),
+        "candidates": int(candidates),
+        "viz_ms": round((time.perf_counter() - t0) * 1000, 3),
+    }
+    return out
@@ -0,0 +1,127 @@
+"""
+Solve through OSQP's own API instead of CVXPY, for the cases CVXPY cannot
+serve: warm-starting from a stored primal/dual pair.
+
+The problem is put in OSQP form
+
+    minimize    (1/2) xᵀPx + qᵀx
+    subject to  l <= [A; A_eq; I] x <= u
+
+with one identity row per variable for the bounds (±inf where unbounded),
+so OSQP's y splits into the inequality duals, the equality duals and
+(upper - lower) bound duals, matching what solve_lp reports.
+"""
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from solver.trace import OSQP_CHUNK, osqp_solve
+
+try:
+    import osqp
+    HAVE_OSQP = True
+except Exception:
+    osqp = None
+    HAVE_OSQP = False
+
+_STATUS = {
+    1: "optimal",
+    2: "optimal_inaccurate",
+    3: "infeasible",
+    4: "infeasible_inaccurate",
+    5: "unbounded",
+    6: "unbounded_inaccurate",
+    7: "user_limit",
+    8: "user_limit",
+}
+
+# same accuracy CVXPY asks OSQP for. rho adapts every OSQP_CHUNK iterations
+# rather than on OSQP's timing heuristic: a traced solve runs in chunks of
+# that many, and each chunk restarts the count (see solver.trace)
+SETTINGS = dict(eps_abs=1e-5, eps_rel=1e-5, max_iter=10000, polishing=True, verbose=False,
+                adaptive_rho_interval=OSQP_CHUNK)
+
+
+def build(c, A, b, Q, lb, ub, A_eq, b_eq, sense):
+    """OSQP data (P upper triangle, q, A, l, u) and the row counts of each block."""
+    c = np.asarray(c, dtype=np.float64)
+    n = c.shape[0]
+    s = 1.0 if sense == "minimize" else -1.0
+    A = np.zeros((0, n)) if A is None else np.asarray(A, dtype=np.float64).reshape(-1, n)
+    A_eq = np.zeros((0, n)) if A_eq is None else np.asarray(A_eq, dtype=np.float64).reshape(-1, n)
+    b = np.zeros(0) if b is None else np.asarray(b, dtype=np.float64)
+    b_eq = np.zeros(0) if b_eq is None else np.asarray(b_eq, dtype=np.float64)
+    P = sp.csc_matrix((n, n)) if Q is None else sp.triu(s * sp.csc_matrix(np.asarray(Q, dtype=np.float64)), format="csc")
+    M = sp.vstack([sp.csc_matrix(A), sp.csc_matrix(A_eq), sp.identity(n, format="csc")], format="csc")
+    l = np.concatenate([np.full(A.shape[0], -np.inf), b_eq, lb])
+    u = np.concatenate([b, b_eq, ub])
+    return P, s * c, M, l, u, (A.shape[0], A_eq.shape[0], n)
+
+
+def warm_start_y(duals, shape):
+    m, m_eq, n = shape
+    y = np.zeros(m + m_eq + n)
+    if duals:
+        if duals.get("ineq") is not None and len(duals["ineq"]) == m:
+            y[:m] = duals["ineq"]
+        if duals.get("eq") is not None and len(duals["eq"]) == m_eq:
+            y[m:m + m_eq] = duals["eq"]
+        if duals.get("upper") is not None and duals.get("lower") is not None:
+            y[m + m_eq:] = np.asarray(duals["upper"]) - np.asarray(duals["lower"])
+    return np.nan_to_num(y)
+
+
+def split_y(y, shape):
+    m, m_eq, n = shape
+    yb = y[m + m_eq:]
+    lower, upper = np.maximum(-yb, 0.0), np.maximum(yb, 0.0)
+    return {
+        "ineq": y[:m].tolist(),
+        "eq": y[m:m + m_eq].tolist(),
+        "lower": lower.tolist(),
+        "upper": upper.tolist(),
+    }, (lower - upper).tolist()
+
+
+def result_from(res, shape, wall_s, setup_s=None):
+    status = _STATUS.get(int(res.info.status_val), "solver_error")
+    stats = {
+        "solver": "OSQP",
+        "wall_ms": round(wall_s * 1000, 3),
+        "solve_time_ms": round(res.info.solve_time * 1000, 3),
+        "setup_time_ms": round((res.info.setup_time if setup_s is None else setup_s) * 1000, 3),
+        "iterations": int(res.info.iter),
+    }
+    if status not in ("optimal", "optimal_inaccurate"):
+        return {"status": status, "objective_value": None, "solution": None, "stats": stats}
+    duals, reduced_costs = split_y(res.y, shape)
+    return {
+        "status": status,
+        "solution": res.x.tolist(),
+        "duals": duals,
+        "reduced_costs": reduced_costs,
+        "stats": stats,
+    }
+
+
+def solve_osqp(c, A=None, b=None, Q=None, lb=None, ub=None, A_eq=None, b_eq=None,
+               sense="minimize", warm_start=None):
+    """
+    Solve with a fresh OSQP instance, optionally warm-started from
+    ``warm_start = {"x": [...], "duals": {...}}``. The objective value is
+    left for the caller to compute on the original data.
+    """
+    t0 = time.perf_counter()
+    n = len(c)
+    lb = np.full(n, -np.inf) if lb is None else lb
+    ub = np.full(n, np.inf) if ub is None else ub
+    P, q, M, l, u, shape = build(c, A, b, Q, lb, ub, A_eq, b_eq, sense)
+    solver = osqp.OSQP()
+    solver.setup(P, q, M, l, u, **SETTINGS)
+    if warm_start:
+        x0 = warm_start.get("x")
+        x0 = np.nan_to_num(np.asarray(x0, dtype=np.float64)) if x0 is not None and len(x0) == n else None
+        solver.warm_start(x=x0, y=warm_start_y(warm_start.get("duals"), shape))
+    res = osqp_solve(solver, SETTINGS["max_iter"])
+    return result_from(res, shape, time.perf_counter() - t0)
@@ -0,0 +1,159 @@
+"""
+Cheap infeasibility and unboundedness checks, run before a model is built.
+
+A few vectorized passes over the data catch what needs no solver:
+
+  - crossed bounds (lb > ub)
+  - rows that cannot hold anywhere in the box: the minimum activity of
+    A x (or of ±A_eq x) over lb <= x <= ub already exceeds the right-hand
+    side, checked again after PRECHECK_ROUNDS rounds of bound propagation
+    (solver.presolve.implied_bounds); propagation can also cross bounds
+  - an improving ray along one coordinate: x_j can move without limit in
+    the direction that improves the objective, without tightening any row
+    (its column of A has the right sign, of A_eq and Q is zero), and a
+    feasible point is at hand (the projection of 0 onto the box)
+
+Each finding comes with a certificate: what was violated and the numbers
+that show it. Anything else returns None and goes to the solver as usual.
+"""
+import time
+from typing import Optional
+
+import numpy as np
+
+from solver.presolve import implied_bounds, min_activity
+
+
+def _arrays(c, A, b, Q, bounds, A_eq, b_eq):
+    c = np.asarray(c, dtype=np.float64)
+    n = c.shape[0]
+
+    def _rows(M, v):
+        if M is None or v is None or len(v) == 0:
+            return np.zeros((0, n)), np.zeros(0)
+        return np.asarray(M, dtype=np.float64).reshape(-1, n), np.asarray(v, dtype=np.float64)
+
+    A, b = _rows(A, b)
+    A_eq, b_eq = _rows(A_eq, b_eq)
+    if bounds is None:
+        lb, ub = np.full(n, -np.inf), np.full(n, np.inf)
+    else:
+        arr = np.asarray(bounds, dtype=np.float64).reshape(n, 2)
+        lb = np.where(np.isnan(arr[:, 0]), -np.inf, arr[:, 0])
+        ub = np.where(np.isnan(arr[:, 1]), np.inf, arr[:, 1])
+    Q = None if Q is None or len(Q) == 0 else np.asarray(Q, dtype=np.float64)
+    return c, A, b, Q, lb, ub, A_eq, b_eq
+
+
+def _row_name(i: int, m: int, m_eq: int) -> tuple:
+    """Which original row stacked row ``i`` of [A; A_eq; -A_eq] is, and its sense."""
+    if i < m:
+        return "A", i, "<="
+    if i < m + m_eq:
+        return "A_eq", i - m, "<="
+    return "A_eq", i - m - m_eq, ">="
+
+
+def _crossed(lb, ub, tol):
+    """lb - ub less a relative tolerance; positive where the bounds cross."""
+    scale = np.maximum(np.abs(np.where(np.isfinite(lb), lb, 0.0)), np.abs(np.where(np.isfinite(ub), ub, 0.0)))
+    return lb - ub - tol * (1 + scale)
+
+
+def _result(status: str, message: str, certificate: dict, t0: float) -> dict:
+    return {
+        "status": status,
+        "objective_value": None,
+        "solution": None,
+        "message": message,
+        "stats": {"precheck": {**certificate, "precheck_ms": round((time.perf_counter() - t0) * 1000, 3)}},
+    }
+
+
+def precheck(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense="minimize",
+             rounds=2, tol=1e-9) -> Optional[dict]:
+    """A solver-shaped result for a trivially infeasible/unbounded problem, else None."""
+    t0 = time.perf_counter()
+    c, A, b, Q, lb, ub, A_eq, b_eq = _arrays(c, A, b, Q, bounds, A_eq, b_eq)
+    m, m_eq = A.shape[0], A_eq.shape[0]
+
+    crossed = _crossed(lb, ub, tol)
+    if crossed.max() > 0:
+        j = int(np.argmax(crossed))
+        return _result(
+            "infeasible", f"lb > ub for variable {j}",
+            {"kind": "bounds", "variable": j, "lb": float(lb[j]), "ub": float(ub[j])}, t0,
+        )
+
+    # equalities as two inequalities, so one activity test covers both
+    G = np.vstack([A, A_eq, -A_eq])
+    h = np.concatenate([b, b_eq, -b_eq])
+    lb0, ub0 = lb, ub
+    for k in range(rounds + 1):
+        if not G.shape[0]:
+            break
+        act = min_activity(G, lb, ub)
+        excess = act - h - tol * (1 + np.abs(h))
+        if excess.max() > 0:
+            i = int(np.argmax(excess))
+            name, row, rel = _row_name(i, m, m_eq)
+            lo, hi = float(act[i]), float(h[i])
+            if rel == ">=":
+                lo, hi = -lo, -hi
+                text = f"row {row} of {name}: the largest value of {name}[{row}] x within the bounds is {lo:g} < {hi:g}"
+            else:
+                text = f"row {row} of {name}: the smallest value of {name}[{row}] x within the bounds is {lo:g} > {hi:g}"
+            return _result("infeasible", text, {
+                "kind": "row_activity", "matrix": name, "row": row, "relation": rel,
+                "activity_limit": lo, "rhs": hi, "propagation_rounds": k,
+            }, t0)
+        if k == rounds:
+            break
+        new_lb, new_ub = implied_bounds(G, h, lb, ub)
+        margin_ub = tol * (1 + np.abs(np.where(np.isfinite(ub), ub, 0.0)))
+        margin_lb = tol * (1 + np.abs(np.where(np.isfinite(lb), lb, 0.0)))
+        tighter_ub, tighter_lb = new_ub < ub - margin_ub, new_lb > lb + margin_lb
+        if not (tighter_ub.any() or tighter_lb.any()):
+            break
+        lb = np.where(tighter_lb, new_lb, lb)
+        ub = np.where(tighter_ub, new_ub, ub)
+        crossed = _crossed(lb, ub, tol)
+        if crossed.max() > 0:
+            j = int(np.argmax(crossed))
+            return _result(
+                "infeasible", f"the rows imply {lb[j]:g} <= x[{j}] <= {ub[j]:g}, which is empty",
+                {"kind": "propagated_bounds", "variable": j, "implied_lb": float(lb[j]),
+                 "implied_ub": float(ub[j]), "propagation_rounds": k + 1}, t0,
+            )
+
+    return _unbounded(c, A, b, Q, lb0, ub0, A_eq, b_eq, sense, tol, t0)
+
+
+def _unbounded(c, A, b, Q, lb, ub, A_eq, b_eq, sense, tol, t0) -> Optional[dict]:
+    d = c if sense == "minimize" else -c  # minimize d x
+    free_of_eq = ~(A_eq != 0).any(axis=0)
+    if Q is not None:
+        free_of_eq &= ~(Q != 0).any(axis=0)
+    up = (d < 0) & np.isposinf(ub) & ~(A > 0).any(axis=0) & free_of_eq
+    down = (d > 0) & np.isneginf(lb) & ~(A < 0).any(axis=0) & free_of_eq
+    ray = np.flatnonzero(up | down)
+    if not ray.size:
+        return None
+
+    x0 = np.clip(0.0, lb, ub)
+    if (A @ x0 > b + tol * (1 + np.abs(b))).any() or (np.abs(A_eq @ x0 - b_eq) > tol * (1 + np.abs(b_eq))).any():
+        return None  # no feasible point at hand: the ray alone proves nothing
+
+    j = int(ray[np.argmax(np.abs(d[ray]))])
+    direction = 1 if up[j] else -1
+    return {
+        **_result(
+            "unbounded",
+            f"x[{j}] can {'increase' if direction > 0 else 'decrease'} without limit from a feasible point, "
+            f"changing the objective by {c[j]:g} per unit",
+            {"kind": "ray", "variable": j, "direction": direction, "objective_rate": float(c[j]),
+             "feasible_point": x0.tolist() if x0.size <= 1000 else None},
+            t0,
+        ),
+        "objective_value": float("-inf") if sense == "minimize" else float("inf"),
+    }
@@ -0,0 +1,414 @@
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+
+def activity_bounds(A, lb, ub):
+    """
+    Row activity limits of A x over the box lb <= x <= ub.
+
+    Returns (contrib, finite_sum, n_inf) where contrib[i, j] is the smallest
+    value a_ij x_j can take, finite_sum the row sum of its finite entries and
+    n_inf the number of entries that are -inf. The minimum activity of row i
+    is finite_sum[i] when n_inf[i] == 0 and -inf otherwise; the maximum
+    activity is the same computation on -A.
+    """
+    with np.errstate(invalid="ignore"):
+        contrib = np.where(A > 0, A * lb, np.where(A < 0, A * ub, 0.0))
+    is_inf = np.isinf(contrib)
+    finite_sum = np.where(is_inf, 0.0, contrib).sum(axis=1)
+    return contrib, finite_sum, is_inf.sum(axis=1)
+
+
+def implied_bounds(A, b, lb, ub):
+    """
+    Bounds on each x_j implied by the rows A x <= b over the box lb <= x <= ub.
+
+    Row i bounds x_j by (b_i - min activity of the rest of row i) / a_ij,
+    which is finite when the other entries' minimum contributions are.
+    Returns (new_lb, new_ub), ±inf where no row says anything.
+    """
+    contrib, finite_sum, n_inf = activity_bounds(A, lb, ub)
+    contrib_inf = np.isinf(contrib)
+    rest = np.where(
+        (n_inf[:, None] == 0),
+        finite_sum[:, None] - np.where(contrib_inf, 0.0, contrib),
+        np.where((n_inf[:, None] == 1) & contrib_inf, finite_sum[:, None], np.nan),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied = (b[:, None] - rest) / A
+    new_ub = np.where((A > 0) & np.isfinite(implied), implied, np.inf).min(axis=0, initial=np.inf)
+    new_lb = np.where((A < 0) & np.isfinite(implied), implied, -np.inf).max(axis=0, initial=-np.inf)
+    return new_lb, new_ub
+
+
+def min_activity(A, lb, ub):
+    _, finite_sum, n_inf = activity_bounds(A, lb, ub)
+    return np.where(n_inf > 0, -np.inf, finite_sum)
+
+
+@dataclass
+class Presolved:
+    """Reduced problem plus what postsolve needs to map back to the original space."""
+    c: np.ndarray
+    A: np.ndarray
+    b: np.ndarray
+    A_eq: np.ndarray
+    b_eq: np.ndarray
+    Q: Optional[np.ndarray]
+    lb: np.ndarray
+    ub: np.ndarray
+    cols: np.ndarray          # original indices of the kept variables
+    rows: np.ndarray          # original indices of the kept rows of A
+    eq_rows: np.ndarray       # original indices of the kept rows of A_eq
+    x_fixed: np.ndarray       # values of removed variables (NaN where kept)
+    shape: tuple = (0, 0, 0)  # original (rows of A, rows of A_eq, variables)
+    # singleton rows in the order presolve absorbed them: (kind, var, row) with
+    # kind "lb"/"ub" (row of A became a bound) or "eq" (row of A_eq fixed the var)
+    singletons: list = field(default_factory=list)
+    status: Optional[str] = None
+    message: Optional[str] = None
+    stats: dict = field(default_factory=dict)
+
+    def postsolve(self, x_red) -> np.ndarray:
+        x = self.x_fixed.copy()
+        x[self.cols] = x_red
+        return x
+
+    def postsolve_row_duals(self, y_red, nu_red):
+        """Row duals in the original row space; removed rows get 0 until attributed."""
+        m, m_eq, _ = self.shape
+        y, nu = np.zeros(m), np.zeros(m_eq)
+        y[self.rows] = y_red
+        nu[self.eq_rows] = nu_red
+        return y, nu
+
+    def attribute_bound_duals(self, A, A_eq, y, nu, d):
+        """
+        Move bound duals that belong to singleton rows back onto those rows.
+
+        ``d`` is the stationarity residual in the original space (what would
+        otherwise be reported as bound duals). Singleton rows are undone in
+        reverse order; each takes over the part of d[j] its bound carried,
+        which also shifts d for variables removed before it.
+        """
+        d = d.copy()
+        for kind, j, i in reversed(self.singletons):
+            if kind == "eq":
+                nu[i] = -d[j] / A_eq[i, j]
+                d += nu[i] * A_eq[i]
+            elif (kind == "ub" and d[j] < 0) or (kind == "lb" and d[j] > 0):
+                y[i] = -d[j] / A[i, j]
+                d += y[i] * A[i]
+        return y, nu, d
+
+    def reduce_warm_start(self, warm_start):
+        """Restrict an original-space warm start to the kept rows and columns."""
+        m, m_eq, n = self.shape
+        out = {}
+        x0 = warm_start.get("x")
+        if x0 is not None and len(x0) == n:
+            out["x"] = np.asarray(x0, dtype=np.float64)[self.cols]
+        duals = warm_start.get("duals") or {}
+        reduced = {}
+        for key, idx, size in (("ineq", self.rows, m), ("eq", self.eq_rows, m_eq),
+                               ("lower", self.cols, n), ("upper", self.cols, n)):
+            v = duals.get(key)
+            if v is not None and len(v) == size:
+                reduced[key] = np.asarray(v, dtype=np.float64)[idx]
+        out["duals"] = reduced
+        return out
+
+
+# primal accuracy of the solvers behind solve_lp; closer than this counts as active
+ACTIVE_TOL = 1e-5
+TOL = 1e-9   # presolve_problem's feasibility tolerance
+
+
+def _at_bound(x, bound, sign):
+    finite = np.isfinite(bound)
+    gap = sign * (x - np.where(finite, bound, 0.0))
+    return finite & (gap <= ACTIVE_TOL * (1 + np.abs(np.where(finite, bound, 0.0))))
+
+
+def duals_consistent(d, x, lb, ub, tol=1e-6):
+    """True when the residual d can be carried by bounds that are active at x."""
+    scale = tol * (1 + np.abs(d).max(initial=0.0))
+    at_lb, at_ub = _at_bound(x, lb, 1.0), _at_bound(x, ub, -1.0)
+    return bool(np.all(d[~at_lb] <= scale) and np.all(d[~at_ub] >= -scale))
+
+
+def recover_duals(grad, A, b, A_eq, x, lb, ub, tol=ACTIVE_TOL):
+    """
+    Row and bound duals at a known primal point x.
+
+    Solves min ||grad + Aᵀy + A_eqᵀν - μ_l + μ_u|| over the constraints
+    active at x with y, μ >= 0 (bounded least squares). ``grad`` is the
+    objective gradient in minimize form. Used when presolve reductions
+    (implied bounds that fixed variables) leave no direct dual to map back.
+    """
+    from scipy.optimize import lsq_linear
+
+    n = x.shape[0]
+    act = np.flatnonzero(np.abs(A @ x - b) <= tol * (1 + np.abs(b)))
+    at_lb = np.flatnonzero(_at_bound(x, lb, 1.0))
+    at_ub = np.flatnonzero(_at_bound(x, ub, -1.0))
+    I = np.eye(n)
+    M = np.hstack([A[act].T, A_eq.T, -I[:, at_lb], I[:, at_ub]])
+    y, nu = np.zeros(A.shape[0]), np.zeros(A_eq.shape[0])
+    lower, upper = np.zeros(n), np.zeros(n)
+    if M.shape[1]:
+        k1, k2, k3 = act.size, act.size + A_eq.shape[0], act.size + A_eq.shape[0] + at_lb.size
+        lo = np.zeros(M.shape[1])
+        lo[k1:k2] = -np.inf
+        z = lsq_linear(M, -grad, bounds=(lo, np.inf), method="bvls").x
+        y[act], nu[:], lower[at_lb], upper[at_ub] = z[:k1], z[k1:k2], z[k2:k3], z[k3:]
+    return y, nu, lower, upper
+
+
+def _as_matrix(M, n):
+    if M is None:
+        return np.zeros((0, n))
+    return np.asarray(M, dtype=np.float64).reshape(-1, n)
+
+
+def _as_vector(v, m):
+    if v is None:
+        return np.zeros(m)
+    return np.asarray(v, dtype=np.float64).reshape(m)
+
+
+def _first_nonzero_sign(R):
+    idx = np.argmax(R != 0, axis=1)
+    return np.sign(R[np.arange(R.shape[0]), idx])
+
+
+def presolve(c, A=None, b=None, Q=None, lb=None, ub=None, A_eq=None, b_eq=None,
+             sense="minimize", tol=TOL, max_passes=10) -> Presolved:
+    """
+    Reduce an LP/QP before handing it to the solver.
+
+    Repeats until nothing changes: singleton inequality rows become bounds,
+    singleton equality rows fix their variable, empty rows are dropped (or
+    prove infeasibility), fixed variables (lb == ub) are substituted out,
+    duplicate rows (up to a positive scale) are merged, and variable bounds
+    are tightened from row activity limits. Variables that appear in no
+    constraint and not in Q are fixed at whichever finite bound is optimal.
+    """
+    t0 = time.perf_counter()
+    c = np.asarray(c, dtype=np.float64).copy()
+    n = c.shape[0]
+    A = _as_matrix(A if b is not None else None, n)
+    b = _as_vector(b if A.shape[0] else None, A.shape[0]).copy()
+    A_eq = _as_matrix(A_eq if b_eq is not None else None, n)
+    b_eq = _as_vector(b_eq if A_eq.shape[0] else None, A_eq.shape[0]).copy()
+    Q = None if Q is None else np.asarray(Q, dtype=np.float64)
+    lb = np.full(n, -np.inf) if lb is None else np.asarray(lb, dtype=np.float64).copy()
+    ub = np.full(n, np.inf) if ub is None else np.asarray(ub, dtype=np.float64).copy()
+    m, m_eq = A.shape[0], A_eq.shape[0]
+
+    cols = np.ones(n, dtype=bool)
+    rows = np.ones(m, dtype=bool)
+    eq_rows = np.ones(m_eq, dtype=bool)
+    x_fixed = np.full(n, np.nan)
+    singletons: list = []
+    counts = dict(fixed_vars=0, empty_cols=0, singleton_rows=0, empty_rows=0,
+                  duplicate_rows=0, bounds_tightened=0)
+    direction = 1.0 if sense == "minimize" else -1.0
+
+    def _done(status=None, message=None):
+        keep = np.flatnonzero(cols)
+        stats = {
+            "rows_before": m + m_eq,
+            "rows_after": int(rows.sum() + eq_rows.sum()),
+            "cols_before": n,
+            "cols_after": int(keep.size),
+            **counts,
+            "presolve_ms": round((time.perf_counter() - t0) * 1000, 3),
+        }
+        return Presolved(
+            c=c[keep],
+            A=A[np.ix_(rows, keep)],
+            b=b[rows],
+            A_eq=A_eq[np.ix_(eq_rows, keep)],
+            b_eq=b_eq[eq_rows],
+            Q=None if Q is None else Q[np.ix_(keep, keep)],
+            lb=lb[keep],
+            ub=ub[keep],
+            cols=keep,
+            rows=np.flatnonzero(rows),
+            eq_rows=np.flatnonzero(eq_rows),
+            x_fixed=x_fixed,
+            shape=(m, m_eq, n),
+            singletons=singletons,
+            status=status,
+            message=message,
+            stats=stats,
+        )
+
+    def _fix(j, v):
+        nonlocal c
+        x_fixed[j] = v
+        cols[j] = False
+        b[:] -= A[:, j] * v
+        b_eq[:] -= A_eq[:, j] * v
+        if Q is not None:
+            c = c + Q[:, j] * v
+
+    def _drop_empty_rows():
+        """Drop rows left without a live column; the infeasibility message if one cannot hold."""
+        nnz = (np.where(cols, A, 0.0) != 0).sum(axis=1)
+        nnz_eq = (np.where(cols, A_eq, 0.0) != 0).sum(axis=1)
+        dropped = False
+        for i in np.flatnonzero(rows & (nnz == 0)):
+            if b[i] < -tol:
+                return f"row {int(i)} of A reads 0 <= {b[i]:g}", dropped
+            rows[i] = False
+            counts["empty_rows"] += 1
+            dropped = True
+        for i in np.flatnonzero(eq_rows & (nnz_eq == 0)):
+            if abs(b_eq[i]) > tol:
+                return f"row {int(i)} of A_eq reads 0 = {b_eq[i]:g}", dropped
+            eq_rows[i] = False
+            counts["empty_rows"] += 1
+            dropped = True
+        return None, dropped
+
+    bad = np.flatnonzero(lb > ub + tol)
+    if bad.size:
+        return _done("infeasible", f"lb > ub for variable {int(bad[0])}")
+
+    for _ in range(max_passes):
+        # empty rows
+        message, changed = _drop_empty_rows()
+        if message:
+            return _done("infeasible", message)
+        Ac = np.where(cols, A, 0.0)
+        Aeqc = np.where(cols, A_eq, 0.0)
+        nnz = (Ac != 0).sum(axis=1)
+        nnz_eq = (Aeqc != 0).sum(axis=1)
+
+        # singleton inequality rows -> bounds
+        for i in np.flatnonzero(rows & (nnz == 1)):
+            j = int(np.flatnonzero(Ac[i])[0])
+            a, v = Ac[i, j], b[i] / Ac[i, j]
+            if a > 0 and v < ub[j]:
+                ub[j] = v
+                singletons[:] = [op for op in singletons if op[:2] != ("ub", j)]
+                singletons.append(("ub", j, int(i)))
+            elif a < 0 and v > lb[j]:
+                lb[j] = v
+                singletons[:] = [op for op in singletons if op[:2] != ("lb", j)]
+                singletons.append(("lb", j, int(i)))
+            rows[i] = False
+            counts["singleton_rows"] += 1
+            changed = True
+
+        # singleton equality rows -> fixed variables
+        for i in np.flatnonzero(eq_rows & (nnz_eq == 1)):
+            j = int(np.flatnonzero(Aeqc[i])[0])
+            if not cols[j]:
+                continue
+            v = b_eq[i] / Aeqc[i, j]
+            if v < lb[j] - tol or v > ub[j] + tol:
+                return _done("infeasible", f"row {int(i)} of A_eq fixes x[{j}] = {v:g} outside its bounds")
+            lb[j] = ub[j] = v
+            singletons[:] = [op for op in singletons if op[1] != j]
+            singletons.append(("eq", j, int(i)))
+            eq_rows[i] = False
+            counts["singleton_rows"] += 1
+            changed = True
+
+        bad = np.flatnonzero(cols & (lb > ub + tol))
+        if bad.size:
+            return _done("infeasible", f"bounds on x[{int(bad[0])}] cross after presolve")
+
+        # fixed variables
+        for j in np.flatnonzero(cols & (ub - lb <= tol) & np.isfinite(lb)):
+            _fix(j, lb[j])
+            counts["fixed_vars"] += 1
+            changed = True
+
+        # empty columns: optimal value sits on a bound (left to the solver if unbounded)
+        Ac = np.where(cols, A, 0.0)
+        used = (Ac[rows] != 0).any(axis=0) | (A_eq[eq_rows] != 0).any(axis=0)
+        if Q is not None:
+            used |= (Q != 0).any(axis=0)
+        for j in np.flatnonzero(cols & ~used):
+            cost = direction * c[j]
+            v = lb[j] if cost > 0 else ub[j] if cost < 0 else np.clip(0.0, lb[j], ub[j])
+            if np.isfinite(v):
+                _fix(j, v)
+                counts["empty_cols"] += 1
+                changed = True
+
+        # duplicate rows (same direction up to positive scale): keep the tightest
+        live = np.flatnonzero(rows)
+        if live.size > 1:
+            R = np.where(cols, A[live], 0.0)
+            scale = np.abs(R).max(axis=1)
+            key = np.round(R / scale[:, None], 12)
+            _, first, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+            if first.size < live.size:
+                rhs = b[live] / scale
+                for g in range(first.size):
+                    members = np.flatnonzero(inverse.ravel() == g)
+                    if members.size < 2:
+                        continue
+                    best = members[np.argmin(rhs[members])]
+                    for k in members:
+                        if k != best:
+                            rows[live[k]] = False
+                            counts["duplicate_rows"] += 1
+                changed = True
+        live = np.flatnonzero(eq_rows)
+        if live.size > 1:
+            R = np.where(cols, A_eq[live], 0.0)
+            scale = np.abs(R).max(axis=1) * _first_nonzero_sign(R)
+            key = np.round(R / scale[:, None], 12)
+            _, first, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+            if first.size < live.size:
+                rhs = b_eq[live] / scale
+                for g in range(first.size):
+                    members = np.flatnonzero(inverse.ravel() == g)
+                    if members.size < 2:
+                        continue
+                    spread = np.ptp(rhs[members])
+                    if spread > tol * (1 + np.abs(rhs[members]).max()):
+                        return _done("infeasible", f"rows {[int(live[k]) for k in members]} of A_eq conflict")
+                    for k in members[1:]:
+                        eq_rows[live[k]] = False
+                        counts["duplicate_rows"] += 1
+                changed = True
+
+        # bound tightening from row activity limits
+        live = np.flatnonzero(rows)
+        if live.size:
+            new_lb, new_ub = implied_bounds(np.where(cols, A[live], 0.0), b[live], lb, ub)
+            margin = tol * (1 + np.abs(np.where(np.isfinite(ub), ub, 0.0)))
+            tighter_ub = cols & (new_ub < ub - margin)
+            margin = tol * (1 + np.abs(np.where(np.isfinite(lb), lb, 0.0)))
+            tighter_lb = cols & (new_lb > lb + margin)
+            if tighter_ub.any() or tighter_lb.any():
+                ub = np.where(tighter_ub, new_ub, ub)
+                lb = np.where(tighter_lb, new_lb, lb)
+                singletons[:] = [
+                    op for op in singletons
+                    if not ((op[0] == "ub" and tighter_ub[op[1]]) or (op[0] == "lb" and tighter_lb[op[1]]))
+                ]
+                counts["bounds_tightened"] += int(tighter_ub.sum() + tighter_lb.sum())
+                changed = True
+            bad = np.flatnonzero(cols & (lb > ub + tol))
+            if bad.size:
+                return _done("infeasible", f"row activity limits leave no room for x[{int(bad[0])}]")
+
+        if not changed:
+            break
+
+    # the last pass may have emptied rows (fixing their variables) after its check
+    message, _ = _drop_empty_rows()
+    if message:
+        return _done("infeasible", message)
+    return _done()
@@ -0,0 +1,145 @@
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+# per-iteration norm clipping, as in OSQP's own Ruiz scaling
+_MIN_NORM, _MAX_NORM = 1e-4, 1e4
+
+
+@dataclass
+class Scaled:
+    """Equilibrated problem data; the original variables are x = D * x_scaled."""
+    c: np.ndarray
+    A: Optional[np.ndarray]
+    b: Optional[np.ndarray]
+    A_eq: Optional[np.ndarray]
+    b_eq: Optional[np.ndarray]
+    Q: Optional[np.ndarray]
+    lb: np.ndarray
+    ub: np.ndarray
+    D: np.ndarray                 # column scaling
+    E: np.ndarray                 # row scaling of A
+    E_eq: np.ndarray              # row scaling of A_eq
+    sigma: float                  # objective scaling
+    stats: dict = field(default_factory=dict)
+
+    def unscale_x(self, x_scaled) -> np.ndarray:
+        return self.D * np.asarray(x_scaled, dtype=np.float64)
+
+    def unscale_duals(self, duals) -> dict:
+        """Row duals y = E ỹ / σ; bound duals μ = μ̃ / (σ D)."""
+        s = self.sigma
+        return {
+            "ineq": (self.E * np.asarray(duals["ineq"], dtype=np.float64) / s).tolist(),
+            "eq": (self.E_eq * np.asarray(duals["eq"], dtype=np.float64) / s).tolist(),
+            "lower": (np.asarray(duals["lower"], dtype=np.float64) / (s * self.D)).tolist(),
+            "upper": (np.asarray(duals["upper"], dtype=np.float64) / (s * self.D)).tolist(),
+        }
+
+    def scale_warm_start(self, warm_start) -> dict:
+        """Inverse of unscale_x/unscale_duals, for warm starts given in original units."""
+        s, out, scaled = self.sigma, {}, {}
+        x0 = warm_start.get("x")
+        if x0 is not None and len(x0) == self.D.size:
+            out["x"] = np.asarray(x0, dtype=np.float64) / self.D
+        duals = warm_start.get("duals") or {}
+        for key, factor in (("ineq", s / self.E), ("eq", s / self.E_eq),
+                            ("lower", s * self.D), ("upper", s * self.D)):
+            v = duals.get(key)
+            if v is not None and len(v) == factor.size:
+                scaled[key] = np.asarray(v, dtype=np.float64) * factor
+        out["duals"] = scaled
+        return out
+
+
+def _inf_norms(M, axis, size):
+    if M is None or M.size == 0:
+        return np.zeros(size)
+    return np.abs(M).max(axis=axis)
+
+
+def _to_scale(norms):
+    # empty rows/columns stay unscaled
+    norms = np.where(norms == 0, 1.0, np.clip(norms, _MIN_NORM, _MAX_NORM))
+    return 1.0 / np.sqrt(norms)
+
+
+def _range(v):
+    return [float(v.min()), float(v.max())] if v.size else [1.0, 1.0]
+
+
+def equilibrate(c, A=None, b=None, Q=None, lb=None, ub=None, A_eq=None, b_eq=None,
+                max_iters=25, tol=1e-3) -> Scaled:
+    """
+    Ruiz equilibration of the KKT data.
+
+    Alternately divides every column of [Q; A; A_eq] and every row of A and
+    A_eq by the square root of its infinity norm until all norms are within
+    ``tol`` of 1, then scales the objective so that max(|c|, mean column
+    norm of Q) is about 1. Bounds are rescaled with the columns, so the
+    feasible set maps one-to-one onto the scaled problem.
+    """
+    t0 = time.perf_counter()
+    c = np.asarray(c, dtype=np.float64)
+    n = c.shape[0]
+    A = None if A is None else np.asarray(A, dtype=np.float64).reshape(-1, n)
+    A_eq = None if A_eq is None else np.asarray(A_eq, dtype=np.float64).reshape(-1, n)
+    Q = None if Q is None else np.asarray(Q, dtype=np.float64)
+    lb = np.full(n, -np.inf) if lb is None else np.asarray(lb, dtype=np.float64)
+    ub = np.full(n, np.inf) if ub is None else np.asarray(ub, dtype=np.float64)
+
+    D = np.ones(n)
+    E = np.ones(0 if A is None else A.shape[0])
+    E_eq = np.ones(0 if A_eq is None else A_eq.shape[0])
+    As, Aeqs, Qs = A, A_eq, Q
+
+    it = 0
+    for it in range(1, max_iters + 1):
+        col = np.maximum.reduce([
+            _inf_norms(Qs, 0, n), _inf_norms(As, 0, n), _inf_norms(Aeqs, 0, n),
+        ])
+        row = _inf_norms(As, 1, E.size)
+        row_eq = _inf_norms(Aeqs, 1, E_eq.size)
+        norms = np.concatenate([col, row, row_eq])
+        norms = norms[norms > 0]
+        if norms.size == 0 or np.abs(1.0 - norms).max() <= tol:
+            break
+        d, e, e_eq = _to_scale(col), _to_scale(row), _to_scale(row_eq)
+        D *= d
+        E *= e
+        E_eq *= e_eq
+        if As is not None:
+            As = e[:, None] * As * d[None, :]
+        if Aeqs is not None:
+            Aeqs = e_eq[:, None] * Aeqs * d[None, :]
+        if Qs is not None:
+            Qs = d[:, None] * Qs * d[None, :]
+
+    cs = D * c
+    q_norm = _inf_norms(Qs, 0, n).mean() if Qs is not None else 0.0
+    ref = max(q_norm, np.abs(cs).max(initial=0.0))
+    sigma = 1.0 / float(np.clip(ref, _MIN_NORM, _MAX_NORM)) if ref > 0 else 1.0
+
+    return Scaled(
+        c=sigma * cs,
+        A=As,
+        b=None if A is None else E * np.asarray(b, dtype=np.float64),
+        A_eq=Aeqs,
+        b_eq=None if A_eq is None else E_eq * np.asarray(b_eq, dtype=np.float64),
+        Q=None if Qs is None else sigma * Qs,
+        lb=lb / D,
+        ub=ub / D,
+        D=D,
+        E=E,
+        E_eq=E_eq,
+        sigma=sigma,
+        stats={
+            "iterations": it,
+            "col_scale_range": _range(D),
+            "row_scale_range": _range(np.concatenate([E, E_eq])),
+            "objective_scale": sigma,
+            "scale_ms": round((time.perf_counter() - t0) * 1000, 3),
+        },
+    )
@@ -0,0 +1,156 @@
+"""
+A problem kept in memory between small edits.
+
+The CVXPY model is built with Parameters for everything an edit can change
+in place (c, b, b_eq and the finite bounds), so those edits only swap
+parameter values: CVXPY skips canonicalization and, with OSQP, warm-starts
+from the previous iterate and reuses the factorization. Adding or removing
+rows, or making a bound finite/infinite, changes the model's shape; the model
+is then rebuilt once and later edits are incremental again.
+"""
+import time
+
+import cvxpy as cp
+import numpy as np
+
+from solver.solve import _dual_list, _solver_stats, bounds_to_arrays
+
+
+class SolveSession:
+    def __init__(self, c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense="minimize"):
+        self.c = np.asarray(c, dtype=np.float64).copy()
+        n = self.c.size
+        has_A = A is not None and b is not None
+        has_eq = A_eq is not None and b_eq is not None
+        self.A = np.asarray(A, dtype=np.float64).reshape(-1, n).copy() if has_A else np.zeros((0, n))
+        self.b = np.asarray(b, dtype=np.float64).copy() if has_A else np.zeros(0)
+        self.A_eq = np.asarray(A_eq, dtype=np.float64).reshape(-1, n).copy() if has_eq else np.zeros((0, n))
+        self.b_eq = np.asarray(b_eq, dtype=np.float64).copy() if has_eq else np.zeros(0)
+        self.Q = None if Q is None else np.asarray(Q, dtype=np.float64)
+        self.has_bounds = bounds is not None
+        self.lb, self.ub = bounds_to_arrays(bounds, n)
+        self.sense = sense
+        self.builds = 0
+        self._build()
+
+    @property
+    def n(self):
+        return self.c.size
+
+    def _build(self):
+        n = self.n
+        self.x = cp.Variable(n)
+        self._c = cp.Parameter(n, value=self.c)
+        expr = self._c @ self.x
+        if self.Q is not None:
+            expr = 0.5 * cp.quad_form(self.x, self.Q) + expr
+        objective = cp.Minimize(expr) if self.sense == "minimize" else cp.Maximize(expr)
+
+        cons = []
+        self._ineq = self._eq = self._lower = self._upper = None
+        self._b = self._b_eq = self._lb = self._ub = None
+        if self.b.size:
+            self._b = cp.Parameter(self.b.size, value=self.b)
+            self._ineq = self.A @ self.x <= self._b
+            cons.append(self._ineq)
+        if self.b_eq.size:
+            self._b_eq = cp.Parameter(self.b_eq.size, value=self.b_eq)
+            self._eq = self.A_eq @ self.x == self._b_eq
+            cons.append(self._eq)
+        self._has_lb = np.flatnonzero(np.isfinite(self.lb))
+        self._has_ub = np.flatnonzero(np.isfinite(self.ub))
+        if self._has_lb.size:
+            self._lb = cp.Parameter(self._has_lb.size, value=self.lb[self._has_lb])
+            self._lower = self.x[self._has_lb] >= self._lb
+            cons.append(self._lower)
+        if self._has_ub.size:
+            self._ub = cp.Parameter(self._has_ub.size, value=self.ub[self._has_ub])
+            self._upper = self.x[self._has_ub] <= self._ub
+            cons.append(self._upper)
+        self.prob = cp.Problem(objective, cons)
+        self.builds += 1
+        self._stale = False
+
+    # ---------- edits ----------
+    def add_rows(self, A, b):
+        A = np.asarray(A, dtype=np.float64).reshape(-1, self.n)
+        self.A = np.vstack([self.A, A])
+        self.b = np.concatenate([self.b, np.asarray(b, dtype=np.float64)])
+        self._stale = True
+
+    def remove_rows(self, rows):
+        keep = np.setdiff1d(np.arange(self.b.size), np.asarray(rows, dtype=int))
+        self.A, self.b = self.A[keep], self.b[keep]
+        self._stale = True
+
+    def set_b(self, rows, values):
+        self.b[np.asarray(rows, dtype=int)] = values
+
+    def set_bounds(self, index, lb, ub):
+        lb = -np.inf if lb is None else float(lb)
+        ub = np.inf if ub is None else float(ub)
+        if np.isfinite(lb) != np.isfinite(self.lb[index]) or np.isfinite(ub) != np.isfinite(self.ub[index]):
+            self._stale = True
+        self.lb[index], self.ub[index] = lb, ub
+        self.has_bounds = True
+
+    def set_c(self, c):
+        self.c = np.asarray(c, dtype=np.float64).reshape(self.n).copy()
+
+    # ---------- solve ----------
+    def solve(self) -> dict:
+        t0 = time.perf_counter()
+        rebuilt = self._stale
+        if rebuilt:
+            self._build()
+        else:
+            self._c.value = self.c
+            if self._b is not None:
+                self._b.value = self.b
+            if self._b_eq is not None:
+                self._b_eq.value = self.b_eq
+            if self._lb is not None:
+                self._lb.value = self.lb[self._has_lb]
+            if self._ub is not None:
+                self._ub.value = self.ub[self._has_ub]
+        try:
+            self.prob.solve(warm_start=True)
+        except cp.SolverError as e:
+            return {"status": "solver_error", "objective_value": None, "solution": None,
+                    "error": str(e), "rebuilt": rebuilt}
+
+        x = self.x.value
+        res = {
+            "status": self.prob.status,
+            "objective_value": self.prob.value,
+            "solution": x.tolist() if x is not None else None,
+            "stats": _solver_stats(self.prob, time.perf_counter() - t0),
+            "rebuilt": rebuilt,
+        }
+        if x is not None:
+            lo, up = np.zeros(self.n), np.zeros(self.n)
+            if self._lower is not None and self._lower.dual_value is not None:
+                lo[self._has_lb] = self._lower.dual_value
+            if self._upper is not None and self._upper.dual_value is not None:
+                up[self._has_ub] = self._upper.dual_value
+            res["duals"] = {
+                "ineq": _dual_list(self._ineq, self.b.size),
+                "eq": _dual_list(self._eq, self.b_eq.size),
+                "lower": lo.tolist(),
+                "upper": up.tolist(),
+            }
+            res["reduced_costs"] = (lo - up).tolist()
+        return res
+
+    def problem_kwargs(self) -> dict:
+        """The current data in solve_lp's keyword form (absent parts None)."""
+        return {
+            "c": self.c.copy(),
+            "A": self.A.copy() if self.b.size else None,
+            "b": self.b.copy() if self.b.size else None,
+            "Q": self.Q,
+            "bounds": np.column_stack([self.lb, self.ub]) if self.has_bounds else None,
+            "A_eq": self.A_eq.copy() if self.b_eq.size else None,
+            "b_eq": self.b_eq.copy() if self.b_eq.size else None,
+            "sense": self.sense,
+        }
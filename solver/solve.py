@@ -1,7 +1,74 @@
+import time
+
 import cvxpy as cp
 import numpy as np
 
-def solve_lp(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense="minimize"):
+from solver import workspaces
+from solver.osqp_direct import HAVE_OSQP, solve_osqp
+from solver.presolve import TOL as PRESOLVE_TOL, duals_consistent, presolve as presolve_problem, recover_duals
+from solver.scaling import equilibrate
+from solver.threads import solver_options
+from solver.trace import capture, tracing
+
+def bounds_to_arrays(bounds, n):
+    """(lb, ub) float vectors from a list of pairs or an (n, 2) array; None/NaN mean unbounded."""
+    if bounds is None:
+        return np.full(n, -np.inf), np.full(n, np.inf)
+    arr = np.asarray(bounds, dtype=np.float64).reshape(n, 2)
+    lb = np.where(np.isnan(arr[:, 0]), -np.inf, arr[:, 0])
+    ub = np.where(np.isnan(arr[:, 1]), np.inf, arr[:, 1])
+    return lb, ub
+
+def _solver_stats(prob, wall_s):
+    st = prob.solver_stats
+    out = {"solver": getattr(st, "solver_name", None), "wall_ms": round(wall_s * 1000, 3)}
+    if st is not None:
+        if st.solve_time is not None:
+            out["solve_time_ms"] = round(st.solve_time * 1000, 3)
+        if st.setup_time is not None:
+            out["setup_time_ms"] = round(st.setup_time * 1000, 3)
+        if st.num_iters is not None:
+            out["iterations"] = int(st.num_iters)
+    return out
+
+def _objective_value(c, Q, x):
+    val = float(c @ x)
+    if Q is not None:
+        val += 0.5 * float(x @ np.asarray(Q, dtype=np.float64) @ x)
+    return val
+
+def _limit_value(status, sense):
+    """What CVXPY reports as prob.value for an infeasible or unbounded problem."""
+    s = 1.0 if sense == "minimize" else -1.0
+    if status.startswith("infeasible"):
+        return s * np.inf
+    if status.startswith("unbounded"):
+        return -s * np.inf
+    return None
+
+def _dense(M, n):
+    return np.zeros((0, n)) if M is None else np.asarray(M, dtype=np.float64).reshape(-1, n)
+
+def stationarity_residual(c, Q, A, A_eq, x, y, nu, sense):
+    """
+    d = s(c + Qx) + Aᵀy + A_eqᵀν with s = +1 (minimize) / -1 (maximize).
+
+    At an optimum d equals lower - upper bound duals, i.e. the reduced costs.
+    """
+    c = np.asarray(c, dtype=np.float64)
+    n = c.shape[0]
+    grad = c + (np.asarray(Q, dtype=np.float64) @ x if Q is not None else 0.0)
+    s = 1.0 if sense == "minimize" else -1.0
+    return s * grad + _dense(A, n).T @ np.asarray(y, dtype=np.float64) \
+        + _dense(A_eq, n).T @ np.asarray(nu, dtype=np.float64)
+
+def _bound_duals(d):
+    lower, upper = np.maximum(d, 0.0), np.maximum(-d, 0.0)
+    return lower.tolist(), upper.tolist()
+
+def solve_lp(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense="minimize",
+             presolve=False, scale=False, warm_start=None, decompose=False, workers=1, block_cache=None,
+             trace=False):
     """
     Solve a convex optimization problem:
     
@@ -18,12 +85,185 @@ def solve_lp(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense
         bounds : List of (lb, ub) tuples for each variable
         A_eq, b_eq : Equality constraints (A_eq x = b_eq)
         sense  : "minimize" or "maximize"
+        presolve : Reduce the problem first (see solver.presolve) and map
+                   the solution back to the original variables
+        scale  : Ruiz-equilibrate the data (see solver.scaling) and unscale
+                 the solution
+        warm_start : {"x": [...], "duals": {...}} from an earlier solve of a
+                     problem with the same shape; solved through OSQP directly
+                     (see solver.osqp_direct) since CVXPY cannot take one
+        decompose : Split into independent blocks (see solver.decompose),
+                    solve them on up to ``workers`` processes and stitch
+                    the result; ``block_cache`` lets callers reuse blocks
+        trace  : Record the solver's per-iteration residuals (see
+                 solver.trace) as res["trace"]; not with ``decompose``
     
     Returns:
-        Dict with status, objective_value, and solution
+        Dict with status, objective_value, solution, duals, reduced_costs
+        and solver stats. Duals follow the minimize form: "ineq" (Ax ≤ b,
+        ≥ 0), "eq" (A_eq x = b_eq), "lower"/"upper" (bounds, ≥ 0), and
+        reduced_costs = lower - upper.
     """
-    c = np.array(c)
+    if decompose:
+        from solver.decompose import solve_decomposed
+        return solve_decomposed(
+            c, A, b, Q, bounds, A_eq, b_eq, sense,
+            workers=workers, block_cache=block_cache, warm_start=warm_start,
+            presolve=presolve, scale=scale,
+        )
+    if trace:
+        with capture() as cap:
+            res = solve_lp(c, A, b, Q, bounds, A_eq, b_eq, sense, presolve=presolve, scale=scale,
+                           warm_start=warm_start)
+        data = cap.result()
+        if data is not None:
+            res["trace"] = data
+            if res.get("stats") is not None:
+                res["stats"]["iterations"] = cap.iterations  # OSQP reports its last chunk only
+        return res
+    inner = _solve_scaled if scale else _solve
+    if presolve:
+        return _solve_presolved(c, A, b, Q, bounds, A_eq, b_eq, sense, inner, warm_start)
+    return inner(c, A, b, Q, bounds, A_eq, b_eq, sense, warm_start)
+
+def _solve_scaled(c, A, b, Q, bounds, A_eq, b_eq, sense, warm_start=None):
+    c = np.asarray(c, dtype=np.float64)
+    lb, ub = bounds_to_arrays(bounds, len(c))
+    has_A = A is not None and b is not None
+    has_eq = A_eq is not None and b_eq is not None
+    sc = equilibrate(
+        c,
+        A=A if has_A else None,
+        b=b if has_A else None,
+        Q=Q,
+        lb=lb,
+        ub=ub,
+        A_eq=A_eq if has_eq else None,
+        b_eq=b_eq if has_eq else None,
+    )
+    if warm_start:
+        warm_start = sc.scale_warm_start(warm_start)
+    res = _solve(
+        sc.c, sc.A, sc.b, sc.Q,
+        np.column_stack([sc.lb, sc.ub]) if bounds is not None else None,
+        sc.A_eq, sc.b_eq, sense, warm_start,
+    )
+    res.setdefault("stats", {})["scaling"] = sc.stats
+    if res.get("solution") is None:
+        return res
+
+    x = sc.unscale_x(res["solution"])
+    res["solution"] = x.tolist()
+    res["objective_value"] = _objective_value(c, Q, x)
+    if res.get("duals") is not None:
+        res["duals"] = sc.unscale_duals(res["duals"])
+        d = np.asarray(res["duals"]["lower"]) - np.asarray(res["duals"]["upper"])
+        res["reduced_costs"] = d.tolist()
+    return res
+
+def _solve_presolved(c, A, b, Q, bounds, A_eq, b_eq, sense, inner=None, warm_start=None):
+    inner = inner or _solve
+    c = np.asarray(c, dtype=np.float64)
+    lb, ub = bounds_to_arrays(bounds, len(c))
+    ps = presolve_problem(c, A=A, b=b, Q=Q, lb=lb, ub=ub, A_eq=A_eq, b_eq=b_eq, sense=sense)
+    stats = {"presolve": ps.stats}
+    if ps.status is not None:
+        return {
+            "status": ps.status,
+            "objective_value": None,
+            "solution": None,
+            "message": ps.message,
+            "stats": stats,
+        }
+
+    if ps.cols.size == 0:
+        # every variable fixed: the rows left must read 0 <= b and 0 = b_eq
+        if (ps.b < -PRESOLVE_TOL).any() or (np.abs(ps.b_eq) > PRESOLVE_TOL).any():
+            return {
+                "status": "infeasible",
+                "objective_value": None,
+                "solution": None,
+                "message": "rows left after fixing every variable cannot hold",
+                "stats": stats,
+            }
+        res = {
+            "status": "optimal",
+            "solution": [],
+            "duals": {"ineq": [0.0] * ps.rows.size, "eq": [0.0] * ps.eq_rows.size},
+        }
+    else:
+        res = inner(
+            ps.c,
+            ps.A if ps.A.shape[0] else None,
+            ps.b if ps.A.shape[0] else None,
+            ps.Q,
+            np.column_stack([ps.lb, ps.ub]),
+            ps.A_eq if ps.A_eq.shape[0] else None,
+            ps.b_eq if ps.A_eq.shape[0] else None,
+            sense,
+            ps.reduce_warm_start(warm_start) if warm_start else None,
+        )
+        stats.update(res.pop("stats", {}))
+    res["stats"] = stats
+    if res.get("solution") is None:
+        return res
+
+    x = ps.postsolve(np.asarray(res["solution"], dtype=np.float64))
+    res["solution"] = x.tolist()
+    res["objective_value"] = _objective_value(c, Q, x)
+    if res.get("duals") is not None:
+        has_A = A is not None and b is not None
+        has_eq = A_eq is not None and b_eq is not None
+        A_full = _dense(A if has_A else None, len(c))
+        A_eq_full = _dense(A_eq if has_eq else None, len(c))
+        y, nu = ps.postsolve_row_duals(res["duals"]["ineq"], res["duals"]["eq"])
+        d = stationarity_residual(c, Q, A_full, A_eq_full, x, y, nu, sense)
+        y, nu, d = ps.attribute_bound_duals(A_full, A_eq_full, y, nu, d)
+        if not duals_consistent(d, x, lb, ub):
+            # an implied bound carried the dual; recover it on the active set
+            grad = stationarity_residual(c, Q, None, None, x, [], [], sense)
+            b_full = np.asarray(b, dtype=np.float64) if has_A else np.zeros(0)
+            y, nu, lower, upper = recover_duals(grad, A_full, b_full, A_eq_full, x, lb, ub)
+            d = lower - upper
+        lower, upper = _bound_duals(d)
+        res["duals"] = {"ineq": y.tolist(), "eq": nu.tolist(), "lower": lower, "upper": upper}
+        res["reduced_costs"] = d.tolist()
+    return res
+
+def _solve(c, A, b, Q, bounds, A_eq, b_eq, sense, warm_start=None):
+    t0 = time.perf_counter()
+    c = np.asarray(c, dtype=np.float64)
     n = len(c)
+
+    # Clarabel (LPs) cannot be warm-started; those go to solve_osqp below.
+    # Traced solves need the solvers' own APIs (solver.trace), pooled or not
+    if (workspaces.enabled() or tracing()) and workspaces.available(Q) and not (warm_start and Q is None):
+        lb, ub = bounds_to_arrays(bounds, n)
+        has_A = A is not None and b is not None
+        has_eq = A_eq is not None and b_eq is not None
+        res = workspaces.solve_pooled(
+            c, A if has_A else None, b if has_A else None, Q, lb, ub,
+            A_eq if has_eq else None, b_eq if has_eq else None, sense, warm_start,
+            pool=None if workspaces.enabled() else workspaces.WorkspacePool(0),
+        )
+        if res.get("solution") is not None:
+            res["objective_value"] = _objective_value(c, Q, np.asarray(res["solution"]))
+        else:
+            res["objective_value"] = _limit_value(res["status"], sense)
+        return res
+
+    if warm_start and HAVE_OSQP:
+        lb, ub = bounds_to_arrays(bounds, n)
+        has_A = A is not None and b is not None
+        has_eq = A_eq is not None and b_eq is not None
+        res = solve_osqp(
+            c, A if has_A else None, b if has_A else None, Q, lb, ub,
+            A_eq if has_eq else None, b_eq if has_eq else None, sense, warm_start,
+        )
+        if res.get("solution") is not None:
+            res["objective_value"] = _objective_value(c, Q, np.asarray(res["solution"]))
+        return res
+
     x = cp.Variable(n)
 
     # Objective
@@ -35,31 +275,38 @@ def solve_lp(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense
     objective = cp.Minimize(objective_expr) if sense == "minimize" else cp.Maximize(objective_expr)
 
     constraints = []
+    ineq = eq = lower = upper = None
 
     # Inequality
     if A is not None and b is not None:
         A = np.array(A)
         b = np.array(b)
-        constraints.append(A @ x <= b)
+        ineq = A @ x <= b
+        constraints.append(ineq)
 
     # Equality
     if A_eq is not None and b_eq is not None:
         A_eq = np.array(A_eq)
         b_eq = np.array(b_eq)
-        constraints.append(A_eq @ x == b_eq)
+        eq = A_eq @ x == b_eq
+        constraints.append(eq)
 
-    # Bounds
+    # Bounds (one vectorized constraint per side)
     if bounds is not None:
-        for i, (lb, ub) in enumerate(bounds):
-            if lb is not None:
-                constraints.append(x[i] >= lb)
-            if ub is not None:
-                constraints.append(x[i] <= ub)
+        lb, ub = bounds_to_arrays(bounds, n)
+        has_lb = np.flatnonzero(np.isfinite(lb))
+        has_ub = np.flatnonzero(np.isfinite(ub))
+        if has_lb.size:
+            lower = x[has_lb] >= lb[has_lb]
+            constraints.append(lower)
+        if has_ub.size:
+            upper = x[has_ub] <= ub[has_ub]
+            constraints.append(upper)
 
     prob = cp.Problem(objective, constraints)
 
     try:
-        prob.solve()
+        prob.solve(**solver_options(lp=Q is None))
     except cp.SolverError as e:
         return {
             "status": "solver_error",
@@ -67,10 +314,29 @@ def solve_lp(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense
             "solution": None,
             "error": str(e)
         }
-    
 
-    return {
+    res = {
         "status": prob.status,
         "objective_value": prob.value,
-        "solution": x.value.tolist() if x.value is not None else None
-    }
\ No newline at end of file
+        "solution": x.value.tolist() if x.value is not None else None,
+        "stats": _solver_stats(prob, time.perf_counter() - t0),
+    }
+    if x.value is not None:
+        lo, up = np.zeros(n), np.zeros(n)
+        if lower is not None and lower.dual_value is not None:
+            lo[has_lb] = lower.dual_value
+        if upper is not None and upper.dual_value is not None:
+            up[has_ub] = upper.dual_value
+        res["duals"] = {
+            "ineq": _dual_list(ineq, 0 if A is None or b is None else len(b)),
+            "eq": _dual_list(eq, 0 if A_eq is None or b_eq is None else len(b_eq)),
+            "lower": lo.tolist(),
+            "upper": up.tolist(),
+        }
+        res["reduced_costs"] = (lo - up).tolist()
+    return res
+
+def _dual_list(con, m):
+    if con is None or con.dual_value is None:
+        return [0.0] * m
+    return np.atleast_1d(np.asarray(con.dual_value, dtype=np.float64)).tolist()
@@ -0,0 +1,132 @@
+"""
+Scenario sweeps: one model, many right-hand sides / cost vectors.
+
+The CVXPY problem is built once with ``c`` and/or ``b`` as Parameters, so
+each scenario only swaps parameter values and re-solves with warm_start
+(CVXPY then reuses the canonicalization and, for OSQP, the factorization).
+With ``workers > 1`` the scenarios are split into contiguous chunks, each
+solved the same way in its own process.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import cvxpy as cp
+import numpy as np
+
+from solver.solve import bounds_to_arrays
+from solver.threads import init_worker, worker_threads
+
+
+def _build(c, A, b, Q, bounds, A_eq, b_eq, sense, vary_c, vary_b):
+    c = np.asarray(c, dtype=np.float64)
+    n = c.shape[0]
+    x = cp.Variable(n)
+    c_par = cp.Parameter(n) if vary_c else None
+    b_par = cp.Parameter(len(b)) if vary_b else None
+    if c_par is not None:
+        c_par.value = c
+
+    objective_expr = (c_par if c_par is not None else c) @ x
+    if Q is not None:
+        objective_expr = 0.5 * cp.quad_form(x, np.asarray(Q, dtype=np.float64)) + objective_expr
+    objective = cp.Minimize(objective_expr) if sense == "minimize" else cp.Maximize(objective_expr)
+
+    constraints = []
+    if A is not None and b is not None:
+        rhs = b_par if b_par is not None else np.asarray(b, dtype=np.float64)
+        constraints.append(np.asarray(A, dtype=np.float64) @ x <= rhs)
+    if A_eq is not None and b_eq is not None:
+        constraints.append(np.asarray(A_eq, dtype=np.float64) @ x == np.asarray(b_eq, dtype=np.float64))
+    if bounds is not None:
+        lb, ub = bounds_to_arrays(bounds, n)
+        has_lb = np.flatnonzero(np.isfinite(lb))
+        has_ub = np.flatnonzero(np.isfinite(ub))
+        if has_lb.size:
+            constraints.append(x[has_lb] >= lb[has_lb])
+        if has_ub.size:
+            constraints.append(x[has_ub] <= ub[has_ub])
+    return cp.Problem(objective, constraints), x, c_par, b_par
+
+
+def _sweep_chunk(base, c_rows, b_rows, return_solutions):
+    k = len(c_rows) if c_rows is not None else len(b_rows)
+    prob, x, c_par, b_par = _build(**base, vary_c=c_rows is not None, vary_b=b_rows is not None)
+    status = []
+    objective = np.full(k, np.nan)
+    solutions = np.full((k, x.shape[0]), np.nan) if return_solutions else None
+    iterations = 0
+    for i in range(k):
+        if c_par is not None:
+            c_par.value = c_rows[i]
+        if b_par is not None:
+            b_par.value = b_rows[i]
+        try:
+            prob.solve(warm_start=True)
+        except cp.SolverError:
+            status.append("solver_error")
+            continue
+        status.append(prob.status)
+        if prob.value is not None and np.isfinite(prob.value):
+            objective[i] = prob.value
+        if solutions is not None and x.value is not None:
+            solutions[i] = x.value
+        iterations += int(getattr(prob.solver_stats, "num_iters", None) or 0)
+    return status, objective, solutions, iterations
+
+
+def sweep_lp(c, A=None, b=None, Q=None, bounds=None, A_eq=None, b_eq=None, sense="minimize",
+             c_scenarios=None, b_scenarios=None, workers=1, return_solutions=False):
+    """
+    Solve the base problem once per scenario row.
+
+    c_scenarios : (k, n) matrix; row i replaces c in scenario i
+    b_scenarios : (k, m) matrix; row i replaces b in scenario i
+    When both are given they are paired row by row.
+
+    Returns:
+        Dict with per-scenario "status" (list) and "objective_value"
+        (float array, NaN where there is none), "solutions" ((k, n) array or
+        None) and stats.
+    """
+    t0 = time.perf_counter()
+    C = None if c_scenarios is None else np.asarray(c_scenarios, dtype=np.float64)
+    B = None if b_scenarios is None else np.asarray(b_scenarios, dtype=np.float64)
+    k = C.shape[0] if C is not None else B.shape[0]
+    base = dict(c=c, A=A, b=b, Q=Q, bounds=bounds, A_eq=A_eq, b_eq=b_eq, sense=sense)
+
+    workers = max(1, min(int(workers), k))
+    if workers == 1:
+        status, objective, solutions, iterations = _sweep_chunk(base, C, B, return_solutions)
+    else:
+        chunks = np.array_split(np.arange(k), workers)
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"),
+            initializer=init_worker, initargs=(worker_threads(workers),),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _sweep_chunk, base,
+                    None if C is None else C[idx],
+                    None if B is None else B[idx],
+                    return_solutions,
+                )
+                for idx in chunks
+            ]
+            parts = [f.result() for f in futures]
+        status = [s for part in parts for s in part[0]]
+        objective = np.concatenate([part[1] for part in parts])
+        solutions = np.vstack([part[2] for part in parts]) if return_solutions else None
+        iterations = sum(part[3] for part in parts)
+
+    return {
+        "status": status,
+        "objective_value": objective,
+        "solutions": solutions,
+        "stats": {
+            "scenarios": k,
+            "workers": workers,
+            "iterations": iterations,
+            "wall_ms": round((time.perf_counter() - t0) * 1000, 3),
+        },
+    }
@@ -0,0 +1,88 @@
+"""
+Thread budgets for BLAS and the solvers.
+
+Left alone, OpenBLAS/MKL and OpenMP start one thread per core in every
+process, so k concurrent solves (or k pool workers) run k x cores threads
+and throughput drops below serial. ``configure(threads)`` sets the budget of
+one solve:
+
+  - BLAS/OpenMP in this process, through threadpoolctl when installed
+    (otherwise only through the environment, which reaches child processes)
+  - the environment (OMP_NUM_THREADS, OPENBLAS_NUM_THREADS, ...), read by
+    spawned pool workers when they import numpy
+  - Clarabel's ``max_threads`` for fresh LP solves (``solver_options``)
+
+Process pools split the budget between their workers with
+``init_worker(worker_threads(workers))``.
+
+This module must not import numpy at top level: ``init_worker`` runs in a
+fresh spawned process and has to set the environment before BLAS loads.
+"""
+import os
+from functools import lru_cache
+from typing import Optional
+
+try:
+    from threadpoolctl import threadpool_limits
+    HAVE_THREADPOOLCTL = True
+except Exception:
+    threadpool_limits = None
+    HAVE_THREADPOOLCTL = False
+
+_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+             "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+_threads: Optional[int] = None
+_limiter = None   # threadpoolctl handle; limits stay in force while referenced
+
+
+def cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def threads_per_solve(concurrency: int, cpus: Optional[int] = None) -> int:
+    """Cores per solve when ``concurrency`` solves run at once."""
+    return max(1, (cpus or cpu_count()) // max(1, concurrency))
+
+
+def configure(threads: int) -> dict:
+    """Apply a per-solve budget of ``threads`` to this process and future children."""
+    global _threads, _limiter
+    _threads = max(1, int(threads))
+    for var in _ENV_VARS:
+        os.environ[var] = str(_threads)
+    if HAVE_THREADPOOLCTL:
+        _limiter = threadpool_limits(limits=_threads)
+    return {"threads": _threads, "threadpoolctl": HAVE_THREADPOOLCTL}
+
+
+def solve_threads() -> Optional[int]:
+    """The configured per-solve budget, or None if configure() was never called."""
+    return _threads
+
+
+def worker_threads(workers: int) -> int:
+    """Share of the per-solve budget for each of ``workers`` pool processes."""
+    return max(1, (_threads or cpu_count()) // max(1, workers))
+
+
+def init_worker(threads: int) -> None:
+    """ProcessPoolExecutor initializer: cap BLAS/OpenMP in the new process."""
+    configure(threads)
+
+
+def solver_options(lp: bool) -> dict:
+    """Extra cvxpy solve() arguments for a fresh problem (Clarabel only takes threads at setup)."""
+    if _threads is None or not lp or not _have_clarabel():
+        return {}
+    # the LP default is Clarabel anyway; naming it keeps max_threads from reaching another solver
+    return {"solver": "CLARABEL", "max_threads": _threads}
+
+
+@lru_cache(maxsize=None)
+def _have_clarabel() -> bool:
+    import cvxpy as cp
+    return cp.CLARABEL in cp.installed_solvers()
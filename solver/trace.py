@@ -0,0 +1,164 @@
+"""
+Per-iteration solver traces for convergence plots.
+
+While a ``capture()`` block is active on a thread, solves on that thread go
+to the solvers' own APIs (``tracing()``; see solver.workspaces) and record
+one row per iteration into the capture's preallocated (rows x
+TRACE_COLUMNS) float64 buffer:
+
+  - Clarabel (LPs) calls a termination callback after every iteration,
+    ``clarabel_solve`` records its info there
+  - OSQP (QPs, warm starts) has no callback, so ``osqp_solve`` runs it
+    OSQP_CHUNK iterations at a time, continuing from the previous iterate,
+    and records a row after each chunk, as coarse as OSQP's own printed
+    table. Each chunk restarts OSQP's iteration count, so the iterates match
+    an uninterrupted solve only while rho adapts every OSQP_CHUNK iterations
+    (solver.osqp_direct.SETTINGS sets that interval)
+
+Captures are per thread and nothing is redirected, so concurrent traced
+solves neither wait for each other nor swallow other threads' output.
+``parse_trace`` reads a printed iteration table (a solver log) the same way.
+"""
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+TRACE_COLUMNS = ("iter", "objective", "prim_res", "dual_res", "gap")
+DEFAULT_CAPACITY = 10_000
+OSQP_CHUNK = 25            # OSQP's check_termination default
+# statuses an OSQP solve ends with when it stops at max_iter: the
+# *_inaccurate ones when the looser criteria hold there, else max iter reached
+_OSQP_AT_MAX_ITER = (2, 4, 6, 7)
+
+# header names per solver -> TRACE_COLUMNS
+_ALIASES = {
+    "iter": "iter",
+    "objective": "objective", "obj": "objective", "pcost": "objective",
+    "prim_res": "prim_res", "pres": "prim_res",
+    "dual_res": "dual_res", "dres": "dual_res",
+    "gap": "gap",
+}
+_MULTIWORD = [
+    (re.compile(r"\bpri(?:m)? res\b"), "prim_res"),
+    (re.compile(r"\bdua(?:l)? res\b"), "dual_res"),
+    (re.compile(r"\brel kkt\b"), "rel_kkt"),
+    (re.compile(r"\btime \(s\)"), "time"),
+]
+_ROW = re.compile(r"^\s*\d+\s")
+
+_local = threading.local()
+
+
+def tracing() -> bool:
+    """True inside capture(): solves should go to a solver that can be traced."""
+    return getattr(_local, "capture", None) is not None
+
+
+class Capture:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.iterations = 0
+        self._buf = np.full((capacity, len(TRACE_COLUMNS)), np.nan)
+        self._count = 0
+
+    def add(self, *row) -> None:
+        if self._count < self.capacity:
+            self._buf[self._count] = row
+            self._count += 1
+        self.iterations = int(row[0])
+
+    def result(self):
+        """The trace as an (iterations x TRACE_COLUMNS) array, or None if nothing was recorded."""
+        return self._buf[:self._count].copy() if self._count else None
+
+
+@contextmanager
+def capture(capacity: int = DEFAULT_CAPACITY):
+    cap = Capture(capacity)
+    _local.capture = cap
+    try:
+        yield cap
+    finally:
+        _local.capture = None
+
+
+def clarabel_solve(solver):
+    """``solver.solve()``, recording every iteration inside capture()."""
+    cap = getattr(_local, "capture", None)
+    if cap is None:
+        return solver.solve()
+
+    def on_iteration(info) -> bool:
+        cap.add(info.iterations, info.cost_primal, info.res_primal, info.res_dual, info.gap_abs)
+        return False   # never stop early
+
+    solver.set_termination_callback(on_iteration)
+    try:
+        return solver.solve()
+    finally:
+        solver.unset_termination_callback()
+
+
+def osqp_solve(solver, max_iter: int):
+    """``solver.solve()`` of a set-up OSQP instance, OSQP_CHUNK iterations at a time inside capture()."""
+    cap = getattr(_local, "capture", None)
+    if cap is None:
+        return solver.solve(raise_error=False)
+    done, res = 0, None
+    try:
+        while done < max_iter:
+            solver.update_settings(max_iter=min(OSQP_CHUNK, max_iter - done))
+            res = solver.solve(raise_error=False)
+            done += res.info.iter
+            cap.add(done, res.info.obj_val, res.info.prim_res, res.info.dual_res, np.nan)
+            if res.info.status_val not in _OSQP_AT_MAX_ITER:
+                break
+    finally:
+        solver.update_settings(max_iter=max_iter)
+    return res
+
+
+def _header_columns(line: str):
+    """TRACE_COLUMNS name -> position in the row, if ``line`` is an iteration-table header."""
+    norm = line.replace("|", " ").strip().lower()
+    if not norm.startswith("iter"):
+        return None
+    for pattern, repl in _MULTIWORD:
+        norm = pattern.sub(repl, norm)
+    cols = {}
+    for i, tok in enumerate(norm.split()):
+        name = _ALIASES.get(tok)
+        if name is not None and name not in cols:
+            cols[name] = i
+    return cols if len(cols) > 1 else None
+
+
+def _float(tok: str) -> float:
+    try:
+        return float(tok.rstrip("s"))
+    except ValueError:
+        return np.nan
+
+
+def parse_trace(text: str, capacity: int = DEFAULT_CAPACITY):
+    buf = np.full((capacity, len(TRACE_COLUMNS)), np.nan)
+    count = 0
+    cols = None
+    for line in text.splitlines():
+        header = _header_columns(line)
+        if header is not None:
+            cols = header
+            continue
+        if cols is None or not _ROW.match(line.replace("|", " ")):
+            continue
+        if count == capacity:
+            break
+        toks = line.replace("|", " ").split()
+        for j, name in enumerate(TRACE_COLUMNS):
+            i = cols.get(name)
+            if i is not None and i < len(toks):
+                buf[count, j] = _float(toks[i])
+        count += 1
+    return buf[:count].copy() if count else None
@@ -0,0 +1,304 @@
+"""
+Live solver instances kept between solves, keyed by sparsity pattern.
+
+Setting up OSQP builds and factors the KKT matrix; setting up Clarabel
+allocates its workspace and runs the symbolic analysis. A new problem with
+the same sparsity pattern of P and [A; A_eq; bounds] as a previous one
+(typically: only c, b or the bounds changed, or values in place) can skip
+that by updating the previous solver in place:
+
+  - OSQP: ``update(q, l, u)`` keeps the factorization; ``update(Px, Ax)``
+    refactors numerically but not symbolically
+  - Clarabel: ``update(q, b, P, A)`` keeps the allocation and the symbolic
+    factorization (it refactors every iteration anyway)
+
+QPs go to OSQP and LPs to Clarabel, as CVXPY would choose. A workspace is
+checked out while it solves, so concurrent solves of one pattern get
+separate instances, and the pool evicts the least recently used workspaces
+beyond ``max_bytes`` of estimated memory. ``stats()`` reports hits,
+misses, evictions and the setup time the hits saved (setup time of the
+workspace's first solve minus the time of the update).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import scipy.sparse as sp
+
+from solver.osqp_direct import HAVE_OSQP, SETTINGS, build, osqp, result_from, warm_start_y
+from solver.trace import clarabel_solve, osqp_solve
+
+try:
+    import clarabel
+    HAVE_CLARABEL = True
+except Exception:
+    clarabel = None
+    HAVE_CLARABEL = False
+
+# rough per-entry cost of a workspace (data, KKT matrix and its factor, iterates)
+BYTES_PER_NNZ = 96
+BYTES_PER_ROW = 160
+
+_CLARABEL_STATUS = {
+    "Solved": "optimal",
+    "AlmostSolved": "optimal_inaccurate",
+    "PrimalInfeasible": "infeasible",
+    "AlmostPrimalInfeasible": "infeasible_inaccurate",
+    "DualInfeasible": "unbounded",
+    "AlmostDualInfeasible": "unbounded_inaccurate",
+    "MaxIterations": "user_limit",
+    "MaxTime": "user_limit",
+}
+
+
+def _pattern_key(backend: str, P, M, extra=b"") -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(backend.encode())
+    h.update(np.asarray(P.shape + M.shape, dtype=np.int64).tobytes())
+    for mat in (P, M):
+        h.update(mat.indptr.astype(np.int64).tobytes())
+        h.update(mat.indices.astype(np.int64).tobytes())
+    h.update(extra)
+    return h.hexdigest()
+
+
+class _Workspace:
+    def __init__(self, backend, solver, Px, Ax, nbytes, setup_s):
+        self.backend = backend
+        self.solver = solver
+        self.Px = Px
+        self.Ax = Ax
+        self.nbytes = nbytes
+        self.setup_s = setup_s
+        self.uses = 0
+
+
+class WorkspacePool:
+    """LRU of idle solver workspaces, bounded by estimated bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._idle: "OrderedDict[str, list]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "setup_saved_ms": 0.0}
+
+    def checkout(self, key: str) -> Optional[_Workspace]:
+        with self._lock:
+            stack = self._idle.get(key)
+            if not stack:
+                self._counts["misses"] += 1
+                return None
+            ws = stack.pop()
+            if not stack:
+                del self._idle[key]
+            self._bytes -= ws.nbytes
+            self._counts["hits"] += 1
+            return ws
+
+    def checkin(self, key: str, ws: _Workspace) -> None:
+        if ws.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._idle.setdefault(key, []).append(ws)
+            self._idle.move_to_end(key)
+            self._bytes += ws.nbytes
+            while self._bytes > self.max_bytes and self._idle:
+                old_key, stack = next(iter(self._idle.items()))
+                self._bytes -= stack.pop(0).nbytes
+                self._counts["evictions"] += 1
+                if not stack:
+                    del self._idle[old_key]
+
+    def saved(self, ms: float) -> None:
+        with self._lock:
+            self._counts["setup_saved_ms"] += ms
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counts,
+                "setup_saved_ms": round(self._counts["setup_saved_ms"], 3),
+                "workspaces": sum(len(s) for s in self._idle.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_pool: Optional[WorkspacePool] = None
+_pool_lock = threading.Lock()
+
+
+def configure(max_bytes: int) -> None:
+    """Pool workspaces in this process, up to ``max_bytes`` (0 turns pooling off and drops the pool)."""
+    global _pool
+    with _pool_lock:
+        if not max_bytes:
+            _pool = None
+        elif _pool is None:
+            _pool = WorkspacePool(max_bytes)
+        else:
+            _pool.max_bytes = max_bytes
+
+
+def enabled() -> bool:
+    return _pool is not None and _pool.max_bytes > 0
+
+
+def get_pool() -> WorkspacePool:
+    """The process-wide pool (64 MB when used before ``configure``)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkspacePool(64 * 2**20)
+        return _pool
+
+
+def available(Q) -> bool:
+    return HAVE_OSQP if Q is not None else HAVE_CLARABEL
+
+
+def _nbytes(P, M) -> int:
+    return BYTES_PER_NNZ * (P.nnz + M.nnz) + BYTES_PER_ROW * (M.shape[0] + M.shape[1])
+
+
+def _solve_osqp(pool, c, A, b, Q, lb, ub, A_eq, b_eq, sense, warm_start):
+    t0 = time.perf_counter()
+    P, q, M, l, u, shape = build(c, A, b, Q, lb, ub, A_eq, b_eq, sense)
+    key = _pattern_key("osqp", P, M)
+    ws = pool.checkout(key)
+    t_setup = time.perf_counter()
+    if ws is None:
+        solver = osqp.OSQP()
+        solver.setup(P, q, M, l, u, **SETTINGS)
+        ws = _Workspace("osqp", solver, P.data.copy(), M.data.copy(), _nbytes(P, M), time.perf_counter() - t_setup)
+        hit = False
+    else:
+        update = {"q": q, "l": l, "u": u}
+        if not np.array_equal(ws.Px, P.data):
+            update["Px"] = P.data
+            ws.Px = P.data.copy()
+        if not np.array_equal(ws.Ax, M.data):
+            update["Ax"] = M.data
+            ws.Ax = M.data.copy()
+        ws.solver.update(**update)
+        hit = True
+    setup_s = time.perf_counter() - t_setup
+    if warm_start:
+        x0 = warm_start.get("x")
+        n = len(c)
+        x0 = np.nan_to_num(np.asarray(x0, dtype=np.float64)) if x0 is not None and len(x0) == n else None
+        ws.solver.warm_start(x=x0, y=warm_start_y(warm_start.get("duals"), shape))
+    res = osqp_solve(ws.solver, SETTINGS["max_iter"])
+    out = result_from(res, shape, time.perf_counter() - t0, setup_s=setup_s)
+    return key, ws, hit, setup_s, out
+
+
+def _clarabel_data(c, A, b, Q, lb, ub, A_eq, b_eq, sense):
+    """Clarabel form: A_eq x + s = b_eq (zero cone), [A; -I_lb; I_ub] x + s = h (nonnegative)."""
+    c = np.asarray(c, dtype=np.float64)
+    n = c.shape[0]
+    s = 1.0 if sense == "minimize" else -1.0
+    A = np.zeros((0, n)) if A is None else np.asarray(A, dtype=np.float64).reshape(-1, n)
+    A_eq = np.zeros((0, n)) if A_eq is None else np.asarray(A_eq, dtype=np.float64).reshape(-1, n)
+    b = np.zeros(0) if b is None else np.asarray(b, dtype=np.float64)
+    b_eq = np.zeros(0) if b_eq is None else np.asarray(b_eq, dtype=np.float64)
+    has_lb, has_ub = np.flatnonzero(np.isfinite(lb)), np.flatnonzero(np.isfinite(ub))
+    eye = sp.identity(n, format="csr")
+    M = sp.vstack([sp.csc_matrix(A_eq), sp.csc_matrix(A), -eye[has_lb], eye[has_ub]], format="csc")
+    h = np.concatenate([b_eq, b, -lb[has_lb], ub[has_ub]])
+    P = sp.csc_matrix((n, n)) if Q is None else sp.triu(s * sp.csc_matrix(np.asarray(Q, dtype=np.float64)), format="csc")
+    rows = (A_eq.shape[0], A.shape[0], has_lb, has_ub, n)
+    return P, s * c, M, h, rows
+
+
+def _clarabel_settings():
+    st = clarabel.DefaultSettings()
+    st.verbose = False
+    # both rewrite the data, which rules out updating it in place
+    st.presolve_enable = False
+    st.chordal_decomposition_enable = False
+    return st
+
+
+def _clarabel_result(res, rows, wall_s, setup_s):
+    m_eq, m, has_lb, has_ub, n = rows
+    status = _CLARABEL_STATUS.get(str(res.status), "solver_error")
+    stats = {
+        "solver": "CLARABEL",
+        "wall_ms": round(wall_s * 1000, 3),
+        "solve_time_ms": round(res.solve_time * 1000, 3),
+        "setup_time_ms": round(setup_s * 1000, 3),
+        "iterations": int(res.iterations),
+    }
+    if status not in ("optimal", "optimal_inaccurate"):
+        return {"status": status, "objective_value": None, "solution": None, "stats": stats}
+    z = np.asarray(res.z)
+    lower, upper = np.zeros(n), np.zeros(n)
+    k = m_eq + m
+    lower[has_lb] = z[k:k + has_lb.size]
+    upper[has_ub] = z[k + has_lb.size:]
+    return {
+        "status": status,
+        "solution": list(res.x),
+        "duals": {"ineq": z[m_eq:k].tolist(), "eq": z[:m_eq].tolist(),
+                  "lower": lower.tolist(), "upper": upper.tolist()},
+        "reduced_costs": (lower - upper).tolist(),
+        "stats": stats,
+    }
+
+
+def _solve_clarabel(pool, c, A, b, Q, lb, ub, A_eq, b_eq, sense):
+    t0 = time.perf_counter()
+    P, q, M, h, rows = _clarabel_data(c, A, b, Q, lb, ub, A_eq, b_eq, sense)
+    m_eq = rows[0]
+    key = _pattern_key("clarabel", P, M, extra=np.int64(m_eq).tobytes())
+    ws = pool.checkout(key)
+    t_setup = time.perf_counter()
+    if ws is None:
+        cones = ([clarabel.ZeroConeT(m_eq)] if m_eq else []) + \
+                ([clarabel.NonnegativeConeT(M.shape[0] - m_eq)] if M.shape[0] > m_eq else [])
+        solver = clarabel.DefaultSolver(P, q, M, h, cones, _clarabel_settings())
+        ws = _Workspace("clarabel", solver, P.data.copy(), M.data.copy(), _nbytes(P, M), time.perf_counter() - t_setup)
+        hit = False
+    else:
+        update = {"q": q, "b": h}
+        if not np.array_equal(ws.Px, P.data):
+            update["P"] = P.data
+            ws.Px = P.data.copy()
+        if not np.array_equal(ws.Ax, M.data):
+            update["A"] = M.data
+            ws.Ax = M.data.copy()
+        ws.solver.update(**update)
+        hit = True
+    setup_s = time.perf_counter() - t_setup
+    res = clarabel_solve(ws.solver)
+    return key, ws, hit, setup_s, _clarabel_result(res, rows, time.perf_counter() - t0, setup_s)
+
+
+def solve_pooled(c, A=None, b=None, Q=None, lb=None, ub=None, A_eq=None, b_eq=None,
+                 sense="minimize", warm_start=None, pool: Optional[WorkspacePool] = None):
+    """
+    Solve on a pooled workspace (OSQP for QPs, Clarabel for LPs), set up
+    fresh on a miss. Returns solve_osqp's result shape plus
+    ``stats["workspace"]``; the objective value is left for the caller.
+    Clarabel cannot take a warm start, so LPs ignore ``warm_start``.
+    """
+    pool = pool or get_pool()
+    n = len(c)
+    lb = np.full(n, -np.inf) if lb is None else np.asarray(lb, dtype=np.float64)
+    ub = np.full(n, np.inf) if ub is None else np.asarray(ub, dtype=np.float64)
+    if Q is not None:
+        key, ws, hit, setup_s, out = _solve_osqp(pool, c, A, b, Q, lb, ub, A_eq, b_eq, sense, warm_start)
+    else:
+        key, ws, hit, setup_s, out = _solve_clarabel(pool, c, A, b, Q, lb, ub, A_eq, b_eq, sense)
+    ws.uses += 1
+    saved_ms = max(0.0, (ws.setup_s - setup_s) * 1000) if hit else 0.0
+    if hit:
+        pool.saved(saved_ms)
+    out["stats"]["workspace"] = {"hit": hit, "uses": ws.uses, "setup_saved_ms": round(saved_ms, 3)}
+    pool.checkin(key, ws)
+    return out
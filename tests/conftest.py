@@ -1,4 +1,9 @@
 # tests/conftest.py
+import os
+
+# per-process limiter/cache state, so reruns start with empty buckets
+os.environ.setdefault("SHARED_STATE_URL", "memory://")
+
 import pytest
 from app.services.persistence import create_tables
 
@@ -0,0 +1,106 @@
+import json
+import threading
+
+from starlette.testclient import TestClient
+
+import app.api.v1.routes as routes
+from app.main import app
+from app.core import admission
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.schema import ProblemInput
+from app.services.codec import NPZ_MEDIA_TYPE, encode_problem
+
+client = TestClient(app)
+
+BODY = {'c': [1.0, 2.0], 'A': [[-1.0, 0.0], [0.0, -1.0], [-1.0, -1.0]], 'b': [0.0, 0.0, -1.0],
+        'A_eq': [[1.0, -1.0]], 'b_eq': [0.0], 'bounds': [[0, None], [0, None]]}
+
+def _hdr(ip, **extra):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip, **extra}
+
+def test_size_scan_without_parsing():
+    for raw in (json.dumps(BODY).encode(), json.dumps(BODY, indent=2).encode()):
+        size = admission.estimate('application/json', raw)
+        assert (size.variables, size.constraints, size.entries) == (2, 4, 8)
+
+    npz = encode_problem(ProblemInput.model_validate(BODY))
+    size = admission.estimate(NPZ_MEDIA_TYPE, npz)
+    assert (size.variables, size.constraints, size.entries) == (2, 4, 8)
+
+    empty = admission.estimate('application/json', b'{"c": [1, 2], "A": [], "b": []}')
+    assert (empty.variables, empty.constraints, empty.entries) == (2, 0, 0)
+    # 20k x 20k dense is far over any sensible limit
+    head = b'{"c": [' + b'1,' * 19999 + b'1], "A": [' + b','.join([b'[' + b'0,' * 19999 + b'0]'] * 200) + b']}'
+    assert admission.estimate('application/json', head).entries == 200 * 20000
+
+def test_oversized_body_is_refused_before_reading(monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_BODY_BYTES', 64)
+    url = f"{settings.API_V1_STR}/solve"
+    r = client.post(url, json=BODY, headers=_hdr('19.0.0.11'))
+    assert r.status_code == 413 and '64 bytes' in r.json()['detail']
+
+    # no Content-Length: counted while streaming
+    chunks = iter([json.dumps(BODY).encode()[:50], json.dumps(BODY).encode()[50:]])
+    r = client.post(url, content=chunks, headers=_hdr('19.0.0.11', **{'Content-Type': 'application/json'}))
+    assert r.status_code == 413
+
+def test_problem_over_memory_limit_is_413(monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_PROBLEM_MB', 1e-4)
+    r = client.post(f"{settings.API_V1_STR}/solve", json=BODY, headers=_hdr('19.0.0.12'))
+    assert r.status_code == 413
+    detail = r.json()['detail']
+    assert detail['entries'] == 8 and detail['est_mb'] > 1e-4 and 'too large' in detail['message']
+
+def test_large_problems_run_on_their_own_pool(monkeypatch):
+    seen = []
+    solve = routes._solve
+
+    def spy(payload, warm, *args):
+        seen.append(threading.current_thread().name)
+        return solve(payload, warm, *args)
+
+    monkeypatch.setattr(routes, '_solve', spy)
+    url = f"{settings.API_V1_STR}/solve"
+    assert client.post(url, json=BODY, headers=_hdr('19.0.0.13')).json()['status'] == 'optimal'
+
+    monkeypatch.setattr(settings, 'LARGE_PROBLEM_MB', 1e-4)
+    before = metrics.snapshot().get('admission_large_total', 0)
+    out = client.post(url, json={**BODY, 'c': [1.0, 3.0]}, headers=_hdr('19.0.0.13')).json()
+    assert out['status'] == 'optimal' and abs(out['objective_value'] - 2.0) < 1e-5
+    assert seen[0].startswith('solve') and seen[1].startswith('large')
+    assert metrics.snapshot()['admission_large_total'] == before + 1
+
+def test_sweep_estimate_grows_with_scenarios():
+    base = {'problem': BODY, 'workers': 2}
+    short = admission.estimate('application/json', json.dumps({**base, 'c_scenarios': [[1.0, 2.0]] * 10}).encode())
+    long = admission.estimate('application/json', json.dumps({**base, 'c_scenarios': [[1.0, 2.0]] * 1000}).encode())
+    assert (short.variables, short.entries, short.scenarios) == (2, 8, 10) and long.scenarios == 1000
+    assert long.est_mb > short.est_mb
+
+def test_sweep_and_visualize_are_admitted(monkeypatch):
+    sweep = {'problem': BODY, 'c_scenarios': [[1.0, 2.0], [2.0, 1.0]]}
+    view = {'problem': BODY, 'grid': 5}
+    monkeypatch.setattr(settings, 'MAX_PROBLEM_MB', 1e-4)
+    for path, body in (('sweep', sweep), ('visualize', view)):
+        r = client.post(f"{settings.API_V1_STR}/{path}", json=body, headers=_hdr('19.0.0.21'))
+        assert r.status_code == 413 and r.json()['detail']['entries'] == 8
+
+    monkeypatch.setattr(settings, 'MAX_PROBLEM_MB', 4096)
+    monkeypatch.setattr(settings, 'LARGE_PROBLEM_MB', 1e-4)
+    seen = []
+    sweep_problem = routes.sweep_problem
+
+    def spy(payload):
+        seen.append(threading.current_thread().name)
+        return sweep_problem(payload)
+
+    monkeypatch.setattr(routes, 'sweep_problem', spy)
+    before = metrics.snapshot().get('admission_large_total', 0)
+    r = client.post(f"{settings.API_V1_STR}/sweep", json=sweep, headers=_hdr('19.0.0.21'))
+    assert r.status_code == 200 and r.json()['status'] == ['optimal', 'optimal']
+    assert seen[0].startswith('large') and metrics.snapshot()['admission_large_total'] == before + 1
+
+    # validation errors still come back as 422
+    r = client.post(f"{settings.API_V1_STR}/sweep", json={'problem': BODY, 'workers': 0}, headers=_hdr('19.0.0.21'))
+    assert r.status_code == 422
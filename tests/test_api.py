@@ -135,6 +135,34 @@ def test_service_none_in_b():
         solve_problem(p)
 
 
+def test_service_precheck_short_circuits_solver(monkeypatch):
+    import solver.solve
+    from app.core.metrics import metrics
+
+    def boom(**kw):
+        raise AssertionError("solver should not run")
+
+    monkeypatch.setattr(solver.solve, "solve_lp", boom)
+    before = metrics.snapshot().get("precheck_infeasible_total", 0)
+    res = solve_problem(ProblemInput(c=[1, 1], A=[[1, 1]], b=[-1], bounds=[(0, None), (0, None)], sense="minimize"))
+    assert res.status == "infeasible" and "row 0 of A" in res.message
+    assert metrics.snapshot()["precheck_infeasible_total"] == before + 1
+
+    monkeypatch.setattr(settings, "PRECHECKS", False)
+    with pytest.raises(AssertionError):
+        solve_problem(ProblemInput(c=[1, 1], A=[[1, 1]], b=[-1], bounds=[(0, None), (0, None)], sense="minimize"))
+
+
+def test_precheck_result_is_cached():
+    client = TestClient(app)
+    hdr = {"X-API-Key": settings.API_TOKEN, "X-Forwarded-For": "19.0.0.10"}
+    body = {"c": [1, 1], "A_eq": [[1, 1]], "b_eq": [5], "bounds": [[0, 1], [0, 1]], "sense": "minimize"}
+    first = client.post(f"{settings.API_V1_STR}/solve?use_cache=true", headers=hdr, json=body).json()
+    assert first["status"] == "infeasible" and first["stats"]["precheck"]["kind"] == "row_activity"
+    again = client.post(f"{settings.API_V1_STR}/solve?use_cache=true", headers=hdr, json=body).json()
+    assert again["cached"] is True and again["solution_id"] == first["solution_id"]
+
+
 @pytest.mark.xfail(reason="Invalid 'sense' currently propagates from solver; ideal mapping to 422 not implemented yet.")
 def test_service_invalid_sense_future_behavior():
     p = ProblemInput(c=[1, 2], A=[[1, 1]], b=[5], sense="not-a-sense")
@@ -0,0 +1,76 @@
+import io
+
+import numpy as np
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.models.schema import ProblemInput
+from app.services.codec import NPZ_MEDIA_TYPE, decode_problem, encode_problem
+from app.services.persistence import spec_hash
+
+client = TestClient(app)
+
+def _hdr(ip, **extra):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip, **extra}
+
+def _payload():
+    return {'c': [1, 3], 'A': [[1, 1]], 'b': [7], 'bounds': [[1, None], [0, None]], 'sense': 'minimize'}
+
+def _npz_body():
+    buf = io.BytesIO()
+    np.savez(buf, c=np.array([1.0, 3.0]), A=np.array([[1.0, 1.0]]), b=np.array([7.0]),
+             bounds=np.array([[1.0, np.nan], [0.0, np.inf]]), sense=np.array('minimize'))
+    return buf.getvalue()
+
+def test_spec_hash_matches_across_formats():
+    p_json = ProblemInput(**_payload())
+    p_npz = decode_problem(_npz_body())
+    assert isinstance(p_npz.A, np.ndarray)
+    assert spec_hash(p_json) == spec_hash(p_npz)
+    assert spec_hash(decode_problem(encode_problem(p_json))) == spec_hash(p_json)
+
+def test_spec_hash_ignores_int_float_spelling():
+    a = ProblemInput(c=[1, 2], A=[[1, 1]], b=[5])
+    b = ProblemInput(c=[1.0, 2.0], A=[[1.0, 1.0]], b=[5.0])
+    assert spec_hash(a) == spec_hash(b)
+
+def test_npz_request_and_response():
+    r = client.post(
+        f"{settings.API_V1_STR}/solve",
+        content=_npz_body(),
+        headers=_hdr('12.0.0.1', **{'Content-Type': NPZ_MEDIA_TYPE, 'Accept': NPZ_MEDIA_TYPE}),
+    )
+    assert r.status_code == 200, r.text
+    assert r.headers['content-type'] == NPZ_MEDIA_TYPE
+    out = np.load(io.BytesIO(r.content), allow_pickle=False)
+    assert str(out['status'][()]) == 'optimal'
+    assert abs(float(out['objective_value']) - 1.0) < 1e-3
+    assert out['solution'].shape == (2,)
+
+def test_json_solve_served_from_cache_for_npz_request():
+    r1 = client.post(f"{settings.API_V1_STR}/solve", json=_payload(), headers=_hdr('12.0.0.2'))
+    assert r1.status_code == 200
+    r2 = client.post(
+        f"{settings.API_V1_STR}/solve?use_cache=true",
+        content=_npz_body(),
+        headers=_hdr('12.0.0.3', **{'Content-Type': NPZ_MEDIA_TYPE}),
+    )
+    assert r2.status_code == 200
+    assert r2.json()['cached'] is True
+
+def test_npz_shape_errors_are_422():
+    buf = io.BytesIO()
+    np.savez(buf, c=np.array([1.0, 2.0, 3.0]), A=np.array([[1.0, 1.0]]), b=np.array([1.0]))
+    r = client.post(
+        f"{settings.API_V1_STR}/solve",
+        content=buf.getvalue(),
+        headers=_hdr('12.0.0.4', **{'Content-Type': NPZ_MEDIA_TYPE}),
+    )
+    assert r.status_code == 422
+    r = client.post(
+        f"{settings.API_V1_STR}/solve",
+        content=b'not a zip',
+        headers=_hdr('12.0.0.5', **{'Content-Type': NPZ_MEDIA_TYPE}),
+    )
+    assert r.status_code == 422
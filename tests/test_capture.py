@@ -0,0 +1,60 @@
+import json
+
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core import capture
+from app.core.config import settings
+from app.services import replay
+
+client = TestClient(app)
+
+BODY = {'c': [-1.0, -2.0], 'A': [[1.0, 1.0]], 'b': [3.0], 'bounds': [[0, None], [0, None]],
+        'options': {'warm_start_id': 'not-here'}}
+
+def _hdr(ip):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip}
+
+def _capture(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, 'CAPTURE_DIR', str(tmp_path))
+    url = f"{settings.API_V1_STR}/solve?use_cache=true&debug=1"
+    body = {**BODY, 'options': {}}
+    assert client.post(url, json=body, headers=_hdr('19.0.0.14')).status_code == 200
+    assert client.post(f"{settings.API_V1_STR}/solve", json=BODY, headers=_hdr('19.0.0.14')).status_code == 404
+    client.post(url, content=b'{"c": "nope"}', headers={**_hdr('19.0.0.14'), 'Content-Type': 'application/json'})
+    client.get(f"{settings.API_V1_STR}/health")
+    capture.stop_capture()
+    return replay.load([str(tmp_path)])
+
+def test_capture_is_sanitized(monkeypatch, tmp_path):
+    records = _capture(monkeypatch, tmp_path)
+    # the unparseable body is not written, nor is anything but POST /solve
+    assert len(records) == 2
+    raw = (tmp_path / next(p.name for p in tmp_path.iterdir())).read_text()
+    assert settings.API_TOKEN not in raw and '19.0.0.14' not in raw and 'not-here' not in raw
+    first, second = records
+    assert first['query'] == {'use_cache': 'true'} and first['http_status'] == 200
+    assert first['result']['status'] == 'optimal' and abs(first['result']['objective_value'] + 6) < 1e-6
+    assert first['problem']['c'] == [-1.0, -2.0] and first['duration_ms'] > 0
+    assert second['http_status'] == 404 and second['problem']['options'] == {} and second['query'] == {}
+
+def test_capture_rotates(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, 'CAPTURE_ROTATE_MB', 300 / 2**20)
+    monkeypatch.setattr(settings, 'CAPTURE_KEEP_FILES', 5)
+    records = _capture(monkeypatch, tmp_path)
+    assert len(records) == 2 and len(list(tmp_path.iterdir())) == 2
+
+def test_replay_reports_latency_and_divergence(monkeypatch, tmp_path):
+    records = _capture(monkeypatch, tmp_path)
+    records[0]['result']['objective_value'] = -5.0
+    run = __import__('asyncio').run(replay.replay(records, speed=0, force_recompute=True))
+    rep = replay.report(records, run)
+    assert rep['requests'] == 2 and rep['latency_ms']['n'] == 2 and rep['captured_latency_ms']['n'] == 2
+    # the warm_start_id was dropped, so the second request now solves instead of a 404
+    assert rep['http_status'] == {'200': 2}
+    assert rep['diverged'] == {'http_status': 1, 'status': 0, 'objective': 1, 'requests': 2}
+    assert settings.CAPTURE_DIR == str(tmp_path)  # restored after the run
+
+    path = tmp_path / 'one.jsonl'
+    path.write_text(json.dumps({**records[0], 'result': {'status': 'optimal', 'objective_value': -6.0}}) + '\n')
+    assert replay.main([str(path), '--speed', '0', '--json']) == 0
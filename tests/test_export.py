@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.services import export
+
+client = TestClient(app)
+
+def _hdr(ip):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip}
+
+def _solve(ip, b):
+    body = {'c': [1.0, 1.0], 'A': [[-1.0, -1.0]], 'b': [b], 'bounds': [[0, None], [0, None]]}
+    return client.post(f"{settings.API_V1_STR}/solve", json=body, headers=_hdr(ip)).json()
+
+def test_ndjson_export_streams_all_rows_with_filters():
+    ids = {_solve('19.0.0.5', -1.0 - i)['solution_id'] for i in range(3)}
+    r = client.get(f"{settings.API_V1_STR}/export?status=optimal&include_solution=true", headers=_hdr('19.0.0.5'))
+    assert r.status_code == 200 and r.headers['content-type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert ids <= {row['solution_id'] for row in rows}
+    assert all(row['status'] == 'optimal' for row in rows)
+    mine = [row for row in rows if row['solution_id'] in ids]
+    assert all(len(row['solution']) == 2 for row in mine)
+    # oldest first, and the same rows whatever the chunk size
+    assert [row['solved_at'] for row in rows] == sorted(row['solved_at'] for row in rows)
+    small = [row for chunk in export.iter_chunks(statuses=['optimal'], include_solution=True, chunk_rows=2)
+             for row in chunk]
+    assert [row['solution_id'] for row in small] == [row['solution_id'] for row in rows]
+
+def test_csv_export_and_cli(tmp_path):
+    _solve('19.0.0.6', -7.0)
+    r = client.get(f"{settings.API_V1_STR}/export?format=csv&status=nope", headers=_hdr('19.0.0.6'))
+    assert r.text.strip() == ','.join(export.COLUMNS)
+
+    out = tmp_path / 'history.csv'
+    assert export.main(['--format', 'csv', '--status', 'optimal', '--include-solution', '-o', str(out)]) == 0
+    rows = list(csv.DictReader(io.StringIO(out.read_text())))
+    assert rows and all(r['status'] == 'optimal' for r in rows)
+    assert len(json.loads(rows[-1]['solution'])) == 2
+
+@pytest.mark.skipif(export.HAVE_PYARROW, reason="pyarrow installed")
+def test_parquet_needs_pyarrow():
+    r = client.get(f"{settings.API_V1_STR}/export?format=parquet", headers=_hdr('19.0.0.7'))
+    assert r.status_code == 422 and 'pyarrow' in r.json()['detail']
+    assert client.get(f"{settings.API_V1_STR}/export?format=xml", headers=_hdr('19.0.0.7')).status_code == 422
+
+def test_export_bounds_with_offset_are_utc():
+    sid = _solve('19.0.0.17', -9.5)['solution_id']
+    tz = timezone(timedelta(hours=2))
+    since = (datetime.now(timezone.utc) - timedelta(minutes=1)).astimezone(tz)
+    rows = [r for chunk in export.iter_chunks(since=since) for r in chunk]
+    assert sid in {r['solution_id'] for r in rows}
+    assert sid not in {r['solution_id'] for chunk in export.iter_chunks(until=since) for r in chunk}
@@ -0,0 +1,68 @@
+import gzip
+import json
+
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+
+client = TestClient(app)
+
+def _hdr(ip=None, **extra):
+    h = {'X-API-Key': settings.API_TOKEN, **extra}
+    if ip:
+        h['X-Forwarded-For'] = ip
+    return h
+
+def _solve(ip, n=3):
+    body = {'c': [float(-i - 1) for i in range(n)], 'A': [[1.0] * n], 'b': [10],
+            'bounds': [[0, None]] * n}
+    return client.post(f"{settings.API_V1_STR}/solve", json=body, headers=_hdr(ip)).json()
+
+def test_problem_etag_and_304():
+    out = _solve('18.0.0.1')
+    url = f"{settings.API_V1_STR}/problems/{out['problem_id']}"
+    r = client.get(url, headers=_hdr())
+    assert r.status_code == 200
+    etag = r.headers['etag']
+    assert etag.startswith('"') and 'immutable' in r.headers['cache-control']
+
+    again = client.get(url, headers=_hdr(**{'If-None-Match': etag}))
+    assert again.status_code == 304 and again.content == b''
+    assert again.headers['etag'] == etag
+
+    # weak form and lists match too; another tag does not
+    assert client.get(url, headers=_hdr(**{'If-None-Match': f'"x", W/{etag}'})).status_code == 304
+    assert client.get(url, headers=_hdr(**{'If-None-Match': '"other"'})).status_code == 200
+
+def test_solution_field_projection():
+    out = _solve('18.0.0.2')
+    url = f"{settings.API_V1_STR}/solutions/{out['solution_id']}"
+    full = client.get(url, headers=_hdr())
+    assert full.status_code == 200 and 'solution_json' in full.json() and 'duals' in full.json()
+
+    r = client.get(url + '?fields=status,objective_value', headers=_hdr())
+    assert r.json() == {'status': 'optimal', 'objective_value': out['objective_value']}
+    # each projection is its own representation
+    assert r.headers['etag'] != full.headers['etag']
+    assert client.get(url + '?fields=reduced_costs', headers=_hdr()).json()['reduced_costs'] is not None
+    assert client.get(url + '?fields=nope', headers=_hdr()).status_code == 422
+
+def test_large_bodies_are_gzipped():
+    out = _solve('18.0.0.3', n=400)
+    url = f"{settings.API_V1_STR}/problems/{out['problem_id']}"
+    raw = client.get(url, headers=_hdr(**{'Accept-Encoding': 'identity'}))
+    assert 'content-encoding' not in raw.headers
+
+    # stream=True keeps the transport from transparently decoding the body
+    with client.stream('GET', url, headers=_hdr(**{'Accept-Encoding': 'gzip'})) as r:
+        assert r.headers['content-encoding'] == 'gzip'
+        body = b''.join(r.iter_raw())
+        etag = r.headers['etag']
+    assert len(body) < len(raw.content)
+    assert json.loads(gzip.decompress(body)) == raw.json()
+    assert etag.endswith('-gzip"') and etag != raw.headers['etag']
+
+    # either encoding's tag revalidates the same record
+    r = client.get(url, headers=_hdr(**{'If-None-Match': etag, 'Accept-Encoding': 'identity'}))
+    assert r.status_code == 304
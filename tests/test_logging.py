@@ -0,0 +1,43 @@
+import logging
+import queue
+
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.core import logging as app_logging
+
+client = TestClient(app)
+
+def _summaries(caplog):
+    return [r.msg for r in caplog.records if isinstance(r.msg, dict) and r.msg.get('event') == 'request']
+
+def test_solve_emits_one_summary(caplog):
+    caplog.set_level(logging.INFO)
+    body = {'c': [1.0, 3.0], 'A': [[1.0, 1.0]], 'b': [4.0], 'bounds': [[0, None], [0, None]]}
+    hdr = {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': '19.0.0.1'}
+    r = client.post(f"{settings.API_V1_STR}/solve", json=body, headers=hdr)
+    assert r.status_code == 200
+
+    (rec,) = _summaries(caplog)
+    assert rec['route'] == f"{settings.API_V1_STR}/solve" and rec['status'] == 200
+    assert rec['spec_hash'] and rec['cache'] == 'off' and rec['solver']
+    assert {'solve', 'persist'} <= set(rec['phases']) and rec['duration_ms'] > 0
+
+def test_sampling_keeps_errors_and_slow_requests(monkeypatch):
+    monkeypatch.setattr(settings, 'LOG_SLOW_MS', 100.0)
+    rates = {'/quiet': 0.0}
+    assert not app_logging.keep_summary('/quiet', 200, 5.0, rates)
+    assert app_logging.keep_summary('/quiet', 500, 5.0, rates)
+    assert app_logging.keep_summary('/quiet', 404, 5.0, rates)
+    assert app_logging.keep_summary('/quiet', 200, 150.0, rates)
+    assert app_logging.keep_summary('/other', 200, 5.0, rates)  # LOG_SAMPLE_RATE=1
+
+    monkeypatch.setattr(settings, 'LOG_SAMPLE_RATES_RAW', '/a=0.5, /b=0,bad')
+    assert settings.LOG_SAMPLE_RATES == {'/a': 0.5, '/b': 0.0}
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = app_logging._QueueHandler(queue.Queue(maxsize=1))
+    for i in range(3):
+        handler.emit(logging.LogRecord('t', logging.INFO, __file__, 1, 'msg %d', (i,), None))
+    assert handler.dropped == 2 and handler.queue.qsize() == 1
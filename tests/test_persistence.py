@@ -1,7 +1,10 @@
+import random
+
+import pytest
 from starlette.testclient import TestClient
 from app.main import app
 from app.core.config import settings
-from app.services.persistence import spec_hash
+from app.services.persistence import spec_hash, verify_solution
 from app.models.schema import ProblemInput
 
 client = TestClient(app)
@@ -57,3 +60,155 @@ def test_bypass_cache_creates_new_solution():
 
     after = _count_for_hash(h)
     assert after == before + 1
+
+def test_duals_returned_from_cache_and_usable_as_warm_start():
+    payload = {'c': [1, 2], 'A': [[-1, -1]], 'b': [-4], 'bounds': [[0, None], [0, None]], 'sense': 'minimize'}
+    r1 = client.post(f"{settings.API_V1_STR}/solve", json=payload, headers=_hdr('11.0.0.7'))
+    assert r1.status_code < 400
+    assert abs(r1.json()['duals']['ineq'][0] - 1) < 1e-4
+
+    r2 = client.post(f"{settings.API_V1_STR}/solve?use_cache=true", json=payload, headers=_hdr('11.0.0.8'))
+    body = r2.json()
+    assert body['cached'] is True
+    assert abs(body['duals']['ineq'][0] - 1) < 1e-4
+    assert abs(body['reduced_costs'][1] - 1) < 1e-4
+
+    warm = dict(payload, options={'warm_start_id': body['solution_id']})
+    r3 = client.post(f"{settings.API_V1_STR}/solve", json=warm, headers=_hdr('11.0.0.9'))
+    assert r3.status_code < 400
+    assert r3.json()['stats']['solver'] == 'OSQP'
+
+    missing = dict(payload, options={'warm_start_id': 'nope'})
+    r4 = client.post(f"{settings.API_V1_STR}/solve", json=missing, headers=_hdr('11.0.0.10'))
+    assert r4.status_code == 404
+
+def test_fuzzy_cache_matches_noisy_resubmission(monkeypatch):
+    monkeypatch.setattr(settings, 'FUZZY_CACHE_RTOL', 1e-9)
+    payload = {'c': [1.5, 2.5], 'A': [[-1, -2]], 'b': [-3], 'bounds': [[0, None], [0, None]]}
+    noisy = dict(payload, c=[1.5 * (1 + 1e-13), 2.5 - 1e-13], A=[[-1 - 1e-13, -2]])
+    assert spec_hash(ProblemInput(**noisy)) != spec_hash(ProblemInput(**payload))
+
+    r1 = client.post(f"{settings.API_V1_STR}/solve", json=payload, headers=_hdr('11.0.0.11'))
+    assert r1.status_code < 400
+    r2 = client.post(f"{settings.API_V1_STR}/solve?use_cache=true", json=noisy, headers=_hdr('11.0.0.12'))
+    body = r2.json()
+    assert body['cached'] is True and body['fuzzy'] is True
+    assert abs(body['objective_value'] - r1.json()['objective_value']) < 1e-9
+
+    # a real change is not a fuzzy match
+    changed = dict(payload, b=[-3.001])
+    r3 = client.post(f"{settings.API_V1_STR}/solve?use_cache=true", json=changed, headers=_hdr('11.0.0.13'))
+    assert r3.json()['cached'] is False
+
+def test_verify_solution_rejects_infeasible_or_worse_points():
+    p = ProblemInput(c=[1, 1], A=[[-1, -1]], b=[-2], bounds=[[0, None], [0, 1.5]])
+    assert abs(verify_solution(p, [1, 1], 2.0, 1e-6) - 2.0) < 1e-12
+    assert verify_solution(p, [0.9, 1], 1.9, 1e-6) is None      # violates A x <= b
+    assert verify_solution(p, [0.0, 2.0], 2.0, 1e-6) is None    # violates ub
+    assert verify_solution(p, [1, 1], 1.5, 1e-6) is None        # objective disagrees
+
+def test_decomposed_blocks_are_cached_individually():
+    k = random.random()  # fresh second block each run; the first block is shared
+    opts = {'decompose': True}
+    first = {'c': [1, 1, 2], 'A': [[-1, -1, 0], [0, 0, -1]], 'b': [-2, -k], 'options': opts}
+    url = f"{settings.API_V1_STR}/solve?use_cache=true"
+    r1 = client.post(url, json=first, headers=_hdr('11.0.0.14'))
+    assert r1.status_code < 400
+    assert r1.json()['stats']['decomposition']['blocks'] == 2
+
+    second = dict(first, c=[1, 1, 3])
+    r2 = client.post(url, json=second, headers=_hdr('11.0.0.15'))
+    body = r2.json()
+    assert body['status'] == 'optimal'
+    assert body['stats']['decomposition']['cached_blocks'] == 1
+    assert abs(body['objective_value'] - (2 + 3 * k)) < 1e-5
+
+    # recomputing means every block too
+    r3 = client.post(url, json=second, headers={**_hdr('11.0.0.15'), 'X-Force-Recompute': '1'})
+    assert r3.json()['stats']['decomposition'].get('cached_blocks', 0) == 0
+
+    # blocks are not client solves
+    items = client.get(f"{settings.API_V1_STR}/history?limit=10", headers=_hdr('11.0.0.15')).json()['items']
+    assert [i['solution_id'] for i in items[:2]] == [r3.json()['solution_id'], body['solution_id']]
+
+def test_async_persistence_roundtrip():
+    import asyncio
+    from app.services.persistence import find_cached_solution_async, persist_problem_and_solution_async
+
+    p = ProblemInput(c=[random.random(), 1.0], A=[[1, 1]], b=[3], bounds=[[0, None], [0, None]])
+    res = {'status': 'optimal', 'objective_value': 0.0, 'solution': [0.0, 0.0]}
+
+    async def _run():
+        ids = await persist_problem_and_solution_async(p, res, 1)
+        # many lookups in flight at once, none of them on the event loop
+        rows = await asyncio.gather(*(find_cached_solution_async(spec_hash(p)) for _ in range(8)))
+        return ids, rows
+
+    (problem_id, solution_id), rows = asyncio.run(_run())
+    assert all(r['id'] == solution_id and r['problem_id'] == problem_id for r in rows)
+
+def test_cache_hits_touch_in_batches(monkeypatch):
+    import asyncio
+    from sqlalchemy import text
+    from app.services.persistence import find_cached_solution_async, flush_touches, get_session
+    from app.services.persistence import persist_problem_and_solution
+
+    monkeypatch.setattr(settings, 'TOUCH_FLUSH_SECONDS', 3600)
+    flush_touches()
+    p = ProblemInput(c=[random.random(), 2.0], A=[[1, 1]], b=[3], bounds=[[0, None], [0, None]])
+    _, sid = persist_problem_and_solution(p, {'status': 'optimal', 'objective_value': 0.0, 'solution': [0.0, 0.0]}, 1, False)
+
+    def last_hit():
+        with get_session() as db:
+            return db.execute(text("SELECT last_hit_at FROM solutions WHERE id=:id"), {"id": sid}).scalar()
+
+    stored = last_hit()
+    asyncio.run(find_cached_solution_async(spec_hash(p)))
+    assert last_hit() == stored  # no write on the hit path
+    assert flush_touches() >= 1
+    assert last_hit() > stored
+
+def test_persist_async_does_not_stall_the_loop():
+    # with or without the async driver: hashing and encoding a large problem
+    # run in a DB thread, a matrix row at a time, so a 1 ms ticker keeps ticking
+    import asyncio
+    import time
+    import numpy as np
+    from app.services.persistence import find_cached_solution_async, persist_problem_and_solution_async
+
+    rng = np.random.default_rng(7)
+    m, n = 300, 400
+    p = ProblemInput(c=rng.random(n).tolist(), A=rng.random((m, n)).tolist(), b=rng.random(m).tolist(),
+                     bounds=[[0, None]] * n)
+    result = {'status': 'optimal', 'objective_value': 0.0, 'solution': [0.0] * n}
+
+    async def timed(coro):
+        lag, done = 0.0, asyncio.Event()
+
+        async def ticker():
+            nonlocal lag
+            while not done.is_set():
+                t = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lag = max(lag, time.perf_counter() - t - 0.001)
+
+        tick = asyncio.create_task(ticker())
+        await asyncio.sleep(0.005)
+        t0 = time.perf_counter()
+        out = await coro
+        elapsed = time.perf_counter() - t0
+        done.set()
+        await tick
+        return out, elapsed, lag
+
+    (_, sid), elapsed, lag = asyncio.run(timed(persist_problem_and_solution_async(p, result, 1)))
+    assert lag < elapsed / 2
+    row, _, _ = asyncio.run(timed(find_cached_solution_async(spec_hash(p), p)))
+    assert row['id'] == sid
+
+def test_async_database_urls():
+    from app.db.session import _async_url
+    assert _async_url('sqlite:///./data/x.db') == 'sqlite+aiosqlite:///./data/x.db'
+    assert _async_url('postgresql://u@h/db') == 'postgresql+asyncpg://u@h/db'
+    assert _async_url('sqlite:///:memory:') is None
+    assert _async_url('mysql+pymysql://u@h/db') is None
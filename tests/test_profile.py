@@ -0,0 +1,47 @@
+import marshal
+
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+
+client = TestClient(app)
+
+BODY = {'c': [-1.0, -2.0], 'A': [[1.0, 1.0]], 'b': [3.0], 'bounds': [[0, None], [0, None]]}
+
+def _hdr(ip, **extra):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip, **extra}
+
+def test_profiled_solve_is_stored_and_downloadable(monkeypatch):
+    monkeypatch.setattr(settings, 'PROFILE_TOKEN', 'secret')
+    url = f"{settings.API_V1_STR}/solve?use_cache=true"
+    client.post(url, json=BODY, headers=_hdr('19.0.0.2'))
+
+    # the profile header bypasses the cache, so there is a solve to profile
+    r = client.post(url, json=BODY, headers=_hdr('19.0.0.2', **{'X-Profile': '1', 'X-Profile-Token': 'secret'}))
+    assert r.status_code == 200
+    out = r.json()
+    assert out['cached'] is False and out['profile_url'].endswith(f"/solutions/{out['solution_id']}/profile")
+
+    scope = client.get(out['profile_url'], headers=_hdr('19.0.0.3')).json()
+    prof = scope['profiles'][0]
+    assert prof['type'] == 'sampled' and len(prof['samples']) == len(prof['weights']) > 0
+    names = {f['name'] for f in scope['shared']['frames']}
+    assert 'model_validate_json' in names and 'solve_lp' in names
+
+    raw = client.get(out['profile_url'] + '?format=pstats', headers=_hdr('19.0.0.3'))
+    assert raw.headers['content-type'] == 'application/octet-stream'
+    assert any(fname == 'solve_lp' for (_, _, fname) in marshal.loads(raw.content))
+    top = client.get(out['profile_url'] + '?format=top', headers=_hdr('19.0.0.3')).json()
+    assert top['functions'] and top['wall_ms'] >= 0
+
+def test_profile_needs_token_and_is_off_by_default(monkeypatch):
+    hdr = _hdr('19.0.0.4', **{'X-Profile': '1', 'X-Profile-Token': 'guess'})
+    assert client.post(f"{settings.API_V1_STR}/solve", json=BODY, headers=hdr).status_code == 403
+    monkeypatch.setattr(settings, 'PROFILE_TOKEN', 'secret')
+    assert client.post(f"{settings.API_V1_STR}/solve", json=BODY, headers=hdr).status_code == 403
+
+    out = client.post(f"{settings.API_V1_STR}/solve", json=BODY, headers=_hdr('19.0.0.4')).json()
+    assert 'profile_url' not in out
+    r = client.get(f"{settings.API_V1_STR}/solutions/{out['solution_id']}/profile", headers=_hdr('19.0.0.4'))
+    assert r.status_code == 404
@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.core.metrics import metrics
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# runs against its own database file, since compaction deletes rows
+_SCRIPT = """
+import json
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.core.shared_state import get_result_cache
+from app.models.schema import ProblemInput
+from app.services.persistence import create_tables, get_session, persist_problem_and_solution, spec_hash, touch_solution
+from app.services.retention import compact, db_bytes
+from sqlalchemy import text
+
+create_tables()
+def count(sql, **kw):
+    with get_session() as db:
+        return db.execute(text(sql), kw).scalar()
+def persist(p):
+    return persist_problem_and_solution(p, {'status': 'optimal', 'objective_value': 1.0, 'solution': p.c}, 1, False)
+
+out = {}
+settings.RETENTION_MAX_ROWS_PER_HASH = 2
+small = ProblemInput(c=[1, 2], A=[[1, 1]], b=[3])
+ids = [persist(small)[1] for _ in range(3)]
+with get_session() as db:
+    touch_solution(db, ids[0])
+get_result_cache().put(spec_hash(small), {'solution_id': ids[1]})
+get_result_cache().put('unrelated', {'solution_id': 'x'})
+out['trim'] = compact()
+out['hot'] = [get_result_cache().get(h) is not None for h in (spec_hash(small), 'unrelated')]
+out['kept'] = sorted(ids.index(r) for r in (
+    count("SELECT group_concat(id) FROM solutions") or "").split(",") if r in ids)
+
+settings.RETENTION_MAX_ROWS_PER_HASH = 0
+big = [persist(ProblemInput(c=[float(i + k) for k in range(4000)]))[1] for i in range(40)]
+with get_session() as db:
+    touch_solution(db, big[0])
+settings.RETENTION_MAX_DB_BYTES = 600_000
+settings.RETENTION_BATCH = 4
+settings.RETENTION_VACUUM_PAGES = 8
+out['size'] = compact()
+out['big0_kept'] = count("SELECT COUNT(*) FROM solutions WHERE id=:id", id=big[0])
+out['big1_kept'] = count("SELECT COUNT(*) FROM solutions WHERE id=:id", id=big[1])
+out['file_bytes'] = db_bytes()['file_bytes']
+
+settings.RETENTION_MAX_DB_BYTES = 0
+settings.RETENTION_TTL_SECONDS = 60
+persist(small)
+out['ttl_early'] = compact()
+out['ttl_late'] = compact(now=datetime.utcnow() + timedelta(minutes=2))
+out['orphans'] = count("SELECT COUNT(*) FROM problems p WHERE NOT EXISTS (SELECT 1 FROM solutions s WHERE s.problem_id = p.id)")
+print(json.dumps(out))
+"""
+
+def test_retention_policies(tmp_path):
+    env = {**os.environ, 'API_TOKEN': 'x', 'DATABASE_URL': f"sqlite:///{tmp_path / 'ret.db'}"}
+    proc = subprocess.run([sys.executable, '-c', _SCRIPT], cwd=ROOT, env=env,
+                          capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    # per-hash: the least recently hit of three copies goes
+    assert out['trim']['trimmed'] == 1
+    assert out['kept'] == [0, 2]
+    # hot entries of hashes that lost solutions go too
+    assert out['hot'] == [False, True]
+
+    # size: LRU eviction until the live pages fit, and the file actually shrinks
+    assert out['size']['evicted'] > 0
+    assert out['size']['bytes_reclaimed'] > 0
+    assert out['big0_kept'] == 1 and out['big1_kept'] == 0
+    assert out['file_bytes'] <= 700_000
+
+    # TTL: nothing before expiry, everything after, and no orphaned problems
+    assert out['ttl_early']['expired'] == 0
+    assert out['ttl_late']['expired'] == 1
+    assert out['orphans'] == 0
+
+def test_metrics_endpoint_exposes_counters():
+    metrics.inc('retention_bytes_reclaimed_total', 4096)
+    r = TestClient(app).get(f"{settings.API_V1_STR}/metrics", headers={'X-API-Key': settings.API_TOKEN})
+    assert r.status_code == 200
+    assert '# TYPE retention_bytes_reclaimed_total counter' in r.text
+    assert 'result_cache_hits ' in r.text
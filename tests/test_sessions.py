@@ -0,0 +1,115 @@
+import json
+import math
+
+import numpy as np
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.services import sessions
+from solver.session import SolveSession
+from solver.solve import solve_lp
+
+client = TestClient(app)
+
+def _hdr(ip):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip}
+
+def _base():
+    return {'c': [-1, -2], 'A': [[1, 1], [1, 3]], 'b': [4, 6], 'bounds': [[0, None], [0, None]]}
+
+def test_session_edits_match_fresh_solves():
+    s = SolveSession(**_base())
+    first = s.solve()
+    assert first['status'] == 'optimal' and not first['rebuilt']
+
+    # rhs / bound values only: same model, parameters swapped
+    s.set_b([0], [5])
+    s.set_bounds(1, 0.5, None)
+    r = s.solve()
+    assert not r['rebuilt'] and s.builds == 1
+    ref = solve_lp(**{**_base(), 'b': [5, 6], 'bounds': [[0, None], [0.5, None]]})
+    assert math.isclose(r['objective_value'], ref['objective_value'], abs_tol=1e-5)
+
+    # new row / newly finite bound: rebuilt once, then incremental again
+    s.set_bounds(1, 0, 1.5)
+    s.add_rows([[1, 0]], [2])
+    r = s.solve()
+    assert r['rebuilt'] and s.builds == 2
+    ref = solve_lp(**{**_base(), 'A': [[1, 1], [1, 3], [1, 0]], 'b': [5, 6, 2], 'bounds': [[0, None], [0, 1.5]]})
+    assert math.isclose(r['objective_value'], ref['objective_value'], abs_tol=1e-5)
+    assert np.allclose(r['duals']['ineq'], ref['duals']['ineq'], atol=1e-4)
+
+    s.remove_rows([0])
+    s.set_c([-2, -1])
+    r = s.solve()
+    ref = solve_lp(**{**_base(), 'c': [-2, -1], 'A': [[1, 3], [1, 0]], 'b': [6, 2], 'bounds': [[0, None], [0, 1.5]]})
+    assert math.isclose(r['objective_value'], ref['objective_value'], abs_tol=1e-5)
+    assert s.problem_kwargs()['b'].tolist() == [6, 2]
+
+def test_session_api_roundtrip():
+    r = client.post(f"{settings.API_V1_STR}/sessions", json=_base(), headers=_hdr('15.0.0.1'))
+    assert r.status_code == 200, r.text
+    opened = r.json()
+    sid = opened['session_id']
+    assert sid == opened['problem_id'] and opened['version'] == 0
+    assert opened['delta_ms'] is None
+
+    patch = {'b': [[0, 3]], 'bounds': [[0, 0.5, None]]}
+    r = client.patch(f"{settings.API_V1_STR}/sessions/{sid}", json=patch, headers=_hdr('15.0.0.2'))
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert out['session_id'] == sid and out['version'] == 1 and not out['rebuilt']
+    assert out['previous_latency_ms'] == opened['latency_ms']
+    assert math.isclose(out['delta_ms'], out['latency_ms'] - opened['latency_ms'], abs_tol=1e-3)
+    ref = solve_lp(**{**_base(), 'b': [3, 6], 'bounds': [[0.5, None], [0, None]]})
+    assert math.isclose(out['objective_value'], ref['objective_value'], abs_tol=1e-5)
+
+    # each version is persisted as a problem of its own
+    stored = client.get(f"{settings.API_V1_STR}/problems/{out['problem_id']}", headers=_hdr('15.0.0.3')).json()
+    assert '"b":[3.0,6.0]' in stored['payload_json'].replace(' ', '')
+
+    r = client.patch(f"{settings.API_V1_STR}/sessions/{sid}", json={'add_A': [[1, 2]]}, headers=_hdr('15.0.0.4'))
+    assert r.status_code == 422
+
+    r = client.patch(f"{settings.API_V1_STR}/sessions/{sid}", json={'remove_rows': [1], 'add_A': [[0, 1]], 'add_b': [1]},
+                     headers=_hdr('15.0.0.5'))
+    assert r.status_code == 200 and r.json()['rebuilt']
+
+    assert client.delete(f"{settings.API_V1_STR}/sessions/{sid}", headers=_hdr('15.0.0.6')).status_code == 200
+    r = client.patch(f"{settings.API_V1_STR}/sessions/{sid}", json=patch, headers=_hdr('15.0.0.7'))
+    assert r.status_code == 404
+
+def test_session_rebuilt_from_storage_on_another_worker():
+    url = f"{settings.API_V1_STR}/sessions"
+    sid = client.post(url, json=_base(), headers=_hdr('19.0.0.19')).json()['session_id']
+    assert client.patch(f"{url}/{sid}", json={'b': [[0, 3]]}, headers=_hdr('19.0.0.19')).status_code == 200
+
+    # as if the next patch reached a worker that never saw the session
+    sessions.registry.pop(sid)
+    r = client.patch(f"{url}/{sid}", json={'bounds': [[0, 0.5, None]]}, headers=_hdr('19.0.0.19'))
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert out['session_id'] == sid and out['version'] == 2 and out['rebuilt']
+    ref = solve_lp(**{**_base(), 'b': [3, 6], 'bounds': [[0.5, None], [0, None]]})
+    assert math.isclose(out['objective_value'], ref['objective_value'], abs_tol=1e-5)
+    assert sessions.registry.get(sid) is not None
+
+    # closing is durable: no worker rebuilds a closed session
+    sessions.registry.pop(sid)
+    assert client.delete(f"{url}/{sid}", headers=_hdr('19.0.0.19')).status_code == 200
+    assert client.patch(f"{url}/{sid}", json={'c': [-1, -1]}, headers=_hdr('19.0.0.19')).status_code == 404
+    assert client.patch(f"{url}/no-such-session", json={'c': [-1, -1]}, headers=_hdr('19.0.0.20')).status_code == 404
+
+def test_session_patch_rejects_non_finite_data():
+    url = f"{settings.API_V1_STR}/sessions"
+    hdr = {**_hdr('19.0.0.22'), 'Content-Type': 'application/json'}
+    sid = client.post(url, json=_base(), headers=hdr).json()['session_id']
+    for patch in ({'add_A': [[math.nan, 1]], 'add_b': [1]}, {'add_A': [[math.inf, 1]], 'add_b': [1]},
+                  {'bounds': [[0, math.nan, None]]}):
+        r = client.patch(f"{url}/{sid}", content=json.dumps(patch), headers=hdr)
+        assert r.status_code == 422, r.text
+    # nothing was applied: the next patch solves the unpatched model
+    r = client.patch(f"{url}/{sid}", json={'b': [[0, 3]]}, headers=hdr)
+    assert r.status_code == 200 and r.json()['status'] == 'optimal' and r.json()['version'] == 1
+    assert client.delete(f"{url}/{sid}", headers=hdr).status_code == 200
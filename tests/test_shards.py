@@ -0,0 +1,106 @@
+import sqlite3
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.db import shards
+from app.models.schema import ProblemInput
+from app.services import export
+from app.services.persistence import (
+    create_tables, find_cached_solution_by_hash, get_history, persist_problem_and_solution, shard_of, spec_hash,
+)
+from app.services.retention import compact
+
+client = TestClient(app)
+
+def _hdr(ip):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip}
+
+@pytest.fixture
+def sharded(tmp_path):
+    shards.configure(3, f"sqlite:///{tmp_path}/cvxviz.db")
+    create_tables()
+    yield tmp_path
+    shards.configure(0)
+
+def _count(path, sql):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(sql).fetchone()[0]
+
+def test_shard_url():
+    assert shards.shard_url("sqlite:///./data/cvxviz.db", 2) == "sqlite:///./data/cvxviz.shard2.db"
+    with pytest.raises(ValueError):
+        shards.shard_url("sqlite://", 0)
+
+def test_rows_route_by_hash_and_history_merges(sharded):
+    problems = [ProblemInput(c=[1.0, 2.0 + i], A=[[-1.0, -1.0]], b=[-0.5 - i]) for i in range(12)]
+    ids = [persist_problem_and_solution(p, {'status': 'optimal', 'objective_value': float(i), 'solution': [0.0, 0.0]},
+                                        1, False)
+           for i, p in enumerate(problems)]
+
+    per_shard = [_count(sharded / f"cvxviz.shard{i}.db", "SELECT COUNT(*) FROM solutions") for i in range(3)]
+    expected = [sum(shard_of(spec_hash(p)) == i for p in problems) for i in range(3)]
+    assert per_shard == expected and sum(per_shard) == 12
+    assert all(n > 0 for n in per_shard)
+    for p, (_, sid) in zip(problems, ids):
+        assert find_cached_solution_by_hash(spec_hash(p))['id'] == sid
+
+    # newest first across shards, and pages line up
+    items = get_history(limit=1000, offset=0)
+    mine = [r['solution_id'] for r in items if r['solution_id'] in {sid for _, sid in ids}]
+    assert mine == [sid for _, sid in reversed(ids)]
+    stamps = [str(r['created_at']) for r in items]
+    assert stamps == sorted(stamps, reverse=True)
+    assert get_history(limit=5, offset=3) == items[3:8]
+
+    rows = [r for chunk in export.iter_chunks(chunk_rows=4) for r in chunk]
+    assert [r['solution_id'] for r in rows if r['solution_id'] in {sid for _, sid in ids}] == [sid for _, sid in ids]
+
+    stats = compact()
+    assert stats['problems_dropped'] == 0 and stats['profiles_dropped'] == 0
+    assert sum(_count(sharded / f"cvxviz.shard{i}.db", "SELECT COUNT(*) FROM problems") for i in range(3)) == 12
+
+def test_api_reads_and_writes_through_the_shards(sharded, monkeypatch):
+    monkeypatch.setattr(settings, 'PROFILE_TOKEN', 'secret')
+    body = {'c': [3.0, 1.0], 'A': [[-1.0, -2.0]], 'b': [-5.5], 'bounds': [[0, None], [0, None]]}
+    shard = shard_of(spec_hash(ProblemInput(**body)))
+    hdr = _hdr('19.0.0.15')
+    profiled = {**hdr, 'X-Profile': '1', 'X-Profile-Token': 'secret'}
+    out = client.post(f"{settings.API_V1_STR}/solve", json=body, headers=profiled).json()
+    assert out['status'] == 'optimal'
+    path = sharded / f"cvxviz.shard{shard}.db"
+    assert _count(path, f"SELECT COUNT(*) FROM solutions WHERE id='{out['solution_id']}'") == 1
+    assert _count(path, f"SELECT COUNT(*) FROM profiles WHERE solution_id='{out['solution_id']}'") == 1
+
+    assert client.get(f"{settings.API_V1_STR}/solutions/{out['solution_id']}", headers=hdr).json()['status'] == 'optimal'
+    assert client.get(f"{settings.API_V1_STR}/problems/{out['problem_id']}", headers=hdr).status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/solutions/{out['solution_id']}/profile?format=top",
+                      headers=hdr).status_code == 200
+    history = client.get(f"{settings.API_V1_STR}/history?limit=5", headers=hdr).json()['items']
+    assert history[0]['solution_id'] == out['solution_id']
+
+    warm = {**body, 'options': {'warm_start_id': out['solution_id']}}
+    assert client.post(f"{settings.API_V1_STR}/solve", json=warm,
+                       headers={**hdr, 'X-Force-Recompute': '1'}).status_code == 200
+    stats = client.get(f"{settings.API_V1_STR}/stats?granularity=minute", headers=hdr).json()
+    assert stats['totals']['count'] >= 2
+
+def test_fuzzy_hits_across_shards(sharded, monkeypatch):
+    rtol = 1e-9
+    monkeypatch.setattr(settings, 'FUZZY_CACHE_RTOL', rtol)
+    problems = [ProblemInput(c=[1.5 + i, 2.5], A=[[-1.0, -2.0]], b=[-3.0], bounds=[[0, None], [0, None]])
+                for i in range(20)]
+    noisy = [ProblemInput(c=[p.c[0] * (1 + 1e-13), p.c[1] - 1e-13], A=[[-1.0 - 1e-13, -2.0]], b=[-3.0],
+                          bounds=[[0, None], [0, None]]) for p in problems]
+    ids = [persist_problem_and_solution(p, {'status': 'optimal', 'objective_value': p.c[1] * 1.5,
+                                            'solution': [0.0, 1.5]}, 1, False)[1]
+           for p in problems]
+    # near-duplicates are routed by their own spec_hash, mostly to another shard
+    assert sum(shard_of(spec_hash(p)) != shard_of(spec_hash(q)) for p, q in zip(problems, noisy)) > 0
+
+    for q, sid in zip(noisy, ids):
+        row = find_cached_solution_by_hash(spec_hash(q), problem=q, rtol=rtol)
+        assert row is not None and row['fuzzy'] is True and row['id'] == sid
+        assert row['shard'] == shard_of(spec_hash(problems[ids.index(sid)]))
@@ -0,0 +1,106 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from app.core.shared_state import HAVE_REDIS, MemoryStore, RedisStore, ResultCache, SQLiteStore, redis
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_INCR = """
+import sys
+from app.core.shared_state import SQLiteStore
+store = SQLiteStore(sys.argv[1])
+for _ in range(int(sys.argv[2])):
+    store.incr('n', 3600)
+"""
+
+_WORKER = """
+import json, sys
+from starlette.testclient import TestClient
+from app.main import app
+ip, n, use_cache = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+hdr = {'X-API-Key': 'x', 'X-Forwarded-For': ip}
+body = {'c': [1, 2], 'A': [[-1, -1]], 'b': [-2], 'bounds': [[0, None], [0, None]]}
+out = []
+with TestClient(app) as client:
+    for _ in range(n):
+        r = client.post(f'/api/v1/solve?use_cache={use_cache}', json=body, headers=hdr)
+        out.append([r.status_code, r.json().get('cached')])
+print(json.dumps(out))
+"""
+
+def _env(tmp_path, name):
+    # one database per "worker", one shared-state file for all of them
+    return {**os.environ, 'API_TOKEN': 'x', 'PRELOAD_SOLVER': 'false',
+            'DATABASE_URL': f"sqlite:///{tmp_path / (name + '.db')}",
+            'SHARED_STATE_URL': f"sqlite:///{tmp_path / 'shared.db'}"}
+
+def _spawn(tmp_path, name, *args):
+    return subprocess.Popen([sys.executable, '-c', _WORKER, *map(str, args)], cwd=ROOT,
+                            env=_env(tmp_path, name), stdout=subprocess.PIPE, text=True)
+
+def _collect(proc):
+    out, _ = proc.communicate(timeout=300)
+    assert proc.returncode == 0
+    return json.loads(out.strip().splitlines()[-1])
+
+def test_sqlite_counter_is_atomic_across_processes(tmp_path):
+    path = tmp_path / 'counters.db'
+    SQLiteStore(str(path))
+    procs = [subprocess.Popen([sys.executable, '-c', _INCR, str(path), '200'], cwd=ROOT,
+                              env={**os.environ, 'API_TOKEN': 'x'}) for _ in range(4)]
+    for p in procs:
+        assert p.wait(timeout=120) == 0
+    assert SQLiteStore(str(path)).get_counter('n') == 800
+
+def test_counter_expiry_restarts_window():
+    store = MemoryStore()
+    assert store.incr('k', 3600) == 1
+    assert store.incr('k', 3600, amount=2) == 3
+    assert store.incr('gone', -1) == 1
+    assert store.get_counter('gone') == 0
+    assert store.incr('gone', 3600) == 1
+
+def test_memory_store_purges_and_caps_values():
+    store = MemoryStore(max_values=3)
+    for i in range(5):
+        store.set(f'v{i}', b'x')
+    assert [store.get(f'v{i}') for i in range(5)] == [None, None, b'x', b'x', b'x']
+    store.set('old', b'x', ttl=-1)
+    store.incr('old-counter', -1)
+    store._last_purge = 0.0
+    store.set('new', b'x')
+    assert 'old' not in store._kv and 'old-counter' not in store._counters
+
+@pytest.mark.skipif(not (HAVE_REDIS and os.environ.get('TEST_REDIS_URL')), reason="needs redis and TEST_REDIS_URL")
+def test_redis_store_windows_and_prefix():
+    url = os.environ['TEST_REDIS_URL']
+    other = redis.Redis.from_url(url)
+    other.set('not-ours', b'1')
+    store = RedisStore(url, prefix='cvxviz-test:')
+    assert store.incr('k', 60) == 1 and store.incr('k', 60) == 2
+    assert 0 < store.counter_expiry('k') - time.time() <= 60
+    other.persist('cvxviz-test:k')  # as if EXPIRE had been lost
+    store.incr('k', 60)
+    assert other.ttl('cvxviz-test:k') > 0
+    assert store.clear() >= 1
+    assert other.get('not-ours') == b'1'
+    other.delete('not-ours')
+
+def test_rate_limit_is_global_across_workers(tmp_path):
+    procs = [_spawn(tmp_path, f'w{i}', '14.0.0.1', 6, 'false') for i in range(2)]
+    codes = [code for p in procs for code, _ in _collect(p)]
+    assert codes.count(200) == 10
+    assert codes.count(429) == 2
+
+def test_result_cache_hits_are_global_across_workers(tmp_path):
+    assert _collect(_spawn(tmp_path, 'a', '14.0.0.2', 1, 'false')) == [[200, False]]
+    # worker b has its own, empty database: the hit can only come from the shared cache
+    assert _collect(_spawn(tmp_path, 'b', '14.0.0.3', 1, 'true')) == [[200, True]]
+    stats = ResultCache(SQLiteStore(str(tmp_path / 'shared.db')), ttl=60).stats()
+    assert stats == {'hits': 1, 'misses': 0}
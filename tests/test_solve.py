@@ -1,3 +1,6 @@
+import os
+
+from solver.decompose import find_blocks
 from solver.solve import solve_lp
 
 def test_simple_lp_max():
@@ -66,3 +69,255 @@ def test_qp_with_linear_term():
     )
     assert result["status"] == "optimal"
     assert result["solution"] is not None
+
+def test_presolve_matches_plain_solve():
+    kwargs = dict(
+        c=[1, 2, 3, -1],
+        A=[[1, 1, 0, 0], [2, 2, 0, 0], [0, 0, 0, 1], [1, 0, 1, 0]],
+        b=[4, 8, 3, 6],
+        A_eq=[[0, 1, 1, 0]],
+        b_eq=[2],
+        bounds=[(0, None), (0, None), (1, 1), (0, None)],
+        sense="minimize",
+    )
+    plain = solve_lp(**kwargs)
+    reduced = solve_lp(presolve=True, **kwargs)
+    assert reduced["status"] == "optimal"
+    assert abs(reduced["objective_value"] - plain["objective_value"]) < 1e-4
+    assert len(reduced["solution"]) == 4
+    st = reduced["stats"]["presolve"]
+    assert st["cols_after"] < st["cols_before"]
+    assert st["rows_after"] < st["rows_before"]
+
+def test_presolve_detects_infeasible_singleton():
+    result = solve_lp(c=[1, 1], A_eq=[[1, 0]], b_eq=[5], bounds=[(0, 2), (0, None)], presolve=True)
+    assert result["status"] == "infeasible"
+    assert result["solution"] is None
+
+def test_presolve_all_fixed():
+    result = solve_lp(c=[5, 5], bounds=[(1, 1), (2, 2)], presolve=True)
+    assert result["status"] == "optimal"
+    assert abs(result["objective_value"] - 15) < 1e-9
+    assert result["stats"]["presolve"]["cols_after"] == 0
+
+def test_presolve_checks_rows_emptied_by_last_pass():
+    # x0 = 1 fixes one variable per pass along the chain; the last pass
+    # empties sum(x) <= 0, which must still be found infeasible
+    n = 11
+    A_eq, b_eq = [[1] + [0] * (n - 1)], [1]
+    for k in range(1, 9):
+        A_eq.append([1 if j in (k - 1, k) else 0 for j in range(n)])
+        b_eq.append(2)
+    for k in (9, 10):
+        A_eq.append([1 if j in (8, k) else 0 for j in range(n)])
+        b_eq.append(2)
+    kwargs = dict(c=[1] * n, A=[[1] * n], b=[0], A_eq=A_eq, b_eq=b_eq, bounds=[(None, None)] * n)
+    assert solve_lp(**kwargs)["status"] == "infeasible"
+    result = solve_lp(presolve=True, **kwargs)
+    assert result["status"] == "infeasible"
+    assert result["solution"] is None
+
+def test_presolve_qp_fixed_variable():
+    kwargs = dict(c=[1, -2], Q=[[2, 1], [1, 2]], A=[[1, 1]], b=[3], bounds=[(0.5, 0.5), (None, None)])
+    plain = solve_lp(**kwargs)
+    reduced = solve_lp(presolve=True, **kwargs)
+    assert abs(reduced["objective_value"] - plain["objective_value"]) < 1e-4
+
+def test_scaling_wide_range_lp():
+    kwargs = dict(
+        c=[1e-4, 2e3],
+        A=[[1e4, 1e-3], [-1e-2, -5e2]],
+        b=[2e4, -1e3],
+        bounds=[(0, None), (0, None)],
+        sense="minimize",
+    )
+    plain = solve_lp(**kwargs)
+    scaled = solve_lp(scale=True, **kwargs)
+    assert scaled["status"] == "optimal"
+    assert abs(scaled["objective_value"] - plain["objective_value"]) < 1e-4 * abs(plain["objective_value"])
+    assert scaled["stats"]["scaling"]["iterations"] >= 1
+    assert "solve_time_ms" in scaled["stats"]
+
+def test_duals_and_reduced_costs():
+    result = solve_lp(
+        c=[1, 2],
+        A=[[-1, 0]],
+        b=[-1],
+        A_eq=[[1, 1]],
+        b_eq=[3],
+        bounds=[(None, 10), (0.5, None)],
+        sense="minimize",
+    )
+    duals = result["duals"]
+    assert abs(duals["ineq"][0]) < 1e-6
+    assert abs(duals["eq"][0] + 1) < 1e-5
+    assert abs(duals["lower"][1] - 1) < 1e-5
+    assert abs(result["reduced_costs"][1] - 1) < 1e-5
+
+def test_duals_survive_presolve():
+    kwargs = dict(c=[1, 1], A=[[-1, 0], [-1, -1]], b=[-1, -3], bounds=[(0, None), (0, None)])
+    plain = solve_lp(**kwargs)
+    reduced = solve_lp(presolve=True, **kwargs)
+    assert abs(sum(reduced["duals"]["ineq"]) - sum(plain["duals"]["ineq"])) < 1e-4
+    assert abs(reduced["duals"]["ineq"][1] - 1) < 1e-4
+
+def test_warm_start_from_duals():
+    kwargs = dict(c=[0, 0], Q=[[2, 0], [0, 2]], A=[[-1, -1]], b=[-2], sense="minimize")
+    first = solve_lp(**kwargs)
+    warm = solve_lp(warm_start={"x": first["solution"], "duals": first["duals"]}, **kwargs)
+    assert warm["status"] == "optimal"
+    assert warm["stats"]["solver"] == "OSQP"
+    assert abs(warm["objective_value"] - first["objective_value"]) < 1e-4
+    assert abs(warm["duals"]["ineq"][0] - first["duals"]["ineq"][0]) < 1e-3
+
+def _two_blocks():
+    # x0, x1 coupled through row 0 and Q; x2 alone with row 1; x3 free of rows, only bounded
+    return dict(
+        c=[1, -2, 3, -1],
+        Q=[[2, 1, 0, 0], [1, 2, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+        A=[[1, 1, 0, 0], [0, 0, -1, 0]],
+        b=[3, -1],
+        A_eq=[[0, 0, 1, 0]],
+        b_eq=[2],
+        bounds=[(0, None), (0, None), (None, None), (0, 4)],
+    )
+
+def test_decompose_matches_monolithic_solve():
+    kwargs = _two_blocks()
+    blocks = find_blocks(4, kwargs["A"], kwargs["A_eq"], kwargs["Q"])
+    assert [b.cols.tolist() for b in blocks] == [[0, 1], [2], [3]]
+    assert [b.rows.tolist() for b in blocks] == [[0], [1], []]
+
+    plain = solve_lp(**kwargs)
+    for workers in (1, 2):
+        split = solve_lp(decompose=True, workers=workers, **kwargs)
+        assert split["status"] == "optimal"
+        assert split["stats"]["decomposition"]["blocks"] == 3
+        assert abs(split["objective_value"] - plain["objective_value"]) < 1e-4
+        for a, b in zip(split["solution"], plain["solution"]):
+            assert abs(a - b) < 1e-3
+        assert abs(split["duals"]["eq"][0] - plain["duals"]["eq"][0]) < 1e-3
+
+def test_decompose_infeasible_block_and_empty_row():
+    kwargs = _two_blocks()
+    bad_block = dict(kwargs, bounds=[(0, None), (0, None), (None, 1), (0, 4)])
+    assert solve_lp(decompose=True, **bad_block)["status"] == "infeasible"
+    empty_row = dict(kwargs, A=kwargs["A"] + [[0, 0, 0, 0]], b=kwargs["b"] + [-1])
+    assert solve_lp(decompose=True, **empty_row)["status"] == "infeasible"
+
+def test_decompose_uses_block_cache():
+    class Cache:
+        def __init__(self):
+            self.store, self.hits = {}, 0
+        def get(self, sub):
+            r = self.store.get(repr(sub["c"].tolist()))
+            self.hits += r is not None
+            return r
+        def put(self, sub, res):
+            self.store[repr(sub["c"].tolist())] = res
+
+    cache = Cache()
+    kwargs = _two_blocks()
+    first = solve_lp(decompose=True, block_cache=cache, **kwargs)
+    assert first["stats"]["decomposition"]["cached_blocks"] == 0
+    second = solve_lp(decompose=True, block_cache=cache, **kwargs)
+    assert second["stats"]["decomposition"]["cached_blocks"] == 3
+    assert abs(second["objective_value"] - first["objective_value"]) < 1e-9
+
+def test_thread_budgets(monkeypatch):
+    from solver import threads
+    assert threads.threads_per_solve(4, cpus=16) == 4
+    assert threads.threads_per_solve(32, cpus=8) == 1
+    assert threads.threads_per_solve(0, cpus=8) == 8
+
+    monkeypatch.setattr(threads, "_threads", None)
+    monkeypatch.setattr(threads, "_limiter", None)
+    for var in threads._ENV_VARS:
+        monkeypatch.setenv(var, "")
+    assert threads.solver_options(lp=True) == {}
+
+    threads.configure(4)
+    assert all(os.environ[var] == "4" for var in threads._ENV_VARS)
+    assert threads.worker_threads(3) == 1 and threads.worker_threads(2) == 2
+    assert threads.solver_options(lp=True) == {"solver": "CLARABEL", "max_threads": 4}
+    assert threads.solver_options(lp=False) == {}
+    # the option reaches Clarabel on a fresh solve
+    result = solve_lp(c=[3, 4], A=[[1, 1], [-1, 0], [0, -1]], b=[5, 0, 0], sense="maximize")
+    assert abs(result["objective_value"] - 20) < 1e-3
+
+def test_prechecks_catch_trivial_cases():
+    from solver.prechecks import precheck
+
+    out = precheck(c=[1, 1], bounds=[(2, 1), (0, None)])
+    assert out["status"] == "infeasible" and out["stats"]["precheck"]["kind"] == "bounds"
+
+    # x0 + x1 <= -1 cannot hold for nonnegative x
+    out = precheck(c=[1, 1], A=[[1, 1]], b=[-1], bounds=[(0, None), (0, None)])
+    cert = out["stats"]["precheck"]
+    assert out["status"] == "infeasible" and (cert["matrix"], cert["row"], cert["activity_limit"]) == ("A", 0, 0.0)
+
+    # equality above what the box allows
+    out = precheck(c=[1, 1], A_eq=[[1, 1]], b_eq=[5], bounds=[(0, 1), (0, 1)])
+    assert out["stats"]["precheck"]["matrix"] == "A_eq" and out["stats"]["precheck"]["relation"] == ">="
+
+    # x2 <= 1 gives x1 <= -1 only after a round of propagation
+    out = precheck(c=[0, 0, 0], A=[[1, -1, 0], [0, 1, -1], [0, 0, 1]], b=[-2, -2, 1],
+                   bounds=[(0, None)] * 3)
+    assert out["status"] == "infeasible" and out["stats"]["precheck"]["propagation_rounds"] == 1
+    assert precheck(c=[0, 0, 0], A=[[1, -1, 0], [0, 1, -1], [0, 0, 1]], b=[-2, -2, 1],
+                    bounds=[(0, None)] * 3, rounds=0) is None
+
+    # x0 only appears with a nonpositive coefficient, and 0 is feasible
+    out = precheck(c=[-1, 0], A=[[0, 1]], b=[3], bounds=[(0, None), (0, None)])
+    assert out["status"] == "unbounded" and out["objective_value"] == float("-inf")
+    assert solve_lp(c=[-1, 0], A=[[0, 1]], b=[3], bounds=[(0, None), (0, None)])["status"] == "unbounded"
+
+    # a ray without a feasible point proves nothing; feasible problems pass through
+    assert precheck(c=[-1, 0], A=[[-1, 1]], b=[-1], bounds=[(0, None), (0, 0.5)]) is None
+    assert precheck(c=[1, 1], A=[[1, 1]], b=[3], bounds=[(0, None), (0, None)]) is None
+    assert precheck(c=[-1, -2], Q=[[1, 0], [0, 1]], bounds=[(0, None), (0, None)]) is None
+
+def test_workspace_pool_updates_in_place():
+    from solver import workspaces
+
+    qp = dict(Q=[[2, 0], [0, 2]], A=[[-1, -1]], bounds=[(0, None), (0, None)])
+    lp = dict(A=[[1, 1], [1, -1]], bounds=[(0, None), (0, None)], sense="maximize")
+    rhs = ([-1.0], [-2.0], [-3.0])
+    workspaces.configure(0)
+    fresh = [solve_lp(c=[1, 1], b=b, **qp)["objective_value"] for b in rhs]
+    workspaces.configure(16 * 2**20)
+    try:
+        for b, expected in zip(rhs, fresh):
+            pooled = solve_lp(c=[1, 1], b=b, **qp)
+            assert abs(pooled["objective_value"] - expected) < 1e-4
+            assert pooled["stats"]["solver"] == "OSQP"
+        # same pattern, new values: updated in place, not set up again
+        assert pooled["stats"]["workspace"]["hit"] and pooled["stats"]["workspace"]["uses"] == 3
+
+        first = solve_lp(c=[1, 2], b=[4, 1], **lp)
+        again = solve_lp(c=[2, 1], b=[4, 2], **{**lp, "A": [[1, 1], [2, -1]]})
+        assert first["stats"]["solver"] == "CLARABEL" and not first["stats"]["workspace"]["hit"]
+        assert again["stats"]["workspace"]["hit"] and abs(again["objective_value"] - 6.0) < 1e-6
+        assert abs(again["duals"]["ineq"][0] - 4 / 3) < 1e-6 and abs(again["duals"]["ineq"][1] - 1 / 3) < 1e-6
+
+        assert solve_lp(c=[1], sense="maximize")["objective_value"] == float("inf")
+        assert solve_lp(c=[1], A=[[1]], b=[-1], bounds=[(0, None)])["status"] == "infeasible"
+        st = workspaces.get_pool().stats()
+        assert st["hits"] >= 3 and st["workspaces"] >= 2
+    finally:
+        workspaces.configure(0)
+
+def test_workspace_pool_evicts_by_memory():
+    from solver.workspaces import WorkspacePool, solve_pooled
+
+    probe = WorkspacePool(1 << 20)
+    assert solve_pooled(c=[1, 1], A=[[1, 1]], b=[1], lb=[0, 0], pool=probe)["status"] == "optimal"
+    pool = WorkspacePool(0)
+    pool.max_bytes = probe.stats()["bytes"] * 2 + 1  # room for two small workspaces
+    for A in ([[1, 1]], [[1, 0]], [[0, 1]]):
+        solve_pooled(c=[1, 1], A=A, b=[1], lb=[0, 0], pool=pool)
+    st = pool.stats()
+    assert st["workspaces"] == 2 and st["evictions"] == 1 and st["bytes"] <= pool.max_bytes
+    # the oldest pattern went first
+    assert not solve_pooled(c=[1, 1], A=[[1, 1]], b=[1], lb=[0, 0], pool=pool)["stats"]["workspace"]["hit"]
+    assert solve_pooled(c=[1, 1], A=[[0, 1]], b=[2], lb=[0, 0], pool=pool)["stats"]["workspace"]["hit"]
@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# time-to-first-/health budget; importing the solver stack alone costs about this much
+HEALTH_BUDGET_S = 5.0
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from app.main import app
+from starlette.testclient import TestClient
+imported = time.perf_counter() - t0
+with TestClient(app) as client:
+    status = client.get('/api/v1/health').status_code
+    elapsed = time.perf_counter() - t0
+    loaded = sorted(m for m in ('cvxpy', 'scipy', 'osqp') if m in sys.modules)
+print(json.dumps({'status': status, 'imported': imported, 'elapsed': elapsed, 'loaded': loaded}))
+"""
+
+def _probe(tmp_path, **env):
+    env = {**os.environ, 'API_TOKEN': 'x', 'DATABASE_URL': f"sqlite:///{tmp_path / 'startup.db'}", **env}
+    out = subprocess.run([sys.executable, '-c', _PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def test_time_to_first_health_without_solver_stack(tmp_path):
+    res = _probe(tmp_path, PRELOAD_SOLVER='false')
+    assert res['status'] == 200
+    assert res['loaded'] == []
+    assert res['elapsed'] < HEALTH_BUDGET_S
+    assert (tmp_path / 'startup.db').exists()
+
+def test_preload_does_not_block_health(tmp_path):
+    res = _probe(tmp_path, PRELOAD_SOLVER='true')
+    assert res['status'] == 200
+    assert res['elapsed'] < HEALTH_BUDGET_S
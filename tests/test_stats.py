@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.core.shared_state import get_result_cache
+from app.models.schema import ProblemInput
+from app.services import stats
+from app.services.persistence import spec_hash
+
+client = TestClient(app)
+
+def _hdr(ip):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip}
+
+def _stats(**params):
+    r = client.get(f"{settings.API_V1_STR}/stats", params=params, headers=_hdr('19.0.0.9'))
+    assert r.status_code == 200
+    return r.json()
+
+def test_stats_count_solves_and_cache_hits():
+    since = (datetime.utcnow() - timedelta(minutes=5)).isoformat()
+    before = _stats(granularity='minute', since=since)['totals']
+    body = {'c': [2.0, 5.0], 'A': [[-1.0, -1.0]], 'b': [-3.25], 'bounds': [[0, None], [0, None]]}
+    url = f"{settings.API_V1_STR}/solve?use_cache=true"
+    for _ in range(2):
+        client.post(url, json=body, headers={**_hdr('19.0.0.8'), 'X-Force-Recompute': '1'})
+    # drop the hot entry so the next request is a database hit
+    get_result_cache().store.delete(f"result:{spec_hash(ProblemInput(**body))}")
+    assert client.post(url, json=body, headers=_hdr('19.0.0.8')).json()['cached'] is True
+    # and this one a hot hit
+    assert client.post(url, json=body, headers=_hdr('19.0.0.8')).json()['cached'] is True
+    # session solves are not client solves
+    session = {'c': [1.0, 1.0], 'A': [[-1.0, -1.0]], 'b': [-2.0], 'bounds': [[0, None], [0, None]]}
+    assert client.post(f"{settings.API_V1_STR}/sessions", json=session, headers=_hdr('19.0.0.18')).status_code == 200
+
+    after = _stats(granularity='minute', since=since)
+    t = after['totals']
+    assert t['count'] == before['count'] + 4 and t['cached'] == before['cached'] + 2
+    assert t['duration_ms']['solves'] == before['duration_ms']['solves'] + 2
+    assert t['by_status']['optimal'] >= 4 and t['by_solver']
+    assert t['duration_ms']['p50'] <= t['duration_ms']['p95'] <= t['duration_ms']['p99']
+    assert after['buckets'] >= 1 and sum(b['count'] for b in after['series']) == t['count']
+    assert _stats(status='no-such-status')['totals']['count'] == 0
+
+def test_percentiles_from_bins():
+    hist = [0] * (len(stats.DURATION_BINS_MS) + 1)
+    for ms in [3] * 50 + [40] * 45 + [400] * 5:
+        hist[stats.duration_bin(ms)] += 1
+    assert 2 <= stats._percentile(hist, 0.5) <= 5
+    assert 20 <= stats._percentile(hist, 0.95) <= 50
+    assert 200 <= stats._percentile(hist, 0.99) <= 500
+    assert stats._percentile([0] * len(hist), 0.5) is None
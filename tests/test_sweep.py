@@ -0,0 +1,77 @@
+import io
+import json
+import math
+
+import numpy as np
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.services.codec import NPZ_MEDIA_TYPE
+from solver.solve import solve_lp
+from solver.sweep import sweep_lp
+
+client = TestClient(app)
+
+def _hdr(ip, **extra):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip, **extra}
+
+def _base():
+    return {'c': [-1, -2], 'A': [[1, 1], [1, 3]], 'b': [4, 6], 'bounds': [[0, None], [0, None]]}
+
+def test_sweep_matches_individual_solves():
+    base = _base()
+    b_rows = [[4, 6], [2, 6], [5, 9], [-1, 6]]
+    c_rows = [[-1, -2], [-3, -1], [1, 1], [-1, -1]]
+    res = sweep_lp(**base, c_scenarios=c_rows, b_scenarios=b_rows, return_solutions=True)
+    assert res["stats"]["scenarios"] == 4
+    for i, (c, b) in enumerate(zip(c_rows, b_rows)):
+        ref = solve_lp(**{**base, 'c': c, 'b': b})
+        assert res["status"][i] == ref["status"]
+        if ref["status"] == "optimal":
+            assert math.isclose(res["objective_value"][i], ref["objective_value"], abs_tol=1e-5)
+            assert np.allclose(res["solutions"][i], ref["solution"], atol=1e-4)
+        else:
+            assert np.isnan(res["objective_value"][i])
+
+def test_sweep_workers_agree_with_sequential():
+    rng = np.random.default_rng(0)
+    b_rows = 4 + rng.random((6, 2)) * 4
+    seq = sweep_lp(**_base(), b_scenarios=b_rows)
+    par = sweep_lp(**_base(), b_scenarios=b_rows, workers=2)
+    assert par["stats"]["workers"] == 2
+    assert par["status"] == seq["status"]
+    assert np.allclose(par["objective_value"], seq["objective_value"], atol=1e-6)
+
+def test_sweep_endpoint():
+    body = {'problem': _base(), 'b_scenarios': [[4, 6], [2, 2], [-1, 6]]}
+    r = client.post(f"{settings.API_V1_STR}/sweep", json=body, headers=_hdr('13.0.0.1'))
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data['status'] == ['optimal', 'optimal', 'infeasible']
+    assert math.isclose(data['objective_value'][1], -2.0, abs_tol=1e-5)
+    assert data['objective_value'][2] is None
+    assert data['solutions'] is None
+
+    r = client.post(f"{settings.API_V1_STR}/sweep", json=body,
+                    headers=_hdr('13.0.0.2', Accept=NPZ_MEDIA_TYPE))
+    assert r.status_code == 200
+    npz = np.load(io.BytesIO(r.content))
+    assert list(npz['status']) == data['status']
+    assert np.isnan(npz['objective_value'][2])
+
+def test_sweep_rejects_mismatched_scenarios():
+    body = {'problem': _base(), 'b_scenarios': [[4, 6, 1]]}
+    r = client.post(f"{settings.API_V1_STR}/sweep", json=body, headers=_hdr('13.0.0.3'))
+    assert r.status_code == 422
+    body = {'problem': _base(), 'c_scenarios': [[1, 1]], 'b_scenarios': [[4, 6], [4, 6]]}
+    r = client.post(f"{settings.API_V1_STR}/sweep", json=body, headers=_hdr('13.0.0.4'))
+    assert r.status_code == 422
+
+def test_sweep_rejects_non_finite_scenarios():
+    for i, body in enumerate([{'problem': _base(), 'c_scenarios': [[1, 1], [math.nan, 1]]},
+                              {'problem': _base(), 'b_scenarios': [[4, 6], [math.inf, 1]]}]):
+        r = client.post(f"{settings.API_V1_STR}/sweep", content=json.dumps(body),
+                        headers=_hdr(f'13.0.0.{5 + i}', **{'Content-Type': 'application/json'}))
+        assert r.status_code == 422, r.text
+        assert 'NaN/Inf' in r.text
@@ -0,0 +1,103 @@
+import threading
+
+import numpy as np
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from solver.solve import solve_lp
+from solver.trace import TRACE_COLUMNS, parse_trace
+
+client = TestClient(app)
+
+def _hdr(ip):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip}
+
+_OSQP = """
+iter   objective    prim res   dual res   gap        rel kkt    rho         time
+   1  -2.1747e-01   5.59e-02   3.43e-01   2.37e-01   3.43e-01   1.00e-01    3.94e-05s
+  50  -2.5000e-01   1.89e-06   3.89e-08   1.95e-08   1.89e-06   1.00e-01    7.56e-05s
+plsh  -2.5000e-01   0.00e+00   0.00e+00   0.00e+00   0.00e+00   --------    1.15e-04s
+"""
+
+_SCS = """
+------------------------------------------------------------------
+ iter | pri res | dua res |   gap   |   obj   |  scale  | time (s)
+------------------------------------------------------------------
+     0| 4.00e+00  1.63e+00  2.46e+00 -6.56e-01  1.00e-01  1.05e-04
+    50| 2.32e-05  3.34e-07  1.68e-07 -2.50e-01  1.00e-01  1.45e-04
+------------------------------------------------------------------
+"""
+
+def test_parse_solver_tables():
+    osqp = parse_trace(_OSQP)
+    assert osqp.shape == (2, len(TRACE_COLUMNS))
+    assert np.allclose(osqp[1], [50, -0.25, 1.89e-06, 3.89e-08, 1.95e-08])
+    scs = parse_trace(_SCS)
+    assert np.allclose(scs[0], [0, -0.656, 4.0, 1.63, 2.46])
+    assert parse_trace("no table here") is None
+    assert parse_trace(_OSQP, capacity=1).shape == (1, len(TRACE_COLUMNS))
+
+def test_solve_lp_trace_converges():
+    res = solve_lp(c=[-1, -2], A=[[1, 1], [1, 3]], b=[4, 6], bounds=[[0, None], [0, None]], trace=True)
+    assert res['status'] == 'optimal'
+    tr = res['trace']
+    assert tr.shape[0] >= 2 and np.isclose(tr[-1, 1], -5, atol=1e-4)
+    assert tr[-1, 2] < tr[0, 2]   # primal residual falls
+    # off by default, and the same answer either way
+    assert 'trace' not in solve_lp(c=[-1, -2], A=[[1, 1], [1, 3]], b=[4, 6], bounds=[[0, None], [0, None]])
+
+def test_concurrent_traces_keep_other_output(capfd):
+    lp = dict(c=[-1, -2], A=[[1, 1], [1, 3]], b=[4, 6], bounds=[[0, None], [0, None]])
+    qp = dict(lp, Q=[[1, 0], [0, 1]])
+    traces = []
+
+    def solve_many(kwargs):
+        for _ in range(20):
+            traces.append(solve_lp(trace=True, **kwargs).get('trace'))
+
+    threads = [threading.Thread(target=solve_many, args=(kw,)) for kw in (lp, qp, lp, qp)]
+    for t in threads:
+        t.start()
+    for i in range(200):
+        print(f"line {i}", flush=True)
+    for t in threads:
+        t.join()
+    out = capfd.readouterr().out
+    assert all(f"line {i}\n" in out for i in range(200))
+    assert len(traces) == 80 and all(tr is not None and tr.shape[0] >= 1 for tr in traces)
+
+def test_trace_endpoint_pages():
+    body = {'c': [-1, -3], 'A': [[1, 1], [1, 3]], 'b': [4, 6], 'bounds': [[0, None], [0, None]],
+            'options': {'trace': True}}
+    r = client.post(f"{settings.API_V1_STR}/solve", json=body, headers=_hdr('17.0.0.1'))
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert 'trace' not in out and out['stats']['trace_rows'] >= 2
+    sid = out['solution_id']
+
+    page = client.get(f"{settings.API_V1_STR}/solutions/{sid}/trace?offset=1&limit=2", headers=_hdr('17.0.0.2')).json()
+    assert page['columns'] == list(TRACE_COLUMNS)
+    assert page['total'] == out['stats']['trace_rows']
+    assert len(page['rows']) == min(2, page['total'] - 1) and page['rows'][0][0] == 1
+
+    plain = client.post(f"{settings.API_V1_STR}/solve", json={**body, 'options': None}, headers=_hdr('17.0.0.3')).json()
+    r = client.get(f"{settings.API_V1_STR}/solutions/{plain['solution_id']}/trace", headers=_hdr('17.0.0.4'))
+    assert r.status_code == 404
+
+def test_traced_osqp_matches_untraced():
+    # chunked solves restart OSQP's iteration count; with rho adapting every
+    # chunk the traced solve takes the same steps. Seed 2 updates rho along
+    # the way, seed 6 ends a chunk "solved inaccurate" before converging
+    from solver.osqp_direct import solve_osqp
+    from solver.trace import capture
+    for seed in (2, 6):
+        rng = np.random.default_rng(seed)
+        n, m = 60, 40
+        M = rng.standard_normal((n, n))
+        kw = dict(c=10 * rng.standard_normal(n), Q=M @ M.T, A=rng.standard_normal((m, n)), b=rng.standard_normal(m))
+        plain = solve_osqp(**kw)
+        with capture() as cap:
+            traced = solve_osqp(**kw)
+        assert cap.iterations == plain['stats']['iterations']
+        assert np.array_equal(traced['solution'], plain['solution'])
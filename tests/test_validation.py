@@ -1,6 +1,10 @@
+import io
+
+import numpy as np
 from starlette.testclient import TestClient
 from app.main import app
 from app.core.config import settings
+from app.services.codec import NPZ_MEDIA_TYPE
 
 client = TestClient(app)
 
@@ -10,3 +14,11 @@ def test_bad_shapes_422():
     r = client.post(f"{settings.API_V1_STR}/solve", json=payload, headers=headers)
     assert r.status_code == 422
     assert "detail" in r.json()
+
+def test_nan_in_npz_matrix_422():
+    buf = io.BytesIO()
+    np.savez(buf, c=np.array([1.0, 2.0]), A=np.array([[1.0, np.nan]]), b=np.array([1.0]))
+    headers = {"X-API-Key": settings.API_TOKEN, "X-Forwarded-For": "19.0.0.16", "Content-Type": NPZ_MEDIA_TYPE}
+    r = client.post(f"{settings.API_V1_STR}/solve", content=buf.getvalue(), headers=headers)
+    assert r.status_code == 422
+    assert "A contains NaN/Inf" in r.text
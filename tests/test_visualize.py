@@ -0,0 +1,83 @@
+import json
+import math
+
+import numpy as np
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from solver.geometry import feasible_region
+
+client = TestClient(app)
+
+def _hdr(ip):
+    return {'X-API-Key': settings.API_TOKEN, 'X-Forwarded-For': ip}
+
+def _same_points(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    return a.shape == b.shape and all(np.isclose(b, p).all(axis=1).any() for p in a)
+
+def test_polygon_vertices_and_contours():
+    r = feasible_region([-1, -2], A=[[1, 1], [1, 3]], b=[4, 6], bounds=[[0, None], [0, None]],
+                        grid=7, levels=3, optimum=[3, 1])
+    assert r['bounded'] and not r['empty']
+    assert _same_points(r['vertices'], [[0, 0], [4, 0], [3, 1], [0, 2]])
+    # boundary order: consecutive vertices share an active constraint, so the polygon is convex
+    V = np.asarray(r['vertices'])
+    cross = np.cross(np.roll(V, -1, axis=0) - V, np.roll(V, -2, axis=0) - np.roll(V, -1, axis=0))
+    assert (cross > 0).all() or (cross < 0).all()
+    assert np.allclose(r['objective_at_vertices'], V @ [-1, -2])
+    z = np.asarray(r['contours']['z'])
+    assert z.shape == (7, 7)
+    assert np.isclose(r['contours']['levels'], -5).any()   # level through the optimum
+
+def test_unbounded_empty_and_3d():
+    r = feasible_region([1, 1], bounds=[[0, None], [0, None]])
+    assert not r['bounded'] and len(r['vertices']) == 4
+
+    r = feasible_region([1, 1], A=[[1, 0]], b=[-1], bounds=[[0, None], [0, None]])
+    assert r['empty'] and r['vertices'] == []
+
+    r = feasible_region([1, 1, 1], bounds=[[0, 1]] * 3)
+    assert len(r['vertices']) == 8 and len(r['faces']) == 6
+    assert all(len(f) == 4 for f in r['faces'])
+    assert r['contours'] is None
+
+def test_slice_of_larger_problem():
+    # x2, x3 held at 0.5 and 0.2 leave x0 + x1 <= 0.3
+    r = feasible_region([1, 1, 1, 1], A=[[1, 1, 1, 1]], b=[1], bounds=[[0, None]] * 4,
+                        dims=[0, 1], fixed=[0, 0, 0.5, 0.2])
+    assert _same_points(r['vertices'], [[0, 0], [0.3, 0], [0, 0.3]])
+    assert np.allclose(r['objective_at_vertices'], [0.7, 1.0, 1.0])
+
+def test_visualize_endpoint_caches_by_spec_hash():
+    body = {'problem': {'c': [-1, -2], 'A': [[1, 1], [1, 3]], 'b': [4, 7], 'bounds': [[0, None], [0, None]]},
+            'grid': 9, 'levels': 4}
+    r = client.post(f"{settings.API_V1_STR}/visualize", json=body, headers=_hdr('16.0.0.1'))
+    assert r.status_code == 200, r.text
+    first = r.json()
+    assert not first['cached'] and first['status'] == 'optimal'
+    assert _same_points(first['vertices'], [[0, 0], [4, 0], [2.5, 1.5], [0, 7 / 3]])
+    assert np.allclose(first['optimum'], [2.5, 1.5], atol=1e-5)
+
+    again = client.post(f"{settings.API_V1_STR}/visualize", json=body, headers=_hdr('16.0.0.2')).json()
+    assert again['cached'] and again['vertices'] == first['vertices']
+    assert again['solution_id'] == first['solution_id']
+
+    # a different view of the same problem reuses the stored solution
+    other = client.post(f"{settings.API_V1_STR}/visualize", json={**body, 'grid': 11}, headers=_hdr('16.0.0.3')).json()
+    assert not other['cached'] and other['solution_id'] == first['solution_id']
+
+    bad = {'problem': {'c': [1, 1, 1, 1]}}
+    assert client.post(f"{settings.API_V1_STR}/visualize", json=bad, headers=_hdr('16.0.0.4')).status_code == 422
+
+def test_visualize_rejects_huge_or_infinite_box():
+    problem = {'c': [-1, -1], 'A': [[1, -1]], 'b': [1], 'bounds': [[0, None], [0, None]]}
+    big = settings.VIZ_MAX_BOX
+    r = client.post(f"{settings.API_V1_STR}/visualize", json={'problem': problem, 'box': [[0, big], [0, big]]},
+                    headers=_hdr('16.0.0.5'))
+    assert r.status_code == 200, r.text
+    for i, box in enumerate([[[0, math.inf], [0, 1]], [[-1e308, 1e308], [0, 1]]]):
+        r = client.post(f"{settings.API_V1_STR}/visualize", content=json.dumps({'problem': problem, 'box': box}),
+                        headers={**_hdr(f'16.0.0.{6 + i}'), 'Content-Type': 'application/json'})
+        assert r.status_code == 422, r.text